@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""Local OpenAI-compatible chat completions server with injectable latency.
+
+Used to exercise retries, hedging and streaming without network access:
+
+    python scripts/fake_openai_server.py --port 8765 \\
+        --first-token-delay google/gemini-3-flash-preview=6 --chunk-delay 0.02
+
+    # in the notebook / script under test
+    vw.config(base_url="http://127.0.0.1:8765/v1", api_key="test", hedge_after=2)
+
+Every model answers with a small valid widget unless --response points at a
+file. Delays are per model (`model=seconds`, or a bare number for all models).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_RESPONSE = """```javascript
+export default function Widget({ model, html, React }) {
+  const [count, setCount] = React.useState(0);
+  return html`<button onClick=${() => setCount(count + 1)}>Clicked ${count} times</button>`;
+}
+```"""
+
+
+def _parse_delays(values: list[str]) -> dict[str, float]:
+    delays: dict[str, float] = {}
+    for value in values:
+        model, sep, seconds = value.rpartition("=")
+        delays[model if sep else "*"] = float(seconds)
+    return delays
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    server: "FakeOpenAIServer"
+
+    def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler signature
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._json(200, {"data": [{"id": model} for model in self.server.first_token_delays]})
+        else:
+            self._json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._json(404, {"error": {"message": "not found"}})
+            return
+        length = int(self.headers.get("content-length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        model = body.get("model", "fake-model")
+        self.server.record(model)
+
+        if self.server.error_rate and random.random() < self.server.error_rate:
+            self._json(429, {"error": {"message": "rate limited"}}, headers={"retry-after": "1"})
+            return
+
+        time.sleep(self.server.delay_for(model))
+        text = self.server.response_text
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        usage = self.server.usage_for(body.get("messages", []), text)
+        if body.get("stream"):
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            self._stream(completion_id, model, text, usage if include_usage else None)
+        else:
+            self._json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+
+    def _json(self, status: int, payload: dict, headers: dict[str, str] | None = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _stream(self, completion_id: str, model: str, text: str, usage: dict | None = None) -> None:
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("cache-control", "no-cache")
+        self.end_headers()
+        step = self.server.chunk_size
+        try:
+            for start in range(0, len(text), step):
+                self._event({
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": text[start:start + step]}, "finish_reason": None}],
+                })
+                time.sleep(self.server.chunk_delay)
+            self._event({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            })
+            if usage is not None:
+                self._event({
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [],
+                    "usage": usage,
+                })
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client cancelled the stream (e.g. it lost a hedge race).
+            self.server.record_cancel(model)
+
+    def _event(self, payload: dict) -> None:
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        *,
+        first_token_delays: dict[str, float] | None = None,
+        chunk_delay: float = 0.01,
+        chunk_size: int = 16,
+        error_rate: float = 0.0,
+        response_text: str = DEFAULT_RESPONSE,
+        verbose: bool = False,
+    ):
+        super().__init__(address, FakeOpenAIHandler)
+        self.first_token_delays = first_token_delays or {}
+        self.chunk_delay = chunk_delay
+        self.chunk_size = chunk_size
+        self.error_rate = error_rate
+        self.response_text = response_text
+        self.verbose = verbose
+        self.requests: dict[str, int] = {}
+        self.cancelled: dict[str, int] = {}
+        self.seen_prefixes: set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def delay_for(self, model: str) -> float:
+        return self.first_token_delays.get(model, self.first_token_delays.get("*", 0.0))
+
+    def usage_for(self, messages: list[dict], text: str) -> dict:
+        """Rough usage block; a system prompt seen before counts as cached."""
+        def _text(content) -> str:
+            if isinstance(content, list):
+                return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+            return content or ""
+
+        prompt_tokens = sum(len(_text(m.get("content"))) for m in messages) // 4
+        system = "".join(_text(m.get("content")) for m in messages if m.get("role") == "system")
+        with self._lock:
+            cached = len(system) // 4 if system and system in self.seen_prefixes else 0
+            if system:
+                self.seen_prefixes.add(system)
+        completion_tokens = len(text) // 4
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached},
+        }
+
+    def record(self, model: str) -> None:
+        with self._lock:
+            self.requests[model] = self.requests.get(model, 0) + 1
+
+    def record_cancel(self, model: str) -> None:
+        with self._lock:
+            self.cancelled[model] = self.cancelled.get(model, 0) + 1
+
+    def start(self) -> "FakeOpenAIServer":
+        """Serve on a daemon thread (for use from tests and scripts)."""
+        threading.Thread(target=self.serve_forever, name="fake-openai-server", daemon=True).start()
+        return self
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--first-token-delay",
+        action="append",
+        default=[],
+        metavar="[MODEL=]SECONDS",
+        help="Delay before the first token (repeatable; bare number applies to all models)",
+    )
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="Delay between streamed chunks")
+    parser.add_argument("--chunk-size", type=int, default=16, help="Characters per streamed chunk")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--response", help="File whose contents every model returns")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    response_text = DEFAULT_RESPONSE
+    if args.response:
+        with open(args.response, encoding="utf-8") as handle:
+            response_text = handle.read()
+
+    server = FakeOpenAIServer(
+        (args.host, args.port),
+        first_token_delays=_parse_delays(args.first_token_delay),
+        chunk_delay=args.chunk_delay,
+        chunk_size=args.chunk_size,
+        error_rate=args.error_rate,
+        response_text=response_text,
+        verbose=args.verbose,
+    )
+    print(f"Fake OpenAI-compatible server on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,7 @@ function AppWrapper({ model }) {
     widgetError,
     widgetLogs,
     retryCount,
+    cancellable,
     auditStatus,
     auditResponse,
     auditError,
@@ -156,6 +157,13 @@ function AppWrapper({ model }) {
     model.save_changes();
   };
 
+  const handleCancelGeneration = () => {
+    model.set("cancel_request", {
+      request_id: `${Date.now()}-${Math.random().toString(16).slice(2)}`
+    });
+    model.save_changes();
+  };
+
   useKeyboardShortcuts({ isLoading, hasCode, grabMode, onGrabStart: handleGrabStart });
   React.useEffect(() => {
     if (!containerRef.current || typeof ResizeObserver === "undefined") return;
@@ -344,6 +352,7 @@ function AppWrapper({ model }) {
         <${LoadingOverlay} 
           logs=${logs} 
           hasExistingWidget=${hasCode}
+          onCancel=${status === "generating" && cancellable ? handleCancelGeneration : null}
         />
       `}
       
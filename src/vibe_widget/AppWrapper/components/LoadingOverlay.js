@@ -4,7 +4,37 @@ import ProgressMap from "./ProgressMap";
 
 const html = htm.bind(React.createElement);
 
-export default function LoadingOverlay({ logs, hasExistingWidget }) {
+function CancelButton({ onCancel }) {
+  const [pending, setPending] = React.useState(false);
+  if (!onCancel) return null;
+  return html`
+    <button
+      onClick=${() => {
+        setPending(true);
+        onCancel();
+      }}
+      disabled=${pending}
+      style=${{
+        position: "absolute",
+        top: "12px",
+        right: "12px",
+        zIndex: 1001,
+        background: "transparent",
+        color: "#f8fafc",
+        border: "1px solid #64748b",
+        borderRadius: "6px",
+        padding: "6px 10px",
+        cursor: pending ? "default" : "pointer",
+        opacity: pending ? 0.6 : 1,
+        fontSize: "12px",
+      }}
+    >
+      ${pending ? "Cancelling..." : "Cancel"}
+    </button>
+  `;
+}
+
+export default function LoadingOverlay({ logs, hasExistingWidget, onCancel }) {
   if (hasExistingWidget) {
     return html`
       <div class="loading-overlay" style=${{
@@ -25,13 +55,15 @@ export default function LoadingOverlay({ logs, hasExistingWidget }) {
         }}>
           <${ProgressMap} logs=${logs} fullHeight=${true} />
         </div>
+        <${CancelButton} onCancel=${onCancel} />
       </div>
     `;
   }
 
   return html`
-    <div style=${{ width: "100%", height: "100%" }}>
+    <div style=${{ position: "relative", width: "100%", height: "100%" }}>
       <${ProgressMap} logs=${logs} fullHeight=${true} />
+      <${CancelButton} onCancel=${onCancel} />
     </div>
   `;
 }
@@ -10,6 +10,9 @@ function formatMessage(status) {
   if (status === "blocked") {
     return "Automatic repair is blocked after repeated failures.";
   }
+  if (status === "cancelled") {
+    return "Generation cancelled. Re-run the cell to try again.";
+  }
   return "Runtime error detected.";
 }
 
@@ -21,7 +24,7 @@ export default function RuntimePanel({
   onRetry
 }) {
   const activeError = widgetError || errorMessage || "";
-  const shouldShow = status === "retrying" || status === "error" || status === "blocked" || activeError;
+  const shouldShow = status === "retrying" || status === "error" || status === "blocked" || status === "cancelled" || activeError;
   const recentLogs = Array.isArray(widgetLogs) ? widgetLogs.slice(-3) : [];
 
   if (!shouldShow) {
@@ -9,6 +9,7 @@ export default function useModelSync(model) {
   const [widgetError, setWidgetError] = React.useState(model.get("widget_error"));
   const [widgetLogs, setWidgetLogs] = React.useState(model.get("widget_logs"));
   const [retryCount, setRetryCount] = React.useState(model.get("retry_count"));
+  const [cancellable, setCancellable] = React.useState(!!model.get("cancellable"));
   const [auditState, setAuditState] = React.useState(model.get("audit_state") || {});
   const [executionState, setExecutionState] = React.useState(model.get("execution_state") || {});
 
@@ -20,6 +21,7 @@ export default function useModelSync(model) {
     const onWidgetErrorChange = () => setWidgetError(model.get("widget_error"));
     const onWidgetLogsChange = () => setWidgetLogs(model.get("widget_logs"));
     const onRetryCountChange = () => setRetryCount(model.get("retry_count"));
+    const onCancellableChange = () => setCancellable(!!model.get("cancellable"));
     const onAuditStateChange = () => setAuditState(model.get("audit_state") || {});
     const onExecutionStateChange = () => setExecutionState(model.get("execution_state") || {});
 
@@ -30,6 +32,7 @@ export default function useModelSync(model) {
     model.on("change:widget_error", onWidgetErrorChange);
     model.on("change:widget_logs", onWidgetLogsChange);
     model.on("change:retry_count", onRetryCountChange);
+    model.on("change:cancellable", onCancellableChange);
     model.on("change:audit_state", onAuditStateChange);
     model.on("change:execution_state", onExecutionStateChange);
 
@@ -41,6 +44,7 @@ export default function useModelSync(model) {
       model.off("change:widget_error", onWidgetErrorChange);
       model.off("change:widget_logs", onWidgetLogsChange);
       model.off("change:retry_count", onRetryCountChange);
+      model.off("change:cancellable", onCancellableChange);
       model.off("change:audit_state", onAuditStateChange);
       model.off("change:execution_state", onExecutionStateChange);
     };
@@ -66,6 +70,7 @@ export default function useModelSync(model) {
     widgetError,
     widgetLogs,
     retryCount,
+    cancellable,
     auditState,
     auditStatus,
     auditResponse,
@@ -1,4 +1,4 @@
-from vibe_widget.core import VibeWidget, create, edit, load, clear
+from vibe_widget.core import VibeWidget, create, create_many, edit, load, clear, stats
 from vibe_widget.api import outputs, inputs, output, actions, action, ExportHandle
 from vibe_widget.config import config, Config, models
 from vibe_widget.themes import Theme, theme, themes
@@ -7,9 +7,11 @@ __version__ = "0.1.0"
 __all__ = [
     "VibeWidget",
     "create",
+    "create_many",
     "edit",
     "load",
     "clear",
+    "stats",
     "config",
     "Config",
     "models",
@@ -3,7 +3,7 @@ Simplified configuration management for Vibe Widget.
 """
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Literal
 from pathlib import Path
 import json
@@ -126,6 +126,77 @@ def _build_model_maps() -> tuple[dict, dict]:
 
 PREMIUM_MODELS, STANDARD_MODELS = _build_model_maps()
 
+# Fallback when neither the model entry nor the manifest defaults set a budget.
+DEFAULT_INPUT_BUDGET = 24000
+DEFAULT_CONTEXT_WINDOW = 128000
+
+
+def get_model_spec(model: Optional[str]) -> Dict[str, Any]:
+    """Return the manifest entry for a model ID, or an empty dict if it is not pinned."""
+    if not model:
+        return {}
+    openrouter_manifest = MODELS_MANIFEST.get("openrouter", {})
+    for tier in ("premium", "standard"):
+        for entry in openrouter_manifest.get(tier, []):
+            if entry.get("id") == model:
+                return entry
+    return {}
+
+
+def get_fallback_model(model: Optional[str]) -> Optional[str]:
+    """Return the manifest fallback for a model, used when hedging slow requests.
+
+    Order: the model entry's `fallback`, then the next model in the same tier,
+    then the first standard model.
+    """
+    fallback = get_model_spec(model).get("fallback")
+    if fallback:
+        return fallback
+    openrouter_manifest = MODELS_MANIFEST.get("openrouter", {})
+    for tier in ("premium", "standard"):
+        ids = [entry["id"] for entry in openrouter_manifest.get(tier, [])]
+        if model in ids and len(ids) > 1:
+            return ids[(ids.index(model) + 1) % len(ids)]
+    standard = [entry["id"] for entry in openrouter_manifest.get("standard", [])]
+    return next((candidate for candidate in standard if candidate != model), None)
+
+
+def get_fastest_model() -> Optional[str]:
+    """Return the manifest model with the lowest `latency_rank` (first listed wins ties)."""
+    openrouter_manifest = MODELS_MANIFEST.get("openrouter", {})
+    ranked = [
+        entry
+        for tier in ("standard", "premium")
+        for entry in openrouter_manifest.get(tier, [])
+        if entry.get("latency_rank") is not None
+    ]
+    if not ranked:
+        return None
+    return min(ranked, key=lambda entry: entry["latency_rank"])["id"]
+
+
+def get_input_budget(model: Optional[str]) -> int:
+    """Resolve the prompt input-token budget for a model.
+
+    Order: `Config.prompt_budget` override, the model's manifest entry, the
+    manifest defaults, then DEFAULT_INPUT_BUDGET.
+    """
+    override = getattr(get_global_config(), "prompt_budget", None)
+    if override:
+        return int(override)
+    budget = get_model_spec(model).get("input_budget")
+    if budget is None:
+        budget = MODELS_MANIFEST.get("openrouter", {}).get("defaults", {}).get("input_budget")
+    return int(budget or DEFAULT_INPUT_BUDGET)
+
+
+def get_context_window(model: Optional[str]) -> int:
+    """Resolve a model's total context window (prompt plus completion tokens)."""
+    window = get_model_spec(model).get("context_window")
+    if window is None:
+        window = MODELS_MANIFEST.get("openrouter", {}).get("defaults", {}).get("context_window")
+    return int(window or DEFAULT_CONTEXT_WINDOW)
+
 
 
 @dataclass
@@ -139,6 +210,31 @@ class Config:
     mode: str = "standard"  # "standard" (fast/cheap models) or "premium" (powerful/expensive models)
     theme: Any = None
     execution: str = "auto"  # "auto" or "approve"
+    summary_cache: str = "memory"  # "memory", "disk" (.vibewidget/summaries), or "off"
+    validation_cache: str = "memory"  # "memory", "disk" (.vibewidget/validation), or "off"
+    repair_cache: str = "disk"  # runtime repairs: "disk" (.vibewidget/repairs), "memory", or "off"
+    repair_cache_ttl: Optional[float] = 7 * 24 * 3600.0  # seconds before a cached repair expires
+    prompt_budget: Optional[int] = None  # input-token budget override; None uses models_manifest.json
+    # LLM completion cache: "off", "on" (.vibewidget/completions) or "replay" (fail on miss)
+    completion_cache: str = field(default_factory=lambda: os.getenv("VIBEWIDGET_COMPLETION_CACHE", "off"))
+    completion_cache_max_mb: int = 256
+    http2: bool = False  # pooled LLM clients use HTTP/2 (needs the h2 package)
+    warm_connections: bool = True  # open a pooled connection when vw.config() is called
+    max_retries: int = 4  # retries for 429/5xx/connection errors (backoff + jitter, Retry-After)
+    max_concurrency: int = 8  # in-flight LLM requests across the kernel
+    rate_limits: Optional[Dict[str, float]] = None  # requests/minute per model id ("*" = default)
+    # OpenAI-compatible endpoint; None uses OpenRouter (set to a local server for testing)
+    base_url: Optional[str] = field(default_factory=lambda: os.getenv("VIBEWIDGET_BASE_URL"))
+    hedge_after: Optional[float] = None  # seconds without a first token before hedging; None disables
+    hedge_model: Optional[str] = None  # hedge target; None uses the manifest fallback
+    stream_guard: bool = True  # abort and re-issue streamed code that fails structural checks
+    revision_mode: str = "patch"  # "patch" (search/replace blocks, full-rewrite fallback) or "full"
+    repair_fanout: int = 1  # concurrent candidate repairs per round; first valid one wins
+    repair_models: Optional[list] = None  # models cycled across repair candidates; None uses `model`
+    # Per-task model/max_tokens/temperature: None, "auto" (fastest model for short tasks) or {task: spec}
+    routing: Any = None
+    # Append per-call LLM telemetry as JSON lines to this file; None keeps it in memory only
+    telemetry_path: Optional[str] = field(default_factory=lambda: os.getenv("VIBEWIDGET_TELEMETRY_PATH"))
 
     def __repr__(self) -> str:  # pragma: no cover
         masked_key = "****" if self.api_key else None
@@ -150,7 +246,26 @@ class Config:
             f"streaming={self.streaming!r}, "
             f"mode={self.mode!r}, "
             f"theme={self.theme!r}, "
-            f"execution={self.execution!r}"
+            f"execution={self.execution!r}, "
+            f"summary_cache={self.summary_cache!r}, "
+            f"validation_cache={self.validation_cache!r}, "
+            f"repair_cache={self.repair_cache!r}, "
+            f"repair_cache_ttl={self.repair_cache_ttl!r}, "
+            f"prompt_budget={self.prompt_budget!r}, "
+            f"completion_cache={self.completion_cache!r}, "
+            f"http2={self.http2!r}, "
+            f"max_retries={self.max_retries!r}, "
+            f"max_concurrency={self.max_concurrency!r}, "
+            f"rate_limits={self.rate_limits!r}, "
+            f"base_url={self.base_url!r}, "
+            f"hedge_after={self.hedge_after!r}, "
+            f"hedge_model={self.hedge_model!r}, "
+            f"stream_guard={self.stream_guard!r}, "
+            f"revision_mode={self.revision_mode!r}, "
+            f"repair_fanout={self.repair_fanout!r}, "
+            f"repair_models={self.repair_models!r}, "
+            f"routing={self.routing!r}, "
+            f"telemetry_path={self.telemetry_path!r}"
             ")"
         )
 
@@ -177,7 +292,44 @@ class Config:
 
         if self.execution not in ["auto", "approve"]:
             raise ValueError("Invalid execution mode. Must be 'auto' or 'approve'")
-        
+
+        if self.summary_cache not in ["memory", "disk", "off"]:
+            raise ValueError("Invalid summary_cache. Must be 'memory', 'disk', or 'off'")
+
+        if self.validation_cache not in ["memory", "disk", "off"]:
+            raise ValueError("Invalid validation_cache. Must be 'memory', 'disk', or 'off'")
+
+        if self.repair_cache not in ["memory", "disk", "off"]:
+            raise ValueError("Invalid repair_cache. Must be 'memory', 'disk', or 'off'")
+
+        if self.repair_cache_ttl is not None and float(self.repair_cache_ttl) <= 0:
+            raise ValueError("repair_cache_ttl must be a positive number of seconds")
+
+        if self.prompt_budget is not None and int(self.prompt_budget) <= 0:
+            raise ValueError("prompt_budget must be a positive number of tokens")
+
+        if self.completion_cache not in ["off", "on", "replay"]:
+            raise ValueError("Invalid completion_cache. Must be 'off', 'on', or 'replay'")
+
+        if int(self.max_retries) < 0:
+            raise ValueError("max_retries must be >= 0")
+
+        if int(self.max_concurrency) < 1:
+            raise ValueError("max_concurrency must be >= 1")
+
+        if self.hedge_after is not None and float(self.hedge_after) <= 0:
+            raise ValueError("hedge_after must be a positive number of seconds")
+
+        if self.revision_mode not in ["patch", "full"]:
+            raise ValueError("Invalid revision_mode. Must be 'patch' or 'full'")
+
+        if int(self.repair_fanout) < 1:
+            raise ValueError("repair_fanout must be >= 1")
+
+        from vibe_widget.llm.routing import validate_routing
+
+        validate_routing(self.routing)
+
         if not self.model:
             raise ValueError("No model specified")
         
@@ -206,6 +358,27 @@ class Config:
             "mode": self.mode,
             "theme": theme_value,
             "execution": self.execution,
+            "summary_cache": self.summary_cache,
+            "validation_cache": self.validation_cache,
+            "repair_cache": self.repair_cache,
+            "repair_cache_ttl": self.repair_cache_ttl,
+            "prompt_budget": self.prompt_budget,
+            "completion_cache": self.completion_cache,
+            "completion_cache_max_mb": self.completion_cache_max_mb,
+            "http2": self.http2,
+            "warm_connections": self.warm_connections,
+            "max_retries": self.max_retries,
+            "max_concurrency": self.max_concurrency,
+            "rate_limits": self.rate_limits,
+            "base_url": self.base_url,
+            "hedge_after": self.hedge_after,
+            "hedge_model": self.hedge_model,
+            "stream_guard": self.stream_guard,
+            "revision_mode": self.revision_mode,
+            "repair_fanout": self.repair_fanout,
+            "repair_models": self.repair_models,
+            "routing": self.routing,
+            "telemetry_path": self.telemetry_path,
         }
     
     @classmethod
@@ -279,7 +452,28 @@ def config(
         mode: "standard" (fast/cheap models) or "premium" (powerful/expensive models)
         theme: Theme name/prompt or Theme object to use by default
         execution: "auto" (runs immediately) or "approve" (review before run)
-        **kwargs: Additional configuration options
+        **kwargs: Additional `Config` fields, one per keyword:
+            summary_cache: "memory", "disk" (.vibewidget/summaries) or "off" for prompt summaries
+            validation_cache: "memory", "disk" (.vibewidget/validation) or "off" for validation results
+            repair_cache: "disk" (.vibewidget/repairs), "memory" or "off" for runtime repairs
+            repair_cache_ttl: Seconds before a cached runtime repair expires
+            prompt_budget: Prompt input-token cap for every model (None uses the manifest)
+            completion_cache: "off", "on" (record) or "replay" for LLM completions
+            http2: Use HTTP/2 for pooled LLM connections (needs the h2 package)
+            warm_connections: Open a pooled connection when `config()` is called
+            max_retries: Retries for rate-limit, server and connection errors
+            max_concurrency: In-flight LLM requests across the kernel
+            rate_limits: Requests/minute per model id, e.g. {"*": 60}
+            base_url: Another OpenAI-compatible endpoint, e.g. "http://localhost:8765/v1"
+            hedge_after: Seconds without a first token before racing a fallback model
+            hedge_model: Fallback model for hedging (None uses the manifest fallback)
+            stream_guard: Abort and re-issue streamed code that fails structural checks
+            revision_mode: "patch" (search/replace blocks) or "full" (re-emit the whole widget)
+            repair_fanout: Candidate repairs raced per round, e.g. 3
+            repair_models: Models cycled across repair candidates
+            routing: "auto" (fastest manifest model for repairs, audits, themes and
+                data wrangling) or {task: model or {"model", "max_tokens", "temperature"}}
+            telemetry_path: JSON-lines file for per-call latency and token telemetry
     
     Returns:
         Configuration instance
@@ -347,6 +541,14 @@ def config(
         
         if not _global_config.api_key:
             _global_config.api_key = _global_config._get_api_key_from_env()
+
+    if _global_config.warm_connections and _global_config.api_key:
+        # Pre-open the pooled connection so the first widget skips DNS/TLS setup.
+        from vibe_widget.llm.providers.client_pool import OPENROUTER_BASE_URL, get_client_pool
+
+        get_client_pool().warm_up(
+            _global_config.api_key, _global_config.base_url or OPENROUTER_BASE_URL
+        )
     
     return _global_config
 
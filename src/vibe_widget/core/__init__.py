@@ -3,9 +3,11 @@
 from vibe_widget.core.widget import (
     VibeWidget,
     create,
+    create_many,
     edit,
     load,
     clear,
+    stats,
     _normalize_api_inputs,
     _summarize_inputs_for_prompt,
 )
@@ -13,9 +15,11 @@ from vibe_widget.core.widget import (
 __all__ = [
     "VibeWidget",
     "create",
+    "create_many",
     "edit",
     "load",
     "clear",
+    "stats",
     "_normalize_api_inputs",
     "_summarize_inputs_for_prompt",
 ]
@@ -0,0 +1,79 @@
+"""Shared background event loop for non-blocking widget work.
+
+Jupyter already runs an event loop on the kernel thread, and blocking it keeps
+the notebook busy until generation finishes. Background work is instead
+scheduled on a single daemon thread that owns its own loop; callers get a
+`concurrent.futures.Future` they can poll, wait on, or ignore.
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Coroutine
+
+from vibe_widget.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class BackgroundLoop:
+    """An asyncio loop running forever on a daemon thread."""
+
+    def __init__(self, name: str = "vibe-widget-background"):
+        self._name = name
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._thread is None or not self._thread.is_alive():
+                self._start()
+            return self._loop
+
+    def _start(self) -> None:
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def _run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        thread = threading.Thread(target=_run, name=self._name, daemon=True)
+        thread.start()
+        ready.wait()
+        self._loop = loop
+        self._thread = thread
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> concurrent.futures.Future:
+        """Schedule a coroutine on the background loop."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: float | None = None) -> Any:
+        """Run a coroutine on the background loop and block until it finishes."""
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("BackgroundLoop.run() cannot be called from the background loop itself")
+        return self.submit(coro).result(timeout)
+
+
+_BACKGROUND_LOOP: BackgroundLoop | None = None
+
+
+def get_background_loop() -> BackgroundLoop:
+    """Return the process-wide background loop, starting it on first use."""
+    global _BACKGROUND_LOOP
+    if _BACKGROUND_LOOP is None:
+        _BACKGROUND_LOOP = BackgroundLoop()
+    return _BACKGROUND_LOOP
+
+
+def run_in_background(coro: Coroutine[Any, Any, Any]) -> concurrent.futures.Future:
+    """Schedule a coroutine on the shared background loop."""
+    return get_background_loop().submit(coro)
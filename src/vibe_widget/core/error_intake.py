@@ -0,0 +1,192 @@
+"""Error intake for frontend runtime errors.
+
+A widget that throws on every animation frame or data update reports a storm
+of identical `error_message` changes. Handling each one inside the traitlets
+observer started overlapping repairs, churned `logs` and raced on the retry
+counter. `ErrorIntake` sits in front of the repair path:
+
+- errors are fingerprinted (normalized signature plus the code they came from)
+- a burst is coalesced: the first error opens a short debounce window and only
+  the latest distinct error in that window is repaired
+- while a repair is in flight, errors with its fingerprint are dropped and a
+  different one is queued (only the newest is kept)
+- a queued error whose fingerprint changed by the time it runs (the repair
+  replaced the code) is stale and is dropped
+- repairs run one at a time per widget, through ``dispatch`` (the widget
+  passes the kernel job executor) or on a plain worker thread, so the
+  observer returns immediately
+"""
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from vibe_widget.llm.cancellation import GenerationCancelled
+from vibe_widget.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEBOUNCE_SECONDS = 0.25
+
+
+@dataclass
+class _PendingError:
+    message: str
+    fingerprint: str
+    received: float
+    count: int = 1
+
+
+class ErrorIntake:
+    """Debounced, de-duplicated, one-at-a-time dispatch of runtime errors."""
+
+    def __init__(
+        self,
+        handler: Callable[[str, int], None],
+        fingerprint: Callable[[str], str],
+        *,
+        debounce: float = DEBOUNCE_SECONDS,
+        name: str = "vibe-widget-repair",
+        dispatch: Callable[[Callable[[], None]], Any] | None = None,
+    ):
+        """``handler(message, occurrences)`` runs off the caller's thread for each error kept.
+
+        ``dispatch(run)`` schedules the repair; it may return a Future, whose
+        cancellation before ``run`` starts releases the intake.
+        """
+        self._handler = handler
+        self._fingerprint = fingerprint
+        self._dispatch = dispatch or self._start_thread
+        self.debounce = debounce
+        self._name = name
+        self._lock = threading.Lock()
+        self._pending: _PendingError | None = None
+        self._timer: threading.Timer | None = None
+        self._in_flight: str | None = None
+        self._idle = threading.Event()
+        self._idle.set()
+        self._closed = False
+        self.received = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.stale = 0
+        self.dispatched = 0
+
+    @property
+    def busy(self) -> bool:
+        return not self._idle.is_set()
+
+    def submit(self, message: str) -> bool:
+        """Take one reported error; False if it was folded into other work."""
+        if not message:
+            return False
+        fingerprint = self._fingerprint(message)
+        with self._lock:
+            if self._closed:
+                return False
+            self.received += 1
+            if self._in_flight == fingerprint:
+                self.dropped += 1
+                return False
+            if self._pending is not None:
+                self.coalesced += 1
+                if self._pending.fingerprint == fingerprint:
+                    self._pending.count += 1
+                    self._pending.message = message
+                    return False
+            self._pending = _PendingError(message, fingerprint, time.monotonic())
+            self._idle.clear()
+            if self._timer is None and self._in_flight is None:
+                self._start_timer()
+        return True
+
+    def _start_timer(self) -> None:
+        self._timer = threading.Timer(self.debounce, self._flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush(self) -> None:
+        with self._lock:
+            self._timer = None
+            if self._in_flight is not None or self._closed:
+                return
+            pending, self._pending = self._pending, None
+            if pending is None:
+                self._idle.set()
+                return
+            self._in_flight = pending.fingerprint
+            self.dispatched += 1
+        started = threading.Event()
+
+        def run() -> None:
+            started.set()
+            self._run(pending)
+
+        try:
+            future = self._dispatch(run)
+        except Exception:  # noqa: BLE001 - e.g. executor shut down
+            logger.exception("Could not schedule runtime error repair")
+            self._finish()
+            return
+        if isinstance(future, concurrent.futures.Future):
+            future.add_done_callback(lambda _future: None if started.is_set() else self._finish())
+
+    def _start_thread(self, run: Callable[[], None]) -> None:
+        threading.Thread(target=run, name=self._name, daemon=True).start()
+
+    def _is_stale(self, pending: _PendingError) -> bool:
+        try:
+            return self._fingerprint(pending.message) != pending.fingerprint
+        except Exception:  # noqa: BLE001 - a broken fingerprint must not stall the queue
+            return False
+
+    def _run(self, pending: _PendingError) -> None:
+        try:
+            if self._is_stale(pending):
+                logger.debug("Dropping stale runtime error (code changed since it was reported)")
+                with self._lock:
+                    self.stale += 1
+                return
+            self._handler(pending.message, pending.count)
+        except GenerationCancelled:
+            logger.debug("Runtime error repair cancelled")
+        except Exception:  # noqa: BLE001 - keep the intake alive for the next error
+            logger.exception("Runtime error repair failed")
+        finally:
+            self._finish()
+
+    def _finish(self) -> None:
+        with self._lock:
+            self._in_flight = None
+            if self._pending is None or self._closed:
+                self._idle.set()
+            elif self._timer is None:
+                self._start_timer()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until queued and running repairs are done; False on timeout."""
+        return self._idle.wait(timeout)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._pending = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._in_flight is None:
+                self._idle.set()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "received": self.received,
+                "coalesced": self.coalesced,
+                "dropped_in_flight": self.dropped,
+                "stale": self.stale,
+                "dispatched": self.dispatched,
+                "in_flight": self._in_flight is not None,
+            }
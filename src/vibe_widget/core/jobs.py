@@ -0,0 +1,227 @@
+"""Per-kernel executor for frontend-triggered LLM jobs.
+
+Grab edits, audits, audit-apply and runtime repairs used to run their
+multi-second LLM calls inside traitlets observers, blocking the kernel's comm
+loop so every other widget froze. Observers now submit a job and return:
+
+- jobs run on a small pool of worker threads shared by all widgets
+- jobs for the same widget run one at a time, in submission order within a
+  priority (interactive edits before repairs before audits)
+- ``supersede=True`` drops queued jobs of the same kind for that widget and
+  cancels a running one through its CancellationToken, so a newer edit
+  replaces a stale one instead of queueing behind it
+
+Each job runs inside `cancellation_scope(job.token)`; LLM calls made by the job
+see the token and stop when it is cancelled.
+"""
+from __future__ import annotations
+
+import concurrent.futures
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from vibe_widget.llm.cancellation import CancellationToken, GenerationCancelled, cancellation_scope
+from vibe_widget.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+MAX_JOB_WORKERS = 4
+
+# Lower runs first.
+PRIORITY_EDIT = 0
+PRIORITY_REPAIR = 1
+PRIORITY_AUDIT = 2
+
+
+@dataclass
+class Job:
+    id: int
+    widget: str
+    kind: str
+    priority: int
+    fn: Callable[[CancellationToken], Any]
+    token: CancellationToken = field(default_factory=CancellationToken)
+    future: concurrent.futures.Future = field(default_factory=concurrent.futures.Future)
+    status: str = "queued"  # queued, running, done, failed, cancelled, superseded
+    submitted: float = field(default_factory=time.monotonic)
+    started: float | None = None
+    finished: float | None = None
+
+    def cancel(self, reason: str = "Cancelled") -> bool:
+        return self.token.cancel(reason)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "widget": self.widget,
+            "kind": self.kind,
+            "priority": self.priority,
+            "status": self.status,
+            "wait_s": (self.started or time.monotonic()) - self.submitted,
+            "run_s": ((self.finished or time.monotonic()) - self.started) if self.started else None,
+        }
+
+
+class JobExecutor:
+    """Priority job queue with per-widget serialization and supersede."""
+
+    def __init__(self, max_workers: int = MAX_JOB_WORKERS, name: str = "vibe-widget-job"):
+        self.max_workers = max_workers
+        self._name = name
+        self._cond = threading.Condition()
+        self._queued: list[Job] = []
+        self._running: dict[str, Job] = {}
+        self._workers: list[threading.Thread] = []
+        self._ids = itertools.count(1)
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.superseded = 0
+
+    def submit(
+        self,
+        widget: str,
+        kind: str,
+        fn: Callable[[CancellationToken], Any],
+        *,
+        priority: int = PRIORITY_EDIT,
+        supersede: bool = False,
+    ) -> Job:
+        """Queue ``fn(token)`` for ``widget``; returns the Job (its future holds the result)."""
+        job = Job(id=next(self._ids), widget=widget, kind=kind, priority=priority, fn=fn)
+        with self._cond:
+            if supersede:
+                for stale in [j for j in self._queued if j.widget == widget and j.kind == kind]:
+                    self._queued.remove(stale)
+                    self._settle(stale, "superseded")
+                    stale.future.set_exception(GenerationCancelled("Superseded by a newer request"))
+                running = self._running.get(widget)
+                if running is not None and running.kind == kind:
+                    running.status = "superseded"
+                    running.cancel("Superseded by a newer request")
+            self._queued.append(job)
+            self._ensure_workers()
+            self._cond.notify_all()
+        return job
+
+    def _ensure_workers(self) -> None:
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(
+                target=self._work, name=f"{self._name}-{len(self._workers)}", daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def _next_job(self) -> Job | None:
+        ready = [job for job in self._queued if job.widget not in self._running]
+        if not ready:
+            return None
+        return min(ready, key=lambda job: (job.priority, job.id))
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next_job()
+                self._queued.remove(job)
+                self._running[job.widget] = job
+                job.status = "running"
+                job.started = time.monotonic()
+            self._run(job)
+            with self._cond:
+                self._running.pop(job.widget, None)
+                self._cond.notify_all()
+
+    def _run(self, job: Job) -> None:
+        try:
+            with cancellation_scope(job.token):
+                job.token.raise_if_cancelled()
+                result = job.fn(job.token)
+        except GenerationCancelled as exc:
+            self._settle(job, "superseded" if job.status == "superseded" else "cancelled")
+            job.future.set_exception(exc)
+        except BaseException as exc:  # noqa: BLE001 - reported through the future
+            logger.exception("%s job for %s failed", job.kind, job.widget)
+            self._settle(job, "failed")
+            job.future.set_exception(exc)
+        else:
+            self._settle(job, "superseded" if job.status == "superseded" else "done")
+            job.future.set_result(result)
+
+    def _settle(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished = time.monotonic()
+        if status == "done":
+            self.completed += 1
+        elif status == "failed":
+            self.failed += 1
+        elif status == "cancelled":
+            self.cancelled += 1
+        elif status == "superseded":
+            self.superseded += 1
+
+    def cancel_widget(self, widget: str, reason: str = "Cancelled") -> int:
+        """Cancel every queued and running job for ``widget``."""
+        with self._cond:
+            queued = [job for job in self._queued if job.widget == widget]
+            for job in queued:
+                self._queued.remove(job)
+                self._settle(job, "cancelled")
+                job.future.set_exception(GenerationCancelled(reason))
+            running = self._running.get(widget)
+        count = len(queued)
+        if running is not None and running.cancel(reason):
+            count += 1
+        return count
+
+    def jobs(self, widget: str | None = None) -> list[Job]:
+        with self._cond:
+            jobs = list(self._running.values()) + list(self._queued)
+        return [job for job in jobs if widget is None or job.widget == widget]
+
+    def wait(self, widget: str | None = None, timeout: float | None = None) -> bool:
+        """Block until no job (for ``widget``, or at all) is queued or running."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                busy = [
+                    job for job in list(self._running.values()) + self._queued
+                    if widget is None or job.widget == widget
+                ]
+                if not busy:
+                    return True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "queued": len(self._queued),
+                "running": len(self._running),
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "superseded": self.superseded,
+                "jobs": [job.to_dict() for job in list(self._running.values()) + self._queued],
+            }
+
+
+_EXECUTOR: JobExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_job_executor() -> JobExecutor:
+    """Return the kernel-wide job executor, creating it on first use."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = JobExecutor()
+        return _EXECUTOR
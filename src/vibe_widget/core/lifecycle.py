@@ -16,15 +16,17 @@ VALID_STATUSES = {
     "ready",
     "error",
     "blocked",
+    "cancelled",
 }
 
 ALLOWED_TRANSITIONS = {
     "idle": {"generating"},
-    "generating": {"ready", "error", "blocked"},
+    "generating": {"ready", "error", "blocked", "cancelled"},
     "ready": {"generating", "retrying", "error", "blocked"},
-    "retrying": {"ready", "error", "blocked"},
+    "retrying": {"ready", "error", "blocked", "cancelled"},
     "error": {"retrying", "generating", "blocked", "ready"},
     "blocked": {"retrying", "generating", "ready"},
+    "cancelled": {"generating", "retrying", "ready"},
 }
 
 
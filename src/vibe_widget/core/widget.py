@@ -3,7 +3,9 @@ Core VibeWidget implementation.
 Clean, robust widget generation without legacy profile logic.
 """
 from pathlib import Path
-from typing import Any, Union
+from typing import Any, Callable, Union
+import asyncio
+import concurrent.futures
 import json
 import inspect
 import sys
@@ -20,7 +22,13 @@ from vibe_widget.api import (
     ActionBundle,
 )
 from vibe_widget.utils.code_parser import CodeStreamParser, RevisionStreamParser
+from vibe_widget.llm.budget import GenerationBudget
+from vibe_widget.llm.cancellation import CancellationToken, GenerationCancelled
+from vibe_widget.llm.completion_cache import clear_completion_cache
 from vibe_widget.llm.providers.base import LLMProvider
+from vibe_widget.llm.tools.execution_tools import ErrorDiagnoseTool
+from vibe_widget.llm.tools.validation_cache import clear_validation_cache
+from vibe_widget.llm.telemetry import get_metrics_store
 from vibe_widget.config import (
     DEFAULT_MODEL,
     Config,
@@ -31,6 +39,7 @@ from vibe_widget.config import (
 from vibe_widget.llm.providers.openrouter_provider import OpenRouterProvider
 
 from vibe_widget.utils.widget_store import WidgetStore
+from vibe_widget.utils.summary_cache import clear_summary_cache
 from vibe_widget.utils.audit_store import AuditStore, compute_code_hash
 from vibe_widget.utils.util import (
     clean_for_json,
@@ -40,11 +49,15 @@ from vibe_widget.utils.util import (
     summarize_for_prompt,
 )
 from vibe_widget.themes import Theme, clear_theme_cache
+from vibe_widget.core.background import run_in_background
+from vibe_widget.core.error_intake import ErrorIntake
+from vibe_widget.core.jobs import PRIORITY_AUDIT, PRIORITY_EDIT, PRIORITY_REPAIR, get_job_executor
 from vibe_widget.core.state import StateManager
 from vibe_widget.core.lifecycle import WidgetLifecycle
 from vibe_widget.services.audit import AuditService
 from vibe_widget.services.generation import GenerationService
 from vibe_widget.services.repair import RepairService
+from vibe_widget.services.repair_cache import clear_repair_cache
 from vibe_widget.services.theme import ThemeService
 from vibe_widget.utils.logging import get_logger
 
@@ -113,6 +126,9 @@ class VibeWidget(anywidget.AnyWidget):
     widget_logs = traitlets.List([]).tag(sync=True)
     retry_count = traitlets.Int(0).tag(sync=True)
     grab_edit_request = traitlets.Dict({}).tag(sync=True)
+    cancel_request = traitlets.Dict({}).tag(sync=True)
+    # Set while generation/edit work runs off the kernel thread, where a cancel_request can be handled.
+    cancellable = traitlets.Bool(False).tag(sync=True)
     action_event = traitlets.Dict({}).tag(sync=True)
     audit_state = traitlets.Dict({}).tag(sync=True)
     execution_state = traitlets.Dict({}).tag(sync=True)
@@ -174,6 +190,7 @@ class VibeWidget(anywidget.AnyWidget):
         execution_mode: str | None = None,
         execution_approved: bool | None = None,
         execution_approved_hash: str | None = None,
+        background: bool = False,
         **kwargs,
     ) -> "VibeWidget":
         """Return a widget instance that includes traitlets for declared exports/imports."""
@@ -212,6 +229,7 @@ class VibeWidget(anywidget.AnyWidget):
             execution_mode=execution_mode,
             execution_approved=execution_approved,
             execution_approved_hash=execution_approved_hash,
+            background=background,
             **init_values,
             **kwargs,
         )
@@ -236,6 +254,7 @@ class VibeWidget(anywidget.AnyWidget):
         execution_mode: str | None = None,
         execution_approved: bool | None = None,
         execution_approved_hash: str | None = None,
+        background: bool = False,
         **kwargs
     ):
         """
@@ -252,6 +271,8 @@ class VibeWidget(anywidget.AnyWidget):
             base_components: Optional list of component names from base widget
             base_widget_id: Optional ID of base widget for provenance tracking
             cache: If False, bypass widget cache and regenerate
+            background: If True, return immediately in "generating" status and
+                fill in code from a background event loop
             **kwargs: Additional widget parameters
         """
         parser = CodeStreamParser()
@@ -261,6 +282,8 @@ class VibeWidget(anywidget.AnyWidget):
         self._actions = kwargs.pop("actions", None) or {}
         self._action_params = kwargs.pop("action_params", None) or {}
         self._input_summaries = kwargs.pop("input_summaries", None)
+        generation_limiter = kwargs.pop("generation_limiter", None)
+        generation_budget = kwargs.pop("generation_budget", None)
         self._input_sampling = input_sampling
         self._export_accessors: dict[str, ExportHandle] = {}
         self._state = StateManager(self)
@@ -274,6 +297,17 @@ class VibeWidget(anywidget.AnyWidget):
         self._generation_service: GenerationService | None = None
         self._audit_service: AuditService | None = None
         self._repair_service: RepairService | None = None
+        self._diagnose_tool = ErrorDiagnoseTool()
+        self._error_intake = ErrorIntake(
+            self._repair_runtime_error,
+            self._error_fingerprint,
+            name=f"vibe-widget-repair-{id(self):x}",
+            dispatch=self._dispatch_repair,
+        )
+        self._edit_seq = 0
+        self._generation_future = None
+        self._cancel_token: CancellationToken | None = None
+        self._metrics_scope = f"widget-{id(self):x}"
         
         app_wrapper_dir = Path(__file__).resolve().parents[1]
         app_wrapper_path = app_wrapper_dir / "AppWrapper.bundle.js"
@@ -331,6 +365,7 @@ class VibeWidget(anywidget.AnyWidget):
         self.observe(self._on_error, names='error_message')
         self.observe(self._on_widget_error, names='widget_error')
         self.observe(self._on_grab_edit, names='grab_edit_request')
+        self.observe(self._on_cancel_request, names='cancel_request')
         self.observe(self._on_audit_state, names='audit_state')
         self.observe(self._on_code_change, names='code')
         self.observe(self._on_execution_state, names='execution_state')
@@ -341,6 +376,7 @@ class VibeWidget(anywidget.AnyWidget):
             
             resolved_model, config = _resolve_model(model)
             provider = OpenRouterProvider(resolved_model, config.api_key)
+            provider.metrics_scope = self._metrics_scope
             self._generation_service = GenerationService(provider)
             self._audit_service = AuditService()
             self._llm_provider = provider
@@ -425,59 +461,7 @@ class VibeWidget(anywidget.AnyWidget):
             
             self.logs = self.logs + ["Generating widget code"]
             
-            chunk_buffer = []
-            update_counter = 0
-            last_pattern_count = 0
-            
-            def stream_callback(event_type: str, message: str):
-                """Handle progress events from orchestrator."""
-                nonlocal update_counter, last_pattern_count
-                
-                event_messages = {
-                    "step": f"{message}",
-                    "thinking": f"{message[:150]}",
-                    "complete": f"✓ {message}",
-                    "error": f"✘ {message}",
-                    "chunk": message,
-                }
-                
-                display_msg = event_messages.get(event_type, message)
-                
-                if event_type == "chunk":
-                    chunk_buffer.append(message)
-                    update_counter += 1
-                    
-                    updates = parser.parse_chunk(message)
-                    
-                    should_update = (
-                        update_counter % 30 == 0 or 
-                        parser.has_new_pattern() or
-                        len(''.join(chunk_buffer)) > 500
-                    )
-                    
-                    if should_update:
-                        if chunk_buffer:
-                            chunk_buffer.clear()
-                        
-                        for update in updates:
-                            if update["type"] == "micro_bubble":
-                                current_logs = list(self.logs)
-                                current_logs.append(update["message"])
-                                self.logs = current_logs
-                        
-                        current_pattern_count = len(parser.detected)
-                        if current_pattern_count == last_pattern_count and update_counter % 100 == 0:
-                            current_logs = list(self.logs)
-                            current_logs.append(f"Generating code ({update_counter} chunks)")
-                            self.logs = current_logs
-                        last_pattern_count = current_pattern_count
-                else:
-                    current_logs = list(self.logs)
-                    current_logs.append(display_msg)
-                    self.logs = current_logs
-            
-            # Generate code using the agentic orchestrator
-            widget_code, _ = self._generation_service.generate(
+            generation_kwargs = dict(
                 description=description,
                 outputs=self._exports,
                 inputs=self._imports,
@@ -487,50 +471,232 @@ class VibeWidget(anywidget.AnyWidget):
                 base_code=self._base_code,
                 base_components=self._base_components,
                 theme_description=self._theme.description if self._theme else None,
-                progress_callback=stream_callback,
+                progress_callback=self._make_stream_callback(parser),
+                cancel_token=self._new_cancel_token(),
+                budget=generation_budget,
             )
-            
-            current_logs = list(self.logs)
-            current_logs.append(f"Code generated: {len(widget_code)} characters")
-            self.logs = current_logs
-            
-            # Save to widget store (reuse store instance from cache lookup)
-            notebook_path = store.get_notebook_path()
-            widget_entry = store.save(
-                widget_code=widget_code,
+            finish_kwargs = dict(
+                store=store,
                 description=description,
                 var_name=var_name,
                 data_shape=df.shape,
                 model=resolved_model,
-                exports=self._exports,
                 imports_serialized=imports_serialized,
-                theme_name=self._theme.name if self._theme else None,
-                theme_description=self._theme.description if self._theme else None,
-                notebook_path=notebook_path,
-                revision_parent=self._base_widget_id,
+                inputs_for_prompt=inputs_for_prompt,
             )
             
-            self.logs = self.logs + [f"Widget saved: {widget_entry.get('var_name', 'widget')}"]
-            self.logs = self.logs + [f"Location: .vibewidget/widgets/{widget_entry['file_name']}"]
-            self.code = widget_code
-            self._set_status("ready")
-            self.description = description
-            self._widget_metadata = widget_entry
+            if background:
+                self.logs = self.logs + ["Generating in background (widget.wait() blocks until ready)"]
+                self.cancellable = True
+                self._generation_future = run_in_background(
+                    self._generate_in_background(generation_kwargs, finish_kwargs, generation_limiter)
+                )
+                return
             
-            # Store data_info for error recovery  (build from LLMProvider method)
-            self.data_info = LLMProvider.build_data_info(
-                outputs=self._exports,
-                inputs=inputs_for_prompt,
-                actions=self._actions,
-                action_params=self._action_params,
-                theme_description=self._theme.description if self._theme else None,
-            )
+            # Generate code using the agentic orchestrator
+            widget_code, _ = self._generation_service.generate(**generation_kwargs)
+            self._finish_generation(widget_code, **finish_kwargs)
             
+        except GenerationCancelled as e:
+            self._mark_cancelled(str(e))
+        except KeyboardInterrupt:
+            self.cancel("Interrupted")
+            self._mark_cancelled("Interrupted")
+            raise
         except Exception as e:
             self._set_status("error")
             self.logs = self.logs + [f"Error: {str(e)}"]
             raise
 
+    def _make_stream_callback(self, parser: CodeStreamParser):
+        """Build the progress callback that turns orchestrator events into logs."""
+        chunk_buffer = []
+        update_counter = 0
+        last_pattern_count = 0
+        
+        def stream_callback(event_type: str, message: str):
+            """Handle progress events from orchestrator."""
+            nonlocal update_counter, last_pattern_count
+            
+            event_messages = {
+                "step": f"{message}",
+                "thinking": f"{message[:150]}",
+                "complete": f"✓ {message}",
+                "error": f"✘ {message}",
+                "chunk": message,
+            }
+            
+            display_msg = event_messages.get(event_type, message)
+            
+            if event_type == "chunk":
+                chunk_buffer.append(message)
+                update_counter += 1
+                
+                updates = parser.parse_chunk(message)
+                
+                should_update = (
+                    update_counter % 30 == 0 or 
+                    parser.has_new_pattern() or
+                    len(''.join(chunk_buffer)) > 500
+                )
+                
+                if should_update:
+                    if chunk_buffer:
+                        chunk_buffer.clear()
+                    
+                    for update in updates:
+                        if update["type"] == "micro_bubble":
+                            current_logs = list(self.logs)
+                            current_logs.append(update["message"])
+                            self.logs = current_logs
+                    
+                    current_pattern_count = len(parser.detected)
+                    if current_pattern_count == last_pattern_count and update_counter % 100 == 0:
+                        current_logs = list(self.logs)
+                        current_logs.append(f"Generating code ({update_counter} chunks)")
+                        self.logs = current_logs
+                    last_pattern_count = current_pattern_count
+            else:
+                current_logs = list(self.logs)
+                current_logs.append(display_msg)
+                self.logs = current_logs
+
+        return stream_callback
+
+    def _finish_generation(
+        self,
+        widget_code: str,
+        *,
+        store: WidgetStore,
+        description: str,
+        var_name: str | None,
+        data_shape: tuple[int, ...],
+        model: str,
+        imports_serialized: dict[str, Any],
+        inputs_for_prompt: dict[str, Any],
+    ) -> None:
+        """Persist freshly generated code and mark the widget ready."""
+        current_logs = list(self.logs)
+        current_logs.append(f"Code generated: {len(widget_code)} characters")
+        self.logs = current_logs
+        
+        # Save to widget store (reuse store instance from cache lookup)
+        notebook_path = store.get_notebook_path()
+        widget_entry = store.save(
+            widget_code=widget_code,
+            description=description,
+            var_name=var_name,
+            data_shape=data_shape,
+            model=model,
+            exports=self._exports,
+            imports_serialized=imports_serialized,
+            theme_name=self._theme.name if self._theme else None,
+            theme_description=self._theme.description if self._theme else None,
+            notebook_path=notebook_path,
+            revision_parent=self._base_widget_id,
+        )
+        
+        self.logs = self.logs + [f"Widget saved: {widget_entry.get('var_name', 'widget')}"]
+        self.logs = self.logs + [f"Location: .vibewidget/widgets/{widget_entry['file_name']}"]
+        self.code = widget_code
+        self._set_status("ready")
+        self.description = description
+        # Budget use is per run, so it is kept off the stored (cache) entry.
+        self._widget_metadata = {**widget_entry, "budget": self.orchestrator.artifacts.get("budget")}
+        
+        # Store data_info for error recovery  (build from LLMProvider method)
+        self.data_info = LLMProvider.build_data_info(
+            outputs=self._exports,
+            inputs=inputs_for_prompt,
+            actions=self._actions,
+            action_params=self._action_params,
+            theme_description=self._theme.description if self._theme else None,
+        )
+
+    async def _generate_in_background(
+        self,
+        generation_kwargs: dict[str, Any],
+        finish_kwargs: dict[str, Any],
+        limiter: Any | None = None,
+    ) -> str | None:
+        """Run generation on the background loop and fill in `code` when ready.
+
+        ``limiter`` is an optional async context manager (e.g. a batch semaphore)
+        held for the whole generate/validate/repair run. Returns None if the
+        generation was cancelled.
+        """
+        try:
+            if limiter is not None:
+                if getattr(limiter, "locked", lambda: False)():
+                    self.logs = self.logs + ["Queued: waiting for a free generation slot"]
+                async with limiter:
+                    self.logs = self.logs + ["Generation slot acquired"]
+                    widget_code, _ = await self._generation_service.generate_async(**generation_kwargs)
+            else:
+                widget_code, _ = await self._generation_service.generate_async(**generation_kwargs)
+            self._finish_generation(widget_code, **finish_kwargs)
+            return widget_code
+        except GenerationCancelled as exc:
+            self._mark_cancelled(str(exc))
+            return None
+        except Exception as exc:
+            self._set_status("error")
+            self.logs = self.logs + [f"Error: {str(exc)}"]
+            logger.warning("Background generation failed: %s", exc)
+            raise
+        finally:
+            self.cancellable = False
+
+    def wait(self, timeout: float | None = None) -> "VibeWidget":
+        """Block until background generation and queued edit/repair/audit jobs finish.
+
+        Re-raises the generation error, if any. Interrupting the kernel while
+        waiting cancels the generation.
+        """
+        future = getattr(self, "_generation_future", None)
+        try:
+            if future is not None:
+                future.result(timeout)
+            get_job_executor().wait(self._metrics_scope, timeout)
+        except KeyboardInterrupt:
+            self.cancel("Interrupted")
+            raise
+        return self
+
+    def cancel(self, reason: str = "Cancelled by user") -> bool:
+        """Cancel the in-flight generation or edit, closing its LLM stream.
+
+        The widget moves to ``cancelled`` (or back to ``ready`` for an edit).
+        Returns False if nothing was running.
+        """
+        token = self._cancel_token
+        if token is None or not token.cancel(reason):
+            return False
+        self.logs = self.logs + [f"Cancelling: {reason}"]
+        return True
+
+    def _new_cancel_token(self) -> CancellationToken:
+        token = CancellationToken()
+        self._cancel_token = token
+        return token
+
+    def _mark_cancelled(self, reason: str) -> None:
+        self._set_status("cancelled")
+        self.logs = self.logs + [f"✗ Generation cancelled: {reason or 'Cancelled'}"]
+
+    def _on_cancel_request(self, change):
+        """Handle the frontend cancel button (shown only while `cancellable`)."""
+        if change['new']:
+            self.cancel("Cancelled from the widget")
+
+    def stats(self) -> dict[str, Any]:
+        """Latency and token percentiles for the LLM calls made for this widget.
+
+        Grouped per model and call type (generate, revise, patch, fix, audit);
+        see `vw.stats()` for the whole session.
+        """
+        return get_metrics_store().stats(scope=self._metrics_scope)
+
     def __getattribute__(self, name: str):
         """Return callable handles for exports to support import chaining."""
         if not name.startswith("_") and name not in {"outputs", "actions", "component"}:
@@ -918,6 +1084,7 @@ class VibeWidget(anywidget.AnyWidget):
         if provider is None:
             resolved_model, config = _resolve_model(widget_metadata.get("model"))
             provider = OpenRouterProvider(resolved_model, config.api_key)
+            provider.metrics_scope = self._metrics_scope
 
         result = self._audit_service.run_audit(
             code=self.code,
@@ -953,9 +1120,19 @@ class VibeWidget(anywidget.AnyWidget):
             self._handle_audit_apply_request(apply_request)
 
     def _handle_audit_request(self, request: dict[str, Any]) -> None:
-        """Handle audit requests from the frontend."""
+        """Queue an audit requested by the frontend on the kernel job executor."""
         if self.audit_status == "running":
             return
+        get_job_executor().submit(
+            self._metrics_scope,
+            "audit",
+            lambda _token: self._run_audit_request(request),
+            priority=PRIORITY_AUDIT,
+            supersede=True,
+        )
+
+    def _run_audit_request(self, request: dict[str, Any]) -> None:
+        """Run a frontend audit request (on the kernel job executor)."""
         level = str(request.get("level", "fast")).lower()
         reuse = bool(request.get("reuse", True))
         try:
@@ -991,7 +1168,17 @@ class VibeWidget(anywidget.AnyWidget):
         self.audit_apply_status = "running"
         self.audit_apply_error = ""
         self._set_status("generating")
+        get_job_executor().submit(
+            self._metrics_scope,
+            "audit_apply",
+            lambda token: self._run_audit_apply(changes, base_code, token),
+            priority=PRIORITY_EDIT,
+        )
 
+    def _run_audit_apply(self, changes: list[Any], base_code: str, token: CancellationToken) -> None:
+        """Apply audit changes through the LLM (on the kernel job executor)."""
+        self._cancel_token = token
+        self.cancellable = True
         change_lines = []
         for item in changes:
             if not isinstance(item, dict):
@@ -1024,6 +1211,7 @@ class VibeWidget(anywidget.AnyWidget):
                 code=base_code,
                 revision_request=revision_request,
                 data_info=self.data_info,
+                cancel_token=token,
             )
             self.code = revised_code
             self._set_status("ready")
@@ -1035,10 +1223,11 @@ class VibeWidget(anywidget.AnyWidget):
             self.audit_apply_response = {"success": False, "error": str(exc)}
             self._set_status("ready")
         finally:
+            self.cancellable = False
             self._update_audit_state(apply_request={})
     
     def _on_error(self, change):
-        """Called when frontend reports a runtime error."""
+        """Called when frontend reports a runtime error; repairs run via the error intake."""
         error_msg = change["new"]
 
         if error_msg:
@@ -1055,18 +1244,39 @@ class VibeWidget(anywidget.AnyWidget):
         if not error_msg:
             return
 
+        self._error_intake.submit(error_msg)
+        # Reset right away so a repeated identical error fires the observer again.
+        self.error_message = ""
+
+    def _error_fingerprint(self, error_msg: str) -> str:
+        """Identity of a runtime error: the code it came from plus its normalized signature."""
+        code = self.code or ""
+        diagnosis = self._diagnose_tool.execute(error_message=error_msg, code=code)
+        signature = diagnosis.output.get("signature") or error_msg.strip()
+        return f"{compute_code_hash(code)}:{signature}"
+
+    def _dispatch_repair(self, run: Callable[[], None]):
+        job = get_job_executor().submit(
+            self._metrics_scope, "repair", lambda _token: run(), priority=PRIORITY_REPAIR
+        )
+        return job.future
+
+    def _repair_runtime_error(self, error_msg: str, occurrences: int = 1) -> None:
+        """Repair one coalesced runtime error (runs on the error intake's worker thread)."""
+        if self._repair_service is None:
+            return
+
         if self.retry_count >= RepairService.MAX_RETRIES:
             self._set_status("blocked")
             self.logs = self.logs + ["Repair blocked: retry limit reached"]
-            self.error_message = ""
             return
 
         self.retry_count += 1
         self._set_status("retrying")
 
         error_preview = error_msg.split("\n")[0][:100]
-        self.logs = self.logs + [f"Error detected: {error_preview}"]
-        self.logs = self.logs + ["Asking LLM to fix the error"]
+        repeated = f" (reported {occurrences} times)" if occurrences > 1 else ""
+        self.logs = self.logs + [f"Error detected: {error_preview}{repeated}", "Asking LLM to fix the error"]
 
         result = self._repair_service.fix_runtime_error(
             code=self.code,
@@ -1079,8 +1289,9 @@ class VibeWidget(anywidget.AnyWidget):
             self.logs = self.logs + ["Code fixed, retrying"]
             self.code = result.code
             self._set_status("ready")
-            self.error_message = ""
-            self.retry_count = 0
+            # A replayed repair keeps counting, so cached repairs cannot cycle.
+            if not result.cached:
+                self.retry_count = 0
             return
 
         self.logs = self.logs + [result.message or "Fix attempt failed"]
@@ -1088,7 +1299,6 @@ class VibeWidget(anywidget.AnyWidget):
             self._set_status("error")
         else:
             self._set_status("blocked")
-        self.error_message = ""
 
     def _append_widget_log(self, message: str, *, level: str = "info", source: str = "python") -> None:
         logs = list(self.widget_logs or [])
@@ -1254,7 +1464,11 @@ class VibeWidget(anywidget.AnyWidget):
         return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
 
     def _on_grab_edit(self, change):
-        """Handle element edit requests from frontend (React Grab)."""
+        """Handle element edit requests from frontend (React Grab).
+
+        The edit runs on the kernel job executor; a newer edit for this widget
+        supersedes (cancels) one that is still queued or running.
+        """
         request = change['new']
         if not request:
             return
@@ -1269,12 +1483,35 @@ class VibeWidget(anywidget.AnyWidget):
             self.logs = ['✘ Edit failed: LLM service unavailable']
             return
         
+        self._edit_seq += 1
+        seq = self._edit_seq
+        self.edit_in_progress = True
+        if self.status != "generating":
+            self._set_status("generating")
+        self.logs = [f"Editing: {user_prompt[:50]}{'...' if len(user_prompt) > 50 else ''}"]
+        get_job_executor().submit(
+            self._metrics_scope,
+            "edit",
+            lambda token: self._run_grab_edit(element_desc, user_prompt, token, seq),
+            priority=PRIORITY_EDIT,
+            supersede=True,
+        )
+        # Reset right away so an identical follow-up request fires the observer again.
+        self.grab_edit_request = {}
+
+    def _run_grab_edit(
+        self,
+        element_desc: dict,
+        user_prompt: str,
+        token: CancellationToken,
+        seq: int,
+    ) -> None:
+        """Apply one grab edit (on the kernel job executor)."""
+        self._cancel_token = token
+        self.cancellable = True
         old_code = self.code
         previous_metadata = self._widget_metadata
         self._pending_old_code = old_code
-        self.edit_in_progress = True
-        self._set_status("generating")
-        self.logs = [f"Editing: {user_prompt[:50]}{'...' if len(user_prompt) > 50 else ''}"]
         
         old_position = 0
         showed_analyzing = False
@@ -1328,6 +1565,7 @@ class VibeWidget(anywidget.AnyWidget):
                 revision_request=revision_request,
                 data_info=self.data_info,
                 progress_callback=progress_callback,
+                cancel_token=token,
             )
             
             self.code = revised_code
@@ -1360,18 +1598,21 @@ class VibeWidget(anywidget.AnyWidget):
             var_name = widget_entry.get('var_name', 'widget')
             self.logs = self.logs + [f"Saved: {var_name} (cache: {widget_entry['cache_key'][:8]}...)"]
             
-        except Exception as e:
-            if "cancelled" in str(e).lower():
-                self.code = old_code
+        except (GenerationCancelled, KeyboardInterrupt):
+            self.code = old_code
+            superseded = seq != self._edit_seq
+            if not superseded:
                 self._set_status("ready")
-                self.logs = self.logs + ['✗ Edit cancelled']
-            else:
-                self._set_status("error")
-                self.logs = self.logs + [f'✘ Edit failed: {str(e)}']
+            self.logs = self.logs + ['✗ Edit superseded' if superseded else '✗ Edit cancelled']
+        except Exception as e:
+            self._set_status("error")
+            self.logs = self.logs + [f'✘ Edit failed: {str(e)}']
         
-        self.edit_in_progress = False
-        self.grab_edit_request = {}
-        self._pending_old_code = None
+        self.cancellable = False
+        # A newer edit owns the in-progress state once it has been requested.
+        if seq == self._edit_seq:
+            self.edit_in_progress = False
+            self._pending_old_code = None
 
     def _build_grab_revision_request(self, element_desc: dict, user_prompt: str) -> str:
         """Build a revision request that identifies the element for the LLM."""
@@ -1589,6 +1830,9 @@ def create(
     theme: Theme | str | None = None,
     display: bool = True,
     cache: bool = True,
+    background: bool = False,
+    deadline: float | None = None,
+    token_budget: int | None = None,
 ) -> VibeWidget:
     """Create a VibeWidget visualization with automatic data processing.
 
@@ -1601,12 +1845,20 @@ def create(
         theme: Theme object, theme name, or prompt string
         display: Whether to display the widget immediately (IPython environments only)
         cache: If False, bypass cache and regenerate widget/theme
+        background: If True, return the widget immediately in "generating" status
+            and fill in its code when ready; call `widget.wait()` to block
+        deadline: Optional wall-clock budget (seconds) for generation and repair;
+            repairs get cheaper as it runs down and the best code so far is kept
+            when it runs out (usage is recorded in the widget metadata's "budget")
+        token_budget: Optional budget of prompt + completion tokens, used the same way
 
     Returns:
         VibeWidget instance
 
     Examples:
         >>> scatter_plot = create("show temperature trends", df)
+        >>> slow_chart = create("3D terrain of elevation", df, background=True)
+        >>> quick_chart = create("bar chart of sales by region", df, deadline=60)
         >>> sales_chart = create("visualize sales data", "sales.csv")
     """
     # Capture the variable name from the caller's assignment
@@ -1614,6 +1866,42 @@ def create(
     from vibe_widget.utils.widget_store import capture_caller_var_name
     var_name = capture_caller_var_name(depth=2)
 
+    return _create_widget(
+        description=description,
+        data=data,
+        outputs=outputs,
+        inputs=inputs,
+        actions=actions,
+        theme=theme,
+        display=display,
+        cache=cache,
+        background=background,
+        var_name=var_name,
+        deadline=deadline,
+        token_budget=token_budget,
+    )
+
+
+def _create_widget(
+    *,
+    description: str,
+    data: Any,
+    outputs: dict[str, str] | OutputBundle | None,
+    inputs: dict[str, Any] | InputsBundle | None,
+    actions: dict[str, str] | ActionBundle | None,
+    theme: Theme | str | None,
+    display: bool,
+    cache: bool,
+    background: bool,
+    var_name: str | None,
+    generation_limiter: Any | None = None,
+    deadline: float | None = None,
+    token_budget: int | None = None,
+) -> VibeWidget:
+    """Shared implementation of `create` and `create_many`."""
+    budget = None
+    if deadline is not None or token_budget is not None:
+        budget = GenerationBudget(deadline=deadline, max_tokens=token_budget)
     data, outputs, inputs, actions, action_params, _var_name = _normalize_api_inputs(
         data=data,
         outputs=outputs,
@@ -1644,6 +1932,9 @@ def create(
         execution_approved=None,
         actions=actions,
         action_params=action_params,
+        background=background,
+        generation_limiter=generation_limiter,
+        generation_budget=budget,
     )
 
     _link_imports(widget, inputs)
@@ -1662,6 +1953,104 @@ def create(
     return widget
 
 
+_CREATE_SPEC_KEYS = {
+    "description", "data", "outputs", "inputs", "actions", "theme", "cache", "var_name",
+    "deadline", "token_budget",
+}
+
+
+async def _new_batch_limiter(max_concurrency: int) -> asyncio.Semaphore:
+    # Created on the background loop, which is where generations await it; on
+    # Python 3.9 a semaphore binds to the loop current at construction.
+    return asyncio.Semaphore(max_concurrency)
+
+
+def create_many(
+    specs: list[dict[str, Any] | str],
+    *,
+    max_concurrency: int = 4,
+    display: bool = True,
+    cache: bool = True,
+    wait: bool = True,
+    timeout: float | None = None,
+) -> list[VibeWidget]:
+    """Create several widgets, generating cache misses concurrently.
+
+    Each spec is a description string or a dict of `create` arguments
+    (description, data, outputs, inputs, actions, theme, cache, var_name).
+    Widgets are built in order, so cached widgets are ready immediately; misses
+    are generated on the background loop with at most ``max_concurrency``
+    running at once (LLM calls are additionally capped per provider). Each
+    widget streams its own progress into ``widget.logs``.
+
+    Args:
+        specs: Widget specs, in the order results should be returned
+        max_concurrency: Maximum number of generations running at once
+        display: Whether to display each widget as soon as it is created
+        cache: Default cache setting for specs that do not set one
+        wait: If True, block until every widget has finished generating
+        timeout: Optional overall timeout (seconds) when waiting
+
+    Returns:
+        Widgets in the same order as ``specs``. Failed generations are left in
+        "error" status rather than raising.
+
+    Examples:
+        >>> revenue, churn, funnel = vw.create_many([
+        ...     {"description": "monthly revenue line chart", "data": df, "var_name": "revenue"},
+        ...     {"description": "churn by cohort heatmap", "data": df},
+        ...     "signup funnel with drop-off percentages",
+        ... ])
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    normalized: list[dict[str, Any]] = []
+    for index, spec in enumerate(specs):
+        if isinstance(spec, str):
+            spec = {"description": spec}
+        if not isinstance(spec, dict) or not spec.get("description"):
+            raise ValueError(f"Spec {index} must be a description string or a dict with 'description'")
+        unknown = set(spec) - _CREATE_SPEC_KEYS
+        if unknown:
+            raise ValueError(f"Spec {index} has unknown keys: {sorted(unknown)}")
+        normalized.append(spec)
+
+    limiter = run_in_background(_new_batch_limiter(max_concurrency)).result()
+    widgets: list[VibeWidget] = []
+    for spec in normalized:
+        widgets.append(
+            _create_widget(
+                description=spec["description"],
+                data=spec.get("data"),
+                outputs=spec.get("outputs"),
+                inputs=spec.get("inputs"),
+                actions=spec.get("actions"),
+                theme=spec.get("theme"),
+                display=display,
+                cache=spec.get("cache", cache),
+                background=True,
+                var_name=spec.get("var_name"),
+                generation_limiter=limiter,
+                deadline=spec.get("deadline"),
+                token_budget=spec.get("token_budget"),
+            )
+        )
+
+    if wait:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for widget in widgets:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                widget.wait(remaining)
+            except concurrent.futures.TimeoutError:
+                logger.warning("create_many: timed out; remaining widgets keep generating in background")
+                break
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("create_many: %s failed: %s", widget.description[:40], exc)
+    return widgets
+
+
 class _SourceInfo:
     """Container for resolved source information."""
     def __init__(
@@ -2016,8 +2405,10 @@ def load(path: str | Path, approval: bool = True, display: bool = True) -> VibeW
 
 
 def clear(target: Union["VibeWidget", str] = "all") -> dict[str, int]:
-    """Clear cached widgets, themes, audits, or a specific widget's cache."""
-    results = {"widgets": 0, "themes": 0, "audits": 0}
+    """Clear cached widgets, themes, audits, summaries, completions, validations, repairs, or a specific widget's cache."""
+    results = {
+        "widgets": 0, "themes": 0, "audits": 0, "summaries": 0, "completions": 0, "validations": 0, "repairs": 0,
+    }
 
     if isinstance(target, VibeWidget):
         metadata = getattr(target, "_widget_metadata", {}) or {}
@@ -2033,6 +2424,10 @@ def clear(target: Union["VibeWidget", str] = "all") -> dict[str, int]:
             results["widgets"] = WidgetStore().clear()
             results["audits"] = AuditStore().clear()
             results["themes"] = clear_theme_cache()
+            results["summaries"] = clear_summary_cache()
+            results["completions"] = clear_completion_cache()
+            results["validations"] = clear_validation_cache()
+            results["repairs"] = clear_repair_cache()
             return results
         if normalized in {"widget", "widgets"}:
             results["widgets"] = WidgetStore().clear()
@@ -2043,9 +2438,34 @@ def clear(target: Union["VibeWidget", str] = "all") -> dict[str, int]:
         if normalized in {"theme", "themes"}:
             results["themes"] = clear_theme_cache()
             return results
+        if normalized in {"summary", "summaries"}:
+            results["summaries"] = clear_summary_cache()
+            return results
+        if normalized in {"completion", "completions"}:
+            results["completions"] = clear_completion_cache()
+            return results
+        if normalized in {"validation", "validations"}:
+            results["validations"] = clear_validation_cache()
+            return results
+        if normalized in {"repair", "repairs"}:
+            results["repairs"] = clear_repair_cache()
+            return results
 
         results["widgets"] = WidgetStore().clear_for_widget(var_name=target)
         results["audits"] = AuditStore().clear_for_widget(widget_slug=target)
         return results
 
     raise TypeError("vw.clear expects a cache type string or a VibeWidget instance.")
+
+
+def stats(reset: bool = False) -> dict[str, Any]:
+    """Latency and token percentiles for every LLM call made in this session.
+
+    Grouped per model and call type (generate, revise, fix, audit, theme, ...).
+    With ``reset=True`` the collected records are cleared after reading.
+    """
+    store = get_metrics_store()
+    result = store.stats()
+    if reset:
+        store.reset()
+    return result
@@ -1,9 +1,26 @@
+import asyncio
 from typing import Any, Callable, Tuple
 
 
+from vibe_widget.config import get_fastest_model, get_global_config
+from vibe_widget.llm.autofix import autofix, get_autofix_stats
+from vibe_widget.llm.budget import (
+    STRATEGY_AUTOFIX,
+    STRATEGY_FULL,
+    STRATEGY_STATIC,
+    GenerationBudget,
+)
+from vibe_widget.llm.cancellation import (
+    CancellationToken,
+    GenerationCancelled,
+    cancellation_scope,
+    check_cancelled,
+)
 from vibe_widget.llm.providers.base import LLMProvider
+from vibe_widget.llm.repair_race import RepairCandidate, plan_candidates, race_repairs, race_repairs_async
 # Tool imports
 from vibe_widget.llm.tools.data_tools import DataLoadTool, DataProfileTool, DataWrangleTool
+from vibe_widget.llm.tools.base import ToolResult
 from vibe_widget.llm.tools.code_tools import CodeValidateTool
 from vibe_widget.llm.tools.execution_tools import RuntimeTestTool, ErrorDiagnoseTool
 
@@ -16,8 +33,8 @@ class AgenticOrchestrator:
     1. Receive DataFrame (already processed by DataProcessor)
     2. Generate code with LLM provider
     3. Validate code (Python-based)
-    4. If errors: repair with LLM
-    5. Return final code
+    4. If errors: repair with LLM (cheaper strategies as a generation budget shrinks)
+    5. Return final code (the best code seen if the budget ran out)
     """
     
     def __init__(
@@ -51,6 +68,8 @@ class AgenticOrchestrator:
         base_components: list[str] | None = None,
         theme_description: str | None = None,
         progress_callback: Callable[[str, str], None] | None = None,
+        cancel_token: CancellationToken | None = None,
+        budget: GenerationBudget | None = None,
     ) -> Tuple[str, None]:
         """
         Generate widget code from description and summarized inputs.
@@ -63,107 +82,222 @@ class AgenticOrchestrator:
             base_code: Optional base widget code for composition/revision
             base_components: Optional list of component names from base widget
             progress_callback: Optional callback for progress updates
+            cancel_token: Optional token; cancelling it closes the stream and
+                raises GenerationCancelled
+            budget: Optional wall-clock/token budget; repairs degrade as it
+                shrinks and the best code so far is returned when it runs out
+                (consumption is recorded in ``artifacts["budget"]``)
         
         Returns:
             Tuple of (widget_code, None)
         """
-        outputs = outputs or {}
-        inputs = inputs or {}
-        input_summaries = input_summaries or inputs or {}
-        actions = actions or {}
-        action_params = action_params or {}
-        base_components = base_components or []
-        
-        self._emit(progress_callback, "step", "Analyzing data")
-        
-        # Build data context for LLM using base class method
-        data_info = LLMProvider.build_data_info(
-            outputs=outputs,
-            inputs=input_summaries,
-            actions=actions,
-            action_params=action_params,
-            theme_description=theme_description,
-        )
+        budget = budget or GenerationBudget()
+        with cancellation_scope(cancel_token), budget.scope():
+            outputs = outputs or {}
+            inputs = inputs or {}
+            input_summaries = input_summaries or inputs or {}
+            actions = actions or {}
+            action_params = action_params or {}
+            base_components = base_components or []
+            self.artifacts["autofixes"] = []
+            self.artifacts["budget"] = budget.to_dict()
         
-        if input_summaries:
-            self._emit(progress_callback, "step", f"Inputs: {len(input_summaries)}")
+            self._emit(progress_callback, "step", "Analyzing data")
         
-        # Determine if this is a revision or fresh generation
-        if base_code:
-            self._emit(progress_callback, "step", "Revising widget based on base code...")
-            code = self.provider.revise_widget_code(
-                current_code=base_code,
-                revision_description=description,
-                data_info=data_info,
-                base_code=None,  # Already in current_code
-                base_components=base_components,
-                progress_callback=lambda msg: self._emit(progress_callback, "chunk", msg),
-            )
-        else:
-            # Generate code with LLM provider
-            self._emit(progress_callback, "step", "Generating widget code...")
-            code = self.provider.generate_widget_code(
-                description=description,
-                data_info=data_info,
-                progress_callback=lambda msg: self._emit(progress_callback, "chunk", msg),
+            # Build data context for LLM using base class method
+            data_info = LLMProvider.build_data_info(
+                outputs=outputs,
+                inputs=input_summaries,
+                actions=actions,
+                action_params=action_params,
+                theme_description=theme_description,
             )
         
-        # Validate code
-        self._emit(progress_callback, "step", "Validating code")
-        validation = self.validate_tool.execute(
-            code=code,
-            expected_exports=list(outputs.keys()),
-            expected_imports=list(inputs.keys()),
-        )
+            if input_summaries:
+                self._emit(progress_callback, "step", f"Inputs: {len(input_summaries)}")
         
-        # Runtime test
-        self._emit(progress_callback, "step", "Testing runtime")
-        runtime = self.runtime_tool.execute(code=code)
+            # Determine if this is a revision or fresh generation
+            if base_code:
+                self._emit(progress_callback, "step", "Revising widget based on base code...")
+                code = self.provider.revise_widget_code(
+                    current_code=base_code,
+                    revision_description=description,
+                    data_info=data_info,
+                    base_code=None,  # Already in current_code
+                    base_components=base_components,
+                    progress_callback=lambda msg: self._emit(progress_callback, "chunk", msg),
+                )
+            else:
+                # Generate code with LLM provider
+                self._emit(progress_callback, "step", "Generating widget code...")
+                code = self.provider.generate_widget_code(
+                    description=description,
+                    data_info=data_info,
+                    progress_callback=lambda msg: self._emit(progress_callback, "chunk", msg),
+                )
         
-        # Repair loop if needed
-        repair_attempts = 0
-        while repair_attempts < self.max_repair_attempts:
-            issues = []
-            
-            if not validation.success:
-                issues.extend(validation.output.get("issues", []))
-            if not runtime.success:
-                issues.extend(runtime.output.get("issues", []))
-            
-            if not issues:
-                break
-            
-            repair_attempts += 1
-            self._emit(progress_callback, "step", f"Repairing code (attempt {repair_attempts})...")
-            # print out all issues
-            for issue in issues:
-                self._emit(progress_callback, "chunk", f"Issue: {issue}")
-                print(f"Issue: {issue}")
-            
-            # Use provider's fix_code_error for first issue if it's a clear error
-            if len(issues) == 1 and ("error" in issues[0].lower() or "exception" in issues[0].lower()):
-                code = self.provider.fix_code_error(
-                    broken_code=code,
-                    error_message=issues[0],
+            # Validate code
+            check_cancelled()
+            self._emit(progress_callback, "step", "Validating code")
+            validation, runtime = self._check_code(code, outputs, inputs, progress_callback)
+            best = (code, validation, runtime)
+        
+            # Repair loop if needed
+            try:
+                repair_attempts = 0
+                while repair_attempts < self.max_repair_attempts:
+                    code, validation, runtime = self._apply_autofixes(
+                        code, validation, runtime, outputs, inputs, progress_callback
+                    )
+                    best = self._better(best, (code, validation, runtime))
+                    issues = self._collect_issues(validation, runtime)
+                    if not issues:
+                        break
+
+                    check_cancelled()
+                    strategy = budget.strategy()
+                    if strategy == STRATEGY_AUTOFIX:
+                        self._emit(progress_callback, "step", "Generation budget spent; keeping the best code so far")
+                        break
+                    repair_attempts += 1
+                    self._report_issues(issues, repair_attempts, progress_callback)
+
+                    code = self._repair(code, issues, data_info, outputs, inputs, strategy)
+
+                    # Re-validate
+                    validation, runtime = self._check_code(
+                        code, outputs, inputs, run_runtime=strategy != STRATEGY_STATIC
+                    )
+                    best = self._better(best, (code, validation, runtime))
+                else:
+                    code, validation, runtime = self._apply_autofixes(code, validation, runtime, outputs, inputs)
+                    best = self._better(best, (code, validation, runtime))
+            except GenerationCancelled:
+                if not budget.expired:
+                    raise
+                self._emit(progress_callback, "step", "Generation deadline reached; keeping the best code so far")
+            code, validation, _ = best
+        
+            self._emit(progress_callback, "complete", "Widget generation complete")
+        
+            # Store artifacts
+            self.artifacts["generated_code"] = code
+            self.artifacts["validation"] = validation.output
+        self.artifacts["budget"] = budget.to_dict()
+        
+        return code, None
+
+    async def generate_async(
+        self,
+        description: str,
+        outputs: dict[str, str] | None = None,
+        inputs: dict[str, str] | None = None,
+        input_summaries: dict[str, str] | None = None,
+        actions: dict[str, str] | None = None,
+        action_params: dict[str, dict[str, str] | None] | None = None,
+        base_code: str | None = None,
+        base_components: list[str] | None = None,
+        theme_description: str | None = None,
+        progress_callback: Callable[[str, str], None] | None = None,
+        cancel_token: CancellationToken | None = None,
+        budget: GenerationBudget | None = None,
+    ) -> Tuple[str, None]:
+        """
+        Async variant of `generate`.
+        
+        LLM calls go through the provider's async methods; validation and the
+        Node runtime check run in worker threads so the event loop stays free.
+        Cancelling ``cancel_token`` cancels the in-flight request task.
+        """
+        budget = budget or GenerationBudget()
+        with cancellation_scope(cancel_token), budget.scope():
+            outputs = outputs or {}
+            inputs = inputs or {}
+            input_summaries = input_summaries or inputs or {}
+            actions = actions or {}
+            action_params = action_params or {}
+            base_components = base_components or []
+            self.artifacts["autofixes"] = []
+            self.artifacts["budget"] = budget.to_dict()
+        
+            self._emit(progress_callback, "step", "Analyzing data")
+            data_info = LLMProvider.build_data_info(
+                outputs=outputs,
+                inputs=input_summaries,
+                actions=actions,
+                action_params=action_params,
+                theme_description=theme_description,
+            )
+        
+            if input_summaries:
+                self._emit(progress_callback, "step", f"Inputs: {len(input_summaries)}")
+        
+            if base_code:
+                self._emit(progress_callback, "step", "Revising widget based on base code...")
+                code = await self.provider.revise_widget_code_async(
+                    current_code=base_code,
+                    revision_description=description,
                     data_info=data_info,
+                    base_code=None,
+                    base_components=base_components,
+                    progress_callback=lambda msg: self._emit(progress_callback, "chunk", msg),
                 )
             else:
-                # For validation issues, build a repair prompt manually
-                code = self._repair_with_issues(code, issues, data_info)
-            
-            # Re-validate
-            validation = self.validate_tool.execute(
-                code=code,
-                expected_exports=list(outputs.keys()),
-                expected_imports=list(inputs.keys()),
+                self._emit(progress_callback, "step", "Generating widget code...")
+                code = await self.provider.generate_widget_code_async(
+                    description=description,
+                    data_info=data_info,
+                    progress_callback=lambda msg: self._emit(progress_callback, "chunk", msg),
+                )
+        
+            check_cancelled()
+            self._emit(progress_callback, "step", "Validating code")
+            validation, runtime = await asyncio.to_thread(
+                self._check_code, code, outputs, inputs, progress_callback
             )
-            runtime = self.runtime_tool.execute(code=code)
+            best = (code, validation, runtime)
+        
+            try:
+                repair_attempts = 0
+                while repair_attempts < self.max_repair_attempts:
+                    code, validation, runtime = await asyncio.to_thread(
+                        self._apply_autofixes, code, validation, runtime, outputs, inputs, progress_callback
+                    )
+                    best = self._better(best, (code, validation, runtime))
+                    issues = self._collect_issues(validation, runtime)
+                    if not issues:
+                        break
+
+                    check_cancelled()
+                    strategy = budget.strategy()
+                    if strategy == STRATEGY_AUTOFIX:
+                        self._emit(progress_callback, "step", "Generation budget spent; keeping the best code so far")
+                        break
+                    repair_attempts += 1
+                    self._report_issues(issues, repair_attempts, progress_callback)
+
+                    code = await self._repair_async(code, issues, data_info, outputs, inputs, strategy)
+
+                    validation, runtime = await asyncio.to_thread(
+                        self._check_code, code, outputs, inputs, run_runtime=strategy != STRATEGY_STATIC
+                    )
+                    best = self._better(best, (code, validation, runtime))
+                else:
+                    code, validation, runtime = await asyncio.to_thread(
+                        self._apply_autofixes, code, validation, runtime, outputs, inputs
+                    )
+                    best = self._better(best, (code, validation, runtime))
+            except GenerationCancelled:
+                if not budget.expired:
+                    raise
+                self._emit(progress_callback, "step", "Generation deadline reached; keeping the best code so far")
+            code, validation, _ = best
         
-        self._emit(progress_callback, "complete", "Widget generation complete")
+            self._emit(progress_callback, "complete", "Widget generation complete")
         
-        # Store artifacts
-        self.artifacts["generated_code"] = code
-        self.artifacts["validation"] = validation.output
+            self.artifacts["generated_code"] = code
+            self.artifacts["validation"] = validation.output
+        self.artifacts["budget"] = budget.to_dict()
         
         return code, None
     
@@ -221,6 +355,7 @@ class AgenticOrchestrator:
         revision_request: str,
         data_info: dict[str, Any],
         progress_callback: Callable[[str, str], None] | None = None,
+        cancel_token: CancellationToken | None = None,
     ) -> str:
         """
         Revise widget code based on user request.
@@ -230,31 +365,208 @@ class AgenticOrchestrator:
             revision_request: User's revision request
             data_info: Data context information
             progress_callback: Optional progress callback
+            cancel_token: Optional token to cancel the revision
         
         Returns:
             Revised widget code
         """
-        self._emit(progress_callback, "step", "Revising widget code...")
+        with cancellation_scope(cancel_token):
+            self._emit(progress_callback, "step", "Revising widget code...")
         
-        revised_code = self.provider.revise_widget_code(
-            current_code=code,
-            revision_description=revision_request,
-            data_info=data_info,
-            progress_callback=lambda msg: self._emit(progress_callback, "chunk", msg),
-        )
+            revised_code = self.provider.revise_widget_code(
+                current_code=code,
+                revision_description=revision_request,
+                data_info=data_info,
+                progress_callback=lambda msg: self._emit(progress_callback, "chunk", msg),
+            )
         
-        # Validate
-        self._emit(progress_callback, "step", "Validating revision...")
-        validation = self.validate_tool.execute(code=revised_code)
+            # Validate
+            self._emit(progress_callback, "step", "Validating revision...")
+            validation = self.validate_tool.execute(code=revised_code)
+            fixed = autofix(revised_code, validation.output.get("codes", []))
+            if fixed.changed:
+                self._emit(progress_callback, "step", f"Auto-fixed: {', '.join(fixed.applied)}")
+                revised_code = fixed.code
+                validation = self.validate_tool.execute(code=revised_code)
+                get_autofix_stats().record(fixed.applied, resolved=validation.success)
         
-        if not validation.success:
-            self._emit(progress_callback, "step", "Fixing validation issues...")
-            issues = validation.output.get("issues", [])
-            revised_code = self._repair_with_issues(revised_code, issues, data_info)
+            if not validation.success:
+                check_cancelled()
+                self._emit(progress_callback, "step", "Fixing validation issues...")
+                issues = validation.output.get("issues", [])
+                revised_code = self._repair_with_issues(revised_code, issues, data_info)
         
-        self._emit(progress_callback, "complete", "Revision complete")
-        return revised_code
+            self._emit(progress_callback, "complete", "Revision complete")
+            return revised_code
     
+    def _check_code(
+        self,
+        code: str,
+        outputs: dict[str, str],
+        inputs: dict[str, Any],
+        progress_callback: Callable[[str, str], None] | None = None,
+        run_runtime: bool = True,
+    ):
+        """Run static validation and the runtime test; returns both tool results.
+
+        With ``run_runtime=False`` (a shrinking generation budget) the Node
+        runtime test is skipped and reported as passing.
+        """
+        validation = self.validate_tool.execute(
+            code=code,
+            expected_exports=list(outputs.keys()),
+            expected_imports=list(inputs.keys()),
+        )
+        if not run_runtime:
+            return validation, ToolResult(success=True, output={"issues": [], "skipped": True})
+        self._emit(progress_callback, "step", "Testing runtime")
+        runtime = self.runtime_tool.execute(code=code)
+        return validation, runtime
+
+    def _repair_message(self, issues: list[str]) -> str:
+        # A single clear error goes to the model as-is; otherwise list every issue.
+        return issues[0] if self._is_single_error(issues) else self._format_issues(issues)
+
+    @staticmethod
+    def _repair_candidates(strategy: str = STRATEGY_FULL) -> list[RepairCandidate]:
+        if strategy != STRATEGY_FULL:
+            # Budget is short: one request on the fastest model, no race.
+            return [RepairCandidate(index=0, temperature=0.3, model=get_fastest_model())]
+        config = get_global_config()
+        return plan_candidates(getattr(config, "repair_fanout", 1), getattr(config, "repair_models", None))
+
+    def _better(self, best, candidate):
+        """Keep whichever (code, validation, runtime) has fewer issues; ties go to the newer one."""
+        if len(self._collect_issues(*candidate[1:])) <= len(self._collect_issues(*best[1:])):
+            return candidate
+        return best
+
+    def _passes(self, code: str, outputs: dict[str, str], inputs: dict[str, Any]) -> bool:
+        return not self._collect_issues(*self._check_code(code, outputs, inputs))
+
+    def _repair(
+        self,
+        code: str,
+        issues: list[str],
+        data_info: dict[str, Any],
+        outputs: dict[str, str],
+        inputs: dict[str, Any],
+        strategy: str = STRATEGY_FULL,
+    ) -> str:
+        """One repair round: a single fix request, or a race of candidates (`Config.repair_fanout`).
+
+        ``strategy`` comes from the generation budget; anything cheaper than
+        "full" sends one request to the fastest model.
+        """
+        error_message = self._repair_message(issues)
+        candidates = self._repair_candidates(strategy)
+        if len(candidates) == 1:
+            return self.provider.fix_code_error(
+                broken_code=code,
+                error_message=error_message,
+                data_info=data_info,
+                model=candidates[0].model,
+            )
+        repaired, _ = race_repairs(
+            lambda candidate: self.provider.fix_code_error(
+                broken_code=code,
+                error_message=error_message,
+                data_info=data_info,
+                temperature=candidate.temperature,
+                model=candidate.model,
+            ),
+            candidates,
+            lambda candidate_code: self._passes(candidate_code, outputs, inputs),
+        )
+        return repaired
+
+    async def _repair_async(
+        self,
+        code: str,
+        issues: list[str],
+        data_info: dict[str, Any],
+        outputs: dict[str, str],
+        inputs: dict[str, Any],
+        strategy: str = STRATEGY_FULL,
+    ) -> str:
+        """Async counterpart of `_repair`."""
+        error_message = self._repair_message(issues)
+        candidates = self._repair_candidates(strategy)
+        if len(candidates) == 1:
+            return await self.provider.fix_code_error_async(
+                broken_code=code,
+                error_message=error_message,
+                data_info=data_info,
+                model=candidates[0].model,
+            )
+        repaired, _ = await race_repairs_async(
+            lambda candidate: self.provider.fix_code_error_async(
+                broken_code=code,
+                error_message=error_message,
+                data_info=data_info,
+                temperature=candidate.temperature,
+                model=candidate.model,
+            ),
+            candidates,
+            lambda candidate_code: self._passes(candidate_code, outputs, inputs),
+        )
+        return repaired
+
+    def _apply_autofixes(
+        self,
+        code: str,
+        validation,
+        runtime,
+        outputs: dict[str, str],
+        inputs: dict[str, Any],
+        progress_callback: Callable[[str, str], None] | None = None,
+    ):
+        """Apply deterministic fixes for the issue codes that fired, then revalidate.
+
+        The fixed code is kept only if it does not introduce new issues.
+        """
+        fixed = autofix(code, validation.output.get("codes", []))
+        if not fixed.changed:
+            return code, validation, runtime
+        new_validation, new_runtime = self._check_code(fixed.code, outputs, inputs)
+        before = self._collect_issues(validation, runtime)
+        after = self._collect_issues(new_validation, new_runtime)
+        if len(after) > len(before):
+            return code, validation, runtime
+        self._emit(progress_callback, "step", f"Auto-fixed: {', '.join(fixed.applied)}")
+        get_autofix_stats().record(fixed.applied, resolved=bool(before) and not after)
+        self.artifacts.setdefault("autofixes", []).extend(fixed.applied)
+        return fixed.code, new_validation, new_runtime
+
+    @staticmethod
+    def _collect_issues(validation, runtime) -> list[str]:
+        issues: list[str] = []
+        if not validation.success:
+            issues.extend(validation.output.get("issues", []))
+        if not runtime.success:
+            issues.extend(runtime.output.get("issues", []))
+        return issues
+
+    @staticmethod
+    def _is_single_error(issues: list[str]) -> bool:
+        return len(issues) == 1 and ("error" in issues[0].lower() or "exception" in issues[0].lower())
+
+    @staticmethod
+    def _format_issues(issues: list[str]) -> str:
+        return "Validation issues:\n" + "\n".join(f"- {issue}" for issue in issues)
+
+    def _report_issues(
+        self,
+        issues: list[str],
+        attempt: int,
+        progress_callback: Callable[[str, str], None] | None,
+    ) -> None:
+        self._emit(progress_callback, "step", f"Repairing code (attempt {attempt})...")
+        # print out all issues
+        for issue in issues:
+            self._emit(progress_callback, "chunk", f"Issue: {issue}")
+            print(f"Issue: {issue}")
+
     def _repair_with_issues(
         self,
         code: str,
@@ -262,11 +574,9 @@ class AgenticOrchestrator:
         data_info: dict[str, Any],
     ) -> str:
         """Repair code using provider with list of issues."""
-        error_message = "Validation issues:\n" + "\n".join(f"- {issue}" for issue in issues)
-        
         return self.provider.fix_code_error(
             broken_code=code,
-            error_message=error_message,
+            error_message=self._format_issues(issues),
             data_info=data_info,
         )
     
@@ -0,0 +1,308 @@
+"""
+Deterministic autofixes for mechanical validation issues.
+
+Several issues reported by CodeValidateTool have a single safe fix that needs
+no model: ``className=`` inside htm templates, string ``style`` attributes,
+unpinned esm.sh imports, default/namespace React imports and a missing
+``model.save_changes()``. `autofix(code, codes)` applies the rule for each
+issue code that fired (see ``output["codes"]`` of the validation result) and
+returns the transformed code; the orchestrator revalidates and only sends
+what is left to `fix_code_error`. Rules rewrite token spans found by
+`js_scan.tokenize`, so text in strings and comments is never touched, and a
+rule that cannot fix its issue unambiguously leaves the code alone.
+"""
+from __future__ import annotations
+
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+from vibe_widget.llm.tools.js_scan import Token, scan, tokenize
+from vibe_widget.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Versions used to pin bare esm.sh imports; unknown packages are left alone.
+PINNED_CDN_VERSIONS = {
+    "d3": "7",
+    "topojson-client": "3",
+    "lodash-es": "4",
+    "chart.js": "4",
+    "plotly.js-dist-min": "2",
+    "vega": "5",
+    "vega-lite": "5",
+    "vega-embed": "6",
+    "leaflet": "1.9",
+    "three": "0.160.0",
+    "regl": "2",
+    "dayjs": "1",
+}
+
+_CLASSNAME_RE = re.compile(r"\bclassName(?=\s*=)")
+_STYLE_ATTR_RE = re.compile(r"""\bstyle\s*=\s*(?:(["'])([^"'`$\\]*)\1|\{\s*(["'])([^"'`$\\]*)\3\s*\})""")
+_STYLE_OPEN_RE = re.compile(r"\bstyle\s*=\s*$")
+_ESM_SH = "https://esm.sh/"
+
+Edit = tuple[int, int, str]
+
+
+@dataclass
+class AutofixResult:
+    code: str
+    applied: list[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.applied)
+
+
+def _apply_edits(code: str, edits: list[Edit]) -> str:
+    """Apply non-overlapping (start, end, replacement) edits."""
+    result = []
+    cursor = 0
+    for start, end, replacement in sorted(edits):
+        if start < cursor:
+            continue
+        result.append(code[cursor:start])
+        result.append(replacement)
+        cursor = end
+    result.append(code[cursor:])
+    return "".join(result)
+
+
+def _html_text_tokens(tokens: list[Token]) -> Iterable[tuple[int, Token]]:
+    for k, token in enumerate(tokens):
+        if token.kind == "template_text" and token.tag == "html":
+            yield k, token
+
+
+def css_to_object_literal(css: str) -> str | None:
+    """``"color: red; font-size: 12px"`` -> ``{ color: "red", fontSize: "12px" }``."""
+    entries = []
+    for declaration in css.split(";"):
+        if not declaration.strip():
+            continue
+        prop, sep, value = declaration.partition(":")
+        prop, value = prop.strip(), value.strip()
+        if not sep or not prop or not value or not re.fullmatch(r"-{0,2}[A-Za-z][\w-]*", prop):
+            return None
+        if prop.startswith("--"):
+            key = json.dumps(prop)
+        else:
+            key = re.sub(r"-([a-z])", lambda m: m.group(1).upper(), prop.lstrip("-"))
+        entries.append(f"{key}: {json.dumps(value)}")
+    if not entries:
+        return None
+    return "{ " + ", ".join(entries) + " }"
+
+
+def fix_classname(code: str) -> str | None:
+    edits: list[Edit] = []
+    for _, token in _html_text_tokens(tokenize(code)):
+        for match in _CLASSNAME_RE.finditer(token.value):
+            start = token.pos + match.start()
+            edits.append((start, start + len("className"), "class"))
+    return _apply_edits(code, edits) if edits else None
+
+
+def fix_string_style(code: str) -> str | None:
+    tokens = tokenize(code)
+    edits: list[Edit] = []
+    for k, token in _html_text_tokens(tokens):
+        for match in _STYLE_ATTR_RE.finditer(token.value):
+            css = match.group(2) if match.group(1) else match.group(4)
+            literal = css_to_object_literal(css)
+            if literal is None:
+                continue
+            edits.append((token.pos + match.start(), token.pos + match.end(), f"style=${{{literal}}}"))
+        # style=${"color: red"}: the string must be the whole substitution.
+        if (
+            _STYLE_OPEN_RE.search(token.value)
+            and k + 2 < len(tokens)
+            and tokens[k + 1].kind == "string"
+            and tokens[k + 2].kind == "template_text"
+            and "\\" not in tokens[k + 1].value
+        ):
+            string = tokens[k + 1]
+            literal = css_to_object_literal(string.value)
+            if literal is not None:
+                edits.append((string.pos, string.pos + len(string.value) + 2, literal))
+    return _apply_edits(code, edits) if edits else None
+
+
+def _pinned_specifier(specifier: str) -> str | None:
+    path = specifier[len(_ESM_SH):]
+    parts = path.split("/")
+    count = 2 if path.startswith("@") else 1
+    package = "/".join(parts[:count])
+    if "@" in package.lstrip("@") or package not in PINNED_CDN_VERSIONS:
+        return None
+    rest = "/".join(parts[count:])
+    pinned = f"{_ESM_SH}{package}@{PINNED_CDN_VERSIONS[package]}"
+    return f"{pinned}/{rest}" if rest else pinned
+
+
+def fix_unpinned_cdn(code: str) -> str | None:
+    edits: list[Edit] = []
+    for token in tokenize(code):
+        if token.kind != "string" or not token.value.startswith(_ESM_SH):
+            continue
+        pinned = _pinned_specifier(token.value)
+        if pinned is not None:
+            edits.append((token.pos + 1, token.pos + 1 + len(token.value), pinned))
+    return _apply_edits(code, edits) if edits else None
+
+
+def _destructured_param_close(tokens: list[Token]) -> int | None:
+    """Token index of the ``}`` closing the default export's destructured first parameter."""
+    for k in range(len(tokens) - 1):
+        if tokens[k].value == "export" and tokens[k + 1].value == "default":
+            j = k + 2
+            while j < len(tokens) and tokens[j].value != "(":
+                j += 1
+            if j + 1 >= len(tokens) or tokens[j + 1].value != "{":
+                return None
+            depth = 0
+            for m in range(j + 1, len(tokens)):
+                if tokens[m].value == "{":
+                    depth += 1
+                elif tokens[m].value == "}":
+                    depth -= 1
+                    if depth == 0:
+                        return m
+            return None
+    return None
+
+
+def fix_react_import(code: str) -> str | None:
+    facts = scan(code)
+    edits: list[Edit] = []
+    removed_react = False
+    for ref in facts.react_imports:
+        if ref.kind != "static" or ref.end < 0:
+            continue
+        # Only bindings the host provides can be dropped; named imports need the model.
+        if re.fullmatch(r"(?:\*\s*as\s+)?React", ref.clause):
+            removed_react = True
+        elif not re.fullmatch(r"(?:\*\s*as\s+)?ReactDOM", ref.clause) or facts.reactdom_render:
+            continue
+        end = ref.end + 1 if code[ref.end:ref.end + 1] == "\n" else ref.end
+        edits.append((ref.pos, end, ""))
+    if not edits:
+        return None
+    export = facts.default_export
+    if removed_react and (export is None or "React" not in export.params):
+        tokens = tokenize(code)
+        close = _destructured_param_close(tokens)
+        if close is None:
+            return None
+        # Insert right after the last destructured name: "{ model, html }" -> "{ model, html, React }".
+        previous = tokens[close - 1]
+        if previous.value == ",":
+            edits.append((previous.pos + 1, previous.pos + 1, " React"))
+        elif previous.value == "{":
+            edits.append((previous.pos + 1, previous.pos + 1, " React "))
+        else:
+            anchor = previous.pos + len(previous.value) + (2 if previous.kind == "string" else 0)
+            edits.append((anchor, anchor, ", React"))
+    return _apply_edits(code, edits)
+
+
+def fix_missing_save_changes(code: str) -> str | None:
+    tokens = tokenize(code)
+    edits: list[Edit] = []
+    for k in range(len(tokens) - 3):
+        if not (
+            tokens[k].kind == "ident"
+            and tokens[k].value == "model"
+            and (k == 0 or tokens[k - 1].value != ".")
+            and tokens[k + 1].value == "."
+            and tokens[k + 2].value == "set"
+            and tokens[k + 3].value == "("
+        ):
+            continue
+        depth = 0
+        close = None
+        for m in range(k + 3, len(tokens)):
+            value = tokens[m].value if tokens[m].kind == "punct" else ""
+            if value in ("(", "["):
+                depth += 1
+            elif value in (")", "]"):
+                depth -= 1
+                if depth == 0:
+                    close = m
+                    break
+        if close is None:
+            return None
+        following = tokens[close + 1] if close + 1 < len(tokens) else None
+        statement = k == 0 or (tokens[k - 1].kind == "punct" and tokens[k - 1].value in ";{}")
+        if statement and following is not None and following.value == ";":
+            edits.append((following.pos + 1, following.pos + 1, " model.save_changes();"))
+        else:
+            # Expression position (e.g. an arrow body): keep it one expression.
+            edits.append((tokens[k].pos, tokens[k].pos, "("))
+            edits.append((tokens[close].pos + 1, tokens[close].pos + 1, ", model.save_changes())"))
+    return _apply_edits(code, edits) if edits else None
+
+
+RULES: dict[str, Callable[[str], str | None]] = {
+    "classname": fix_classname,
+    "string-style": fix_string_style,
+    "unpinned-cdn": fix_unpinned_cdn,
+    "react-import": fix_react_import,
+    "missing-save-changes": fix_missing_save_changes,
+}
+
+
+class AutofixStats:
+    """Counts autofix runs and the LLM repairs they made unnecessary."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.rules: dict[str, int] = {}
+        self.repairs_avoided = 0
+
+    def record(self, applied: list[str], *, resolved: bool) -> None:
+        with self._lock:
+            self.runs += 1
+            for rule in applied:
+                self.rules[rule] = self.rules.get(rule, 0) + 1
+            if resolved:
+                self.repairs_avoided += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "rules": dict(self.rules),
+                "repairs_avoided": self.repairs_avoided,
+            }
+
+
+_STATS = AutofixStats()
+
+
+def get_autofix_stats() -> AutofixStats:
+    """Return the process-wide autofix counters."""
+    return _STATS
+
+
+def autofix(code: str, codes: Iterable[str]) -> AutofixResult:
+    """Apply the rule for each fixable issue code; unknown codes are ignored."""
+    result = AutofixResult(code=code)
+    for issue_code in dict.fromkeys(codes):
+        rule = RULES.get(issue_code)
+        if rule is None:
+            continue
+        try:
+            fixed = rule(result.code)
+        except Exception as exc:  # noqa: BLE001 - a broken rule must not break generation
+            logger.debug("Autofix rule %s failed: %s", issue_code, exc)
+            continue
+        if fixed is not None and fixed != result.code:
+            result.code = fixed
+            result.applied.append(issue_code)
+    return result
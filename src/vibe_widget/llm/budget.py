@@ -0,0 +1,179 @@
+"""
+Wall-clock and token budgets for one widget generation.
+
+`vw.create(..., deadline=60, token_budget=50000)` bounds the whole
+generate/validate/repair run, which is otherwise bounded only by the repair
+attempt count. The orchestrator asks the budget for a strategy before each
+repair round and degrades as it shrinks:
+
+- "full": the configured repair (candidate race, configured models) and the
+  Node runtime test
+- "fast": a single repair request on the fastest manifest model
+- "static": as "fast", but candidates are checked by static validation only
+- "autofix": deterministic autofixes only, no more LLM calls
+
+When the deadline passes, the budget cancels its CancellationToken (a child of
+the widget's token), which closes the in-flight stream; the orchestrator then
+returns the best code seen so far. Tokens are charged by the provider as each
+call reports usage; calls that were aborted or cancelled (guard aborts, hedge
+legs and repair candidates that lost, the call the deadline cut off) report no
+usage and are charged an estimate of their prompt and streamed output. Tokens
+only steer the strategy; a call is never cut short for tokens.
+"""
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Any, Iterator
+
+from vibe_widget.llm.cancellation import CancellationToken, cancellation_scope, current_token
+from vibe_widget.llm.usage import TokenUsage
+from vibe_widget.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+STRATEGY_FULL = "full"
+STRATEGY_FAST = "fast"
+STRATEGY_STATIC = "static"
+STRATEGY_AUTOFIX = "autofix"
+
+# (minimum remaining fraction of the budget, strategy), checked in order.
+STRATEGY_THRESHOLDS = (
+    (0.5, STRATEGY_FULL),
+    (0.25, STRATEGY_FAST),
+    (0.1, STRATEGY_STATIC),
+)
+
+
+class GenerationBudget:
+    """Deadline (seconds) and token allowance for one generation; None means unbounded."""
+
+    def __init__(self, deadline: float | None = None, max_tokens: int | None = None):
+        if deadline is not None and float(deadline) <= 0:
+            raise ValueError("deadline must be a positive number of seconds")
+        if max_tokens is not None and int(max_tokens) <= 0:
+            raise ValueError("token_budget must be a positive number of tokens")
+        self.deadline = float(deadline) if deadline is not None else None
+        self.max_tokens = int(max_tokens) if max_tokens is not None else None
+        self._lock = threading.Lock()
+        self._started: float | None = None
+        self._finished: float | None = None
+        self._timer: threading.Timer | None = None
+        self.tokens_used = 0
+        self.calls = 0
+        self.estimated_tokens = 0
+        self.estimated_calls = 0
+        self.strategies: list[str] = []
+        self.exhausted: str | None = None
+
+    @property
+    def limited(self) -> bool:
+        return self.deadline is not None or self.max_tokens is not None
+
+    @property
+    def expired(self) -> bool:
+        """True once the deadline passed (the budget's token was cancelled)."""
+        return self.exhausted is not None and self.exhausted.startswith("deadline")
+
+    def elapsed(self) -> float:
+        if self._started is None:
+            return 0.0
+        return (self._finished or time.monotonic()) - self._started
+
+    def remaining_fraction(self) -> float:
+        """Share of the tighter of the two budgets still left (1.0 when unbounded)."""
+        fractions = [1.0]
+        if self.deadline is not None:
+            fractions.append(1.0 - self.elapsed() / self.deadline)
+        if self.max_tokens is not None:
+            fractions.append(1.0 - self.tokens_used / self.max_tokens)
+        return max(0.0, min(fractions))
+
+    def charge(self, usage: TokenUsage, *, estimated: bool = False) -> None:
+        """Add a call's tokens; ``estimated`` marks calls that reported no usage."""
+        tokens = usage.prompt_tokens + usage.completion_tokens
+        with self._lock:
+            self.calls += 1
+            self.tokens_used += tokens
+            if estimated:
+                self.estimated_calls += 1
+                self.estimated_tokens += tokens
+            if self.max_tokens is not None and self.tokens_used >= self.max_tokens and self.exhausted is None:
+                self.exhausted = f"token budget of {self.max_tokens} exceeded"
+
+    def strategy(self) -> str:
+        """Pick the strategy for the next repair round and record it."""
+        remaining = self.remaining_fraction()
+        strategy = STRATEGY_AUTOFIX
+        if self.exhausted is None:
+            strategy = next(
+                (name for floor, name in STRATEGY_THRESHOLDS if remaining > floor), STRATEGY_AUTOFIX
+            )
+        self.strategies.append(strategy)
+        return strategy
+
+    def _expire(self, token: CancellationToken) -> None:
+        with self._lock:
+            if not self.expired:
+                self.exhausted = f"deadline of {self.deadline:g}s exceeded"
+        logger.info("Generation %s; cancelling the in-flight call", self.exhausted)
+        token.cancel(f"Generation {self.exhausted}")
+
+    @contextlib.contextmanager
+    def scope(self) -> Iterator["GenerationBudget"]:
+        """Start the clock and make this budget (and its deadline token) current."""
+        self._started = time.monotonic()
+        reset = _CURRENT.set(self)
+        try:
+            if self.deadline is None:
+                yield self
+                return
+            parent = current_token()
+            token = CancellationToken()
+            handle = parent.on_cancel(lambda: token.cancel(parent.reason)) if parent is not None else None
+            self._timer = threading.Timer(self.deadline, self._expire, args=(token,))
+            self._timer.daemon = True
+            self._timer.start()
+            try:
+                with cancellation_scope(token):
+                    yield self
+            finally:
+                self._timer.cancel()
+                if parent is not None:
+                    parent.remove_callback(handle)
+        finally:
+            self._finished = time.monotonic()
+            _CURRENT.reset(reset)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "deadline_s": self.deadline,
+            "token_budget": self.max_tokens,
+            "elapsed_s": round(self.elapsed(), 3),
+            "tokens_used": self.tokens_used,
+            "calls": self.calls,
+            # Included in tokens_used: aborted/cancelled calls, estimated locally.
+            "estimated_tokens": self.estimated_tokens,
+            "estimated_calls": self.estimated_calls,
+            "strategies": list(self.strategies),
+            "exhausted": self.exhausted,
+        }
+
+
+_CURRENT: contextvars.ContextVar[GenerationBudget | None] = contextvars.ContextVar(
+    "vibe_widget_budget", default=None
+)
+
+
+def current_budget() -> GenerationBudget | None:
+    """The budget of the generation running in this context, if any."""
+    return _CURRENT.get()
+
+
+def charge_usage(usage: TokenUsage, *, estimated: bool = False) -> None:
+    """Charge a call's tokens to the current generation's budget, if any."""
+    budget = _CURRENT.get()
+    if budget is not None:
+        budget.charge(usage, estimated=estimated)
@@ -0,0 +1,140 @@
+"""
+Cooperative cancellation for in-flight generations.
+
+A CancellationToken is created per widget operation (generation, revision)
+and made current with `cancellation_scope`. The orchestrator checks it between
+steps, and the provider checks it on every streamed chunk and registers a
+callback that closes the HTTP stream (or cancels the async request task) the
+moment `cancel()` is called, so the server stops generating. Cancelled work
+raises GenerationCancelled, which the scheduler never retries.
+
+The token travels in a context variable: asyncio tasks and `asyncio.to_thread`
+inherit it, and hedged legs copy the caller's context into their threads.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import threading
+from typing import Callable, Iterator
+
+from vibe_widget.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class GenerationCancelled(Exception):
+    """The operation was cancelled via its CancellationToken."""
+
+
+class CancellationToken:
+    """Thread-safe, one-shot cancellation flag with close callbacks."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: dict[int, Callable[[], None]] = {}
+        self._ids = itertools.count()
+        self.reason = ""
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "Cancelled") -> bool:
+        """Cancel and run registered callbacks; False if already cancelled."""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as exc:  # noqa: BLE001 - closing is best-effort
+                logger.debug("Cancellation callback failed: %s", exc)
+        return True
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise GenerationCancelled(self.reason)
+
+    def on_cancel(self, callback: Callable[[], None]) -> int | None:
+        """Register ``callback``; runs immediately (returning None) if already cancelled."""
+        with self._lock:
+            if not self._event.is_set():
+                handle = next(self._ids)
+                self._callbacks[handle] = callback
+                return handle
+        callback()
+        return None
+
+    def remove_callback(self, handle: int | None) -> None:
+        if handle is None:
+            return
+        with self._lock:
+            self._callbacks.pop(handle, None)
+
+
+_CURRENT: contextvars.ContextVar[CancellationToken | None] = contextvars.ContextVar(
+    "vibe_widget_cancellation", default=None
+)
+
+
+def current_token() -> CancellationToken | None:
+    """The token of the operation running in this context, if any."""
+    return _CURRENT.get()
+
+
+def check_cancelled() -> None:
+    """Raise GenerationCancelled if the current operation was cancelled."""
+    token = _CURRENT.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+@contextlib.contextmanager
+def cancellation_scope(token: CancellationToken | None) -> Iterator[CancellationToken | None]:
+    """Make ``token`` current for the block (a None token keeps the outer one)."""
+    if token is None:
+        yield _CURRENT.get()
+        return
+    reset = _CURRENT.set(token)
+    try:
+        yield token
+    finally:
+        _CURRENT.reset(reset)
+
+
+@contextlib.contextmanager
+def cancel_on(close: Callable[[], None]) -> Iterator[None]:
+    """Run ``close`` if the current token is cancelled inside the block.
+
+    Errors raised because ``close`` tore down a request (closed stream,
+    cancelled task) surface as GenerationCancelled.
+    """
+    token = _CURRENT.get()
+    if token is None:
+        yield
+        return
+    token.raise_if_cancelled()
+    handle = token.on_cancel(close)
+    try:
+        yield
+    except (KeyboardInterrupt, SystemExit, GenerationCancelled):
+        raise
+    except BaseException as exc:
+        if not token.cancelled:
+            raise
+        if isinstance(exc, asyncio.CancelledError):
+            task = asyncio.current_task()
+            # Python 3.11+: the cancel was ours, so the task is no longer cancelling.
+            if task is not None and hasattr(task, "uncancel"):
+                task.uncancel()
+        raise GenerationCancelled(token.reason) from exc
+    finally:
+        token.remove_callback(handle)
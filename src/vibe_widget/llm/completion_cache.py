@@ -0,0 +1,262 @@
+"""
+Persistent cache of LLM completions.
+
+Every provider call (generation, revisions, repairs, audits, themes, data
+wrangling) is keyed by model + a hash of the whitespace-normalized messages +
+the sampling parameters, and the completion text is stored under
+`.vibewidget/completions/`. The directory is bounded by total size and evicts
+least-recently-used entries.
+
+Modes (`Config.completion_cache`, or the VIBEWIDGET_COMPLETION_CACHE env var):
+
+- "off": no caching (default)
+- "on": read and write the cache
+- "replay": read only; a miss raises CompletionCacheMiss so CI and benchmark
+  runs stay offline and deterministic against recorded completions
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from vibe_widget.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+COMPLETION_CACHE_VERSION = 1
+COMPLETION_CACHE_MODES = ("off", "on", "replay")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Parameters that change the completion; transport options (stream, timeouts) do not.
+_KEY_PARAMS = (
+    "max_tokens",
+    "temperature",
+    "top_p",
+    "seed",
+    "stop",
+    "frequency_penalty",
+    "presence_penalty",
+    "response_format",
+)
+
+_TRAILING_SPACE_RE = re.compile(r"[ \t]+\n")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+class CompletionCacheMiss(RuntimeError):
+    """Raised in replay mode when a completion has not been recorded."""
+
+
+def normalize_prompt(text: str) -> str:
+    """Normalize incidental whitespace so cosmetic prompt edits keep their key."""
+    text = text.replace("\r\n", "\n").strip()
+    text = _TRAILING_SPACE_RE.sub("\n", text)
+    return _BLANK_LINES_RE.sub("\n\n", text)
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        return normalize_prompt(content)
+    if isinstance(content, list):
+        return [
+            {**part, "text": normalize_prompt(part["text"])}
+            if isinstance(part, dict) and isinstance(part.get("text"), str)
+            else part
+            for part in content
+        ]
+    return content
+
+
+def completion_key(params: dict[str, Any]) -> str:
+    """Cache key for a chat completion request."""
+    messages = [
+        {"role": message.get("role"), "content": _normalize_content(message.get("content"))}
+        for message in params.get("messages", [])
+    ]
+    prompt_hash = hashlib.sha256(
+        json.dumps(messages, sort_keys=True, ensure_ascii=True).encode("utf-8")
+    ).hexdigest()
+    payload = {
+        "v": COMPLETION_CACHE_VERSION,
+        "model": params.get("model"),
+        "prompt": prompt_hash,
+        "sampling": {name: params[name] for name in _KEY_PARAMS if params.get(name) is not None},
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class CompletionCache:
+    """Size-bounded on-disk LRU of completion texts."""
+
+    def __init__(
+        self,
+        directory: Path,
+        mode: str = "on",
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        if mode not in COMPLETION_CACHE_MODES:
+            raise ValueError(f"Invalid completion cache mode: {mode}. Must be one of {COMPLETION_CACHE_MODES}")
+        self.directory = directory
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        """Return the cached completion text, or None on miss.
+
+        In replay mode a miss raises CompletionCacheMiss instead.
+        """
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            text = entry["text"]
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            if self.mode == "replay":
+                raise CompletionCacheMiss(
+                    f"No recorded completion for key {key[:12]} in {self.directory} (replay mode)"
+                ) from None
+            return None
+        try:
+            # mtime doubles as the LRU clock
+            os.utime(path, None)
+        except OSError:
+            pass
+        self.hits += 1
+        return text
+
+    def put(self, key: str, params: dict[str, Any], text: str) -> None:
+        """Record a completion (no-op outside "on" mode or for empty text)."""
+        if self.mode != "on" or not text:
+            return
+        entry = {
+            "model": params.get("model"),
+            "sampling": {name: params[name] for name in _KEY_PARAMS if params.get(name) is not None},
+            "created_at": time.time(),
+            "text": text,
+        }
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        path = self._path(key)
+        with self._lock:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                previous = path.stat().st_size if path.exists() else 0
+                tmp = path.with_suffix(".tmp")
+                tmp.write_bytes(data)
+                tmp.replace(path)
+            except OSError as exc:
+                logger.debug("Could not write completion %s: %s", key[:8], exc)
+                return
+            self.writes += 1
+            total = self._current_total() + len(data) - previous
+            self._total_bytes = total
+            if total > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        if not self.directory.exists():
+            return entries
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _current_total(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._entries())
+        return self._total_bytes
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries until the cache is 90% of max_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._total_bytes = total
+
+    def clear(self) -> int:
+        removed = 0
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    continue
+            self._total_bytes = 0
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "bytes": self._current_total(),
+            "max_bytes": self.max_bytes,
+            "directory": str(self.directory),
+        }
+
+
+_COMPLETION_CACHE: CompletionCache | None = None
+
+
+def _default_directory() -> Path:
+    return Path.cwd() / ".vibewidget" / "completions"
+
+
+def get_completion_cache() -> CompletionCache:
+    """Return the process-wide completion cache, honoring the global config."""
+    global _COMPLETION_CACHE
+    from vibe_widget.config import get_global_config
+
+    config = get_global_config()
+    mode = getattr(config, "completion_cache", "off")
+    max_bytes = int(getattr(config, "completion_cache_max_mb", 256)) * 1024 * 1024
+    directory = _default_directory()
+    if _COMPLETION_CACHE is None or _COMPLETION_CACHE.directory != directory:
+        _COMPLETION_CACHE = CompletionCache(directory, mode=mode, max_bytes=max_bytes)
+    else:
+        _COMPLETION_CACHE.mode = mode
+        _COMPLETION_CACHE.max_bytes = max_bytes
+    return _COMPLETION_CACHE
+
+
+def clear_completion_cache() -> int:
+    """Remove all recorded completions under `.vibewidget/completions/`."""
+    return CompletionCache(_default_directory(), mode="on").clear()
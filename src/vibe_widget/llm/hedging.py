@@ -0,0 +1,303 @@
+"""
+Hedged provider requests for tail latency.
+
+When `Config.hedge_after` is set, generation-type calls start a request on the
+primary model and, if no first token has arrived within that many seconds,
+start the same request on a fallback model (`Config.hedge_model`, or the next
+model in the primary's manifest tier). The first response that passes the
+caller's acceptance check wins and the other request is cancelled:
+
+- streaming legs stop at their next chunk and close the connection
+- async legs are cancelled outright
+- a blocking non-streaming leg finishes in its worker thread and is discarded
+
+Only the first leg to emit a token forwards chunks to the progress callback,
+so streamed output is never interleaved. If the other leg wins (the leader
+failed or was rejected), the winner's full text is re-emitted through the
+callback once the race settles, so the last thing streamed is what the caller
+gets. `get_hedge_stats().stats()` reports hedge rates and which side won.
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable
+
+from vibe_widget.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Streamed calls whose latency users wait on. Repairs ("fix") are not streamed, so
+# their first token is the whole response and every slow repair would be hedged;
+# they get their tail-latency cover from the candidate race instead.
+HEDGED_CALL_TYPES = ("generate", "revise")
+MAX_HEDGE_WORKERS = 16
+
+
+class HedgeCancelled(Exception):
+    """Raised inside a losing leg when the other leg has already won."""
+
+
+class HedgeStats:
+    """Counters for hedged calls: how often a hedge fired and who won."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.wins: Counter[str] = Counter()
+        self.wins_by_model: Counter[str] = Counter()
+        self.failures = 0
+
+    def record(self, *, hedged: bool, winner: str | None, model: str | None) -> None:
+        with self._lock:
+            self.calls += 1
+            if hedged:
+                self.hedged += 1
+            if winner is None:
+                self.failures += 1
+                return
+            # Unhedged calls are reported separately so win rates reflect races only.
+            self.wins[winner if hedged else "unhedged"] += 1
+            if hedged and model:
+                self.wins_by_model[model] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_rate": (self.hedged / self.calls) if self.calls else 0.0,
+                "primary_wins": self.wins["primary"],
+                "fallback_wins": self.wins["fallback"],
+                "unhedged": self.wins["unhedged"],
+                "failures": self.failures,
+                "wins_by_model": dict(self.wins_by_model),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = self.hedged = self.failures = 0
+            self.wins.clear()
+            self.wins_by_model.clear()
+
+
+_HEDGE_STATS = HedgeStats()
+_EXECUTOR: concurrent.futures.ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_hedge_stats() -> HedgeStats:
+    """Return the process-wide hedge counters."""
+    return _HEDGE_STATS
+
+
+def _executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+                max_workers=MAX_HEDGE_WORKERS, thread_name_prefix="vibe-widget-hedge"
+            )
+        return _EXECUTOR
+
+
+def hedge_plan(model: str, call_type: str) -> tuple[float, str] | None:
+    """Return (deadline_seconds, fallback_model) if this call should be hedged."""
+    from vibe_widget.config import get_fallback_model, get_global_config
+
+    config = get_global_config()
+    deadline = getattr(config, "hedge_after", None)
+    if not deadline or call_type not in HEDGED_CALL_TYPES:
+        return None
+    fallback = getattr(config, "hedge_model", None) or get_fallback_model(model)
+    if not fallback or fallback == model:
+        return None
+    return float(deadline), fallback
+
+
+class _Race:
+    """Shared state for the two legs of a hedged call."""
+
+    def __init__(self, progress_callback: Callable[[str], None] | None):
+        self.progress_callback = progress_callback
+        self.cancelled = {"primary": threading.Event(), "fallback": threading.Event()}
+        self.first_token = threading.Event()
+        self.leader: str | None = None
+        self._lock = threading.Lock()
+
+    def on_chunk(self, role: str) -> Callable[[str], None]:
+        def _forward(text: str) -> None:
+            if self.cancelled[role].is_set():
+                raise HedgeCancelled(role)
+            with self._lock:
+                if self.leader is None:
+                    self.leader = role
+            self.first_token.set()
+            if self.leader == role and self.progress_callback:
+                self.progress_callback(text)
+
+        return _forward
+
+    def cancel_other(self, winner: str) -> None:
+        for role, event in self.cancelled.items():
+            if role != winner:
+                event.set()
+
+    def deliver(self, winner: str, text: str) -> None:
+        """Re-emit the winner's text if another leg's output was streamed instead."""
+        with self._lock:
+            replay = self.leader is not None and self.leader != winner
+            self.leader = winner
+        if replay and self.progress_callback:
+            self.progress_callback(text)
+
+
+def _report(role: str, model: str, hedged: bool, started: float) -> None:
+    get_hedge_stats().record(hedged=hedged, winner=role, model=model)
+    if hedged:
+        logger.info("Hedged request won by %s (%s) after %.1fs", role, model, time.monotonic() - started)
+
+
+def _settle(
+    race: _Race,
+    rejected: dict[str, str],
+    errors: dict[str, BaseException],
+    models: dict[str, str],
+    hedged: bool,
+    started: float,
+) -> tuple[str, str]:
+    """No leg passed the acceptance check: return a response anyway, else raise."""
+    for role in ("primary", "fallback"):
+        if role in rejected:
+            # The orchestrator's validation and repair loop takes it from here.
+            race.deliver(role, rejected[role])
+            _report(role, models[role], hedged, started)
+            return rejected[role], models[role]
+    get_hedge_stats().record(hedged=hedged, winner=None, model=None)
+    raise errors.get("primary") or next(iter(errors.values()))
+
+
+def run_hedged(
+    leg: Callable[[str, Callable[[str], None]], str],
+    *,
+    model: str,
+    fallback: str,
+    hedge_after: float,
+    progress_callback: Callable[[str], None] | None = None,
+    accept: Callable[[str], bool] | None = None,
+) -> tuple[str, str]:
+    """Race ``leg(model, on_chunk)`` against the fallback model.
+
+    ``leg`` must call ``on_chunk`` for every streamed chunk (or once with the
+    full text for non-streaming calls). Returns (text, winning_model).
+    """
+    race = _Race(progress_callback)
+    results: queue.Queue = queue.Queue()
+    models = {"primary": model, "fallback": fallback}
+    started = time.monotonic()
+
+    def _run(role: str) -> None:
+        try:
+            results.put((role, leg(models[role], race.on_chunk(role)), None))
+        except BaseException as exc:  # noqa: BLE001 - handed to the caller
+            results.put((role, None, exc))
+        finally:
+            race.first_token.set()
+
+    pool = _executor()
+    # Legs run with the caller's context so they see its cancellation token.
+    pool.submit(contextvars.copy_context().run, _run, "primary")
+    running = 1
+    hedged = False
+    if not race.first_token.wait(hedge_after):
+        hedged = True
+        logger.info("No first token from %s after %.1fs; hedging with %s", model, hedge_after, fallback)
+        pool.submit(contextvars.copy_context().run, _run, "fallback")
+        running = 2
+
+    errors: dict[str, BaseException] = {}
+    rejected: dict[str, str] = {}
+    while running:
+        role, text, exc = results.get()
+        running -= 1
+        if exc is None and (accept is None or accept(text)):
+            race.cancel_other(role)
+            race.deliver(role, text)
+            _report(role, models[role], hedged, started)
+            return text, models[role]
+        if exc is None:
+            rejected[role] = text
+        else:
+            errors[role] = exc
+
+    return _settle(race, rejected, errors, models, hedged, started)
+
+
+async def run_hedged_async(
+    leg: Callable[[str, Callable[[str], None]], Awaitable[str]],
+    *,
+    model: str,
+    fallback: str,
+    hedge_after: float,
+    progress_callback: Callable[[str], None] | None = None,
+    accept: Callable[[str], bool] | None = None,
+) -> tuple[str, str]:
+    """Async counterpart of `run_hedged`; the losing task is cancelled."""
+    race = _Race(progress_callback)
+    models = {"primary": model, "fallback": fallback}
+    started = time.monotonic()
+    first_token = asyncio.Event()
+
+    def _chunk(role: str) -> Callable[[str], None]:
+        forward = race.on_chunk(role)
+
+        def _on_chunk(text: str) -> None:
+            forward(text)
+            first_token.set()
+
+        return _on_chunk
+
+    tasks: dict[asyncio.Task, str] = {
+        asyncio.ensure_future(leg(model, _chunk("primary"))): "primary",
+    }
+    token_wait = asyncio.ensure_future(first_token.wait())
+    try:
+        await asyncio.wait([token_wait, *tasks], timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        token_wait.cancel()
+    hedged = False
+    if not first_token.is_set() and not any(task.done() for task in tasks):
+        hedged = True
+        logger.info("No first token from %s after %.1fs; hedging with %s", model, hedge_after, fallback)
+        tasks[asyncio.ensure_future(leg(fallback, _chunk("fallback")))] = "fallback"
+
+    errors: dict[str, BaseException] = {}
+    rejected: dict[str, str] = {}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                role = tasks[task]
+                exc = task.exception()
+                if exc is None:
+                    text = task.result()
+                    if accept is None or accept(text):
+                        race.cancel_other(role)
+                        race.deliver(role, text)
+                        _report(role, models[role], hedged, started)
+                        return text, models[role]
+                    rejected[role] = text
+                else:
+                    errors[role] = exc
+    finally:
+        for task in pending:
+            task.cancel()
+
+    return _settle(race, rejected, errors, models, hedged, started)
@@ -0,0 +1,204 @@
+"""
+Patch engine for incremental widget revisions.
+
+Revisions used to ask the model to re-emit the entire widget file, so even a
+one-line colour change paid for thousands of output tokens. In patch mode the
+model returns search/replace blocks:
+
+    <<<<<<< SEARCH
+    const color = "steelblue";
+    =======
+    const color = "tomato";
+    >>>>>>> REPLACE
+
+(unified diffs are accepted too). Blocks are applied in order, trying an exact
+match, then a whitespace-insensitive line match, then a fuzzy line-window
+match. Any block that cannot be placed unambiguously raises PatchError, and the
+provider falls back to a full rewrite.
+"""
+from __future__ import annotations
+
+import difflib
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+FUZZY_THRESHOLD = 0.85
+
+_SEARCH_REPLACE_RE = re.compile(
+    r"^<{5,9} ?SEARCH[^\n]*\n(.*?)^={5,9}[ \t]*\n(.*?)^>{5,9} ?REPLACE[^\n]*$",
+    re.MULTILINE | re.DOTALL,
+)
+_HUNK_HEADER_RE = re.compile(r"^@@ .* @@")
+
+
+class PatchError(ValueError):
+    """A patch could not be parsed or applied unambiguously."""
+
+
+@dataclass
+class PatchBlock:
+    """Replace the first occurrence of ``search`` with ``replace``."""
+
+    search: str
+    replace: str
+
+
+def parse_search_replace(text: str) -> list[PatchBlock]:
+    return [
+        PatchBlock(search=match.group(1), replace=match.group(2))
+        for match in _SEARCH_REPLACE_RE.finditer(text)
+    ]
+
+
+def parse_unified_diff(text: str) -> list[PatchBlock]:
+    """Turn unified-diff hunks into search/replace blocks (line numbers are ignored)."""
+    blocks: list[PatchBlock] = []
+    search: list[str] | None = None
+    replace: list[str] = []
+
+    def flush() -> None:
+        if search is not None and (search or replace):
+            blocks.append(PatchBlock("".join(search), "".join(replace)))
+
+    for line in text.splitlines(keepends=True):
+        if _HUNK_HEADER_RE.match(line):
+            flush()
+            search, replace = [], []
+            continue
+        if search is None or line.startswith(("--- ", "+++ ", "\\ No newline")):
+            continue
+        if line.startswith("-"):
+            search.append(line[1:])
+        elif line.startswith("+"):
+            replace.append(line[1:])
+        elif line.startswith(" ") or line in ("\n", "\r\n"):
+            context = line[1:] if line.startswith(" ") else line
+            search.append(context)
+            replace.append(context)
+        else:
+            # Prose or a closing fence ends the hunk.
+            flush()
+            search, replace = None, []
+    flush()
+    return blocks
+
+
+def parse_patch(text: str) -> list[PatchBlock]:
+    """Parse search/replace blocks, falling back to unified diff hunks."""
+    text = text.replace("\r\n", "\n")
+    return parse_search_replace(text) or parse_unified_diff(text)
+
+
+def _line_spans(code: str) -> list[tuple[int, int]]:
+    spans = []
+    offset = 0
+    for line in code.splitlines(keepends=True):
+        spans.append((offset, offset + len(line)))
+        offset += len(line)
+    return spans
+
+
+def _normalized(lines: list[str]) -> list[str]:
+    return [" ".join(line.split()) for line in lines]
+
+
+def _locate(code: str, search: str) -> tuple[int, int, str]:
+    """Return (start, end, strategy) of the region of ``code`` matching ``search``."""
+    count = code.count(search)
+    if count == 1:
+        start = code.index(search)
+        return start, start + len(search), "exact"
+    if count > 1:
+        raise PatchError(f"Search text matches {count} places: {search.strip()[:60]!r}")
+
+    spans = _line_spans(code)
+    code_lines = [code[start:end] for start, end in spans]
+    search_lines = search.splitlines(keepends=True)
+    while search_lines and not search_lines[-1].strip():
+        search_lines.pop()
+    while search_lines and not search_lines[0].strip():
+        search_lines.pop(0)
+    size = len(search_lines)
+    if not size or size > len(code_lines):
+        raise PatchError(f"Search text not found: {search.strip()[:60]!r}")
+
+    wanted = _normalized(search_lines)
+    normalized = _normalized(code_lines)
+    hits = [i for i in range(len(code_lines) - size + 1) if normalized[i:i + size] == wanted]
+    if len(hits) == 1:
+        i = hits[0]
+        return spans[i][0], spans[i + size - 1][1], "whitespace"
+    if len(hits) > 1:
+        raise PatchError(f"Search text matches {len(hits)} places: {search.strip()[:60]!r}")
+
+    target = "\n".join(wanted)
+    scored = []
+    for i in range(len(code_lines) - size + 1):
+        ratio = difflib.SequenceMatcher(None, "\n".join(normalized[i:i + size]), target).ratio()
+        if ratio >= FUZZY_THRESHOLD:
+            scored.append((ratio, i))
+    if not scored:
+        raise PatchError(f"Search text not found: {search.strip()[:60]!r}")
+    scored.sort(reverse=True)
+    if len(scored) > 1 and scored[1][0] == scored[0][0]:
+        raise PatchError(f"Search text is ambiguous: {search.strip()[:60]!r}")
+    i = scored[0][1]
+    return spans[i][0], spans[i + size - 1][1], "fuzzy"
+
+
+def apply_patch(code: str, blocks: list[PatchBlock]) -> tuple[str, list[str]]:
+    """Apply blocks in order; returns (patched_code, match strategy per block)."""
+    if not blocks:
+        raise PatchError("Patch contains no search/replace blocks")
+    strategies = []
+    for block in blocks:
+        if not block.search.strip():
+            raise PatchError("Patch block has an empty SEARCH section")
+        start, end, strategy = _locate(code, block.search)
+        replace = block.replace
+        if code[start:end].endswith("\n") and replace and not replace.endswith("\n"):
+            replace += "\n"
+        code = code[:start] + replace + code[end:]
+        strategies.append(strategy)
+    return code, strategies
+
+
+class PatchStats:
+    """Counts patch revisions and how often they fell back to full rewrites."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.applied = 0
+        self.fuzzy = 0
+        self.fallbacks = 0
+
+    def record(self, *, applied: bool, strategies: list[str] | None = None) -> None:
+        with self._lock:
+            self.attempts += 1
+            if applied:
+                self.applied += 1
+                if strategies and any(strategy != "exact" for strategy in strategies):
+                    self.fuzzy += 1
+            else:
+                self.fallbacks += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "attempts": self.attempts,
+                "applied": self.applied,
+                "fuzzy": self.fuzzy,
+                "fallbacks": self.fallbacks,
+                "apply_rate": (self.applied / self.attempts) if self.attempts else 0.0,
+            }
+
+
+_STATS = PatchStats()
+
+
+def get_patch_stats() -> PatchStats:
+    """Return the process-wide patch revision counters."""
+    return _STATS
@@ -0,0 +1,197 @@
+"""
+Token budgeting for prompt assembly.
+
+Prompts are built from a fixed instruction template plus variable context
+(input summaries, theme text, base widget code, error messages). This module
+estimates token counts, ranks input summaries by relevance to the request and
+trims the variable sections so the assembled prompt fits a per-model input
+budget (see `get_input_budget` in config).
+
+`count_tokens` uses tiktoken when it is installed (optional) and is what the
+providers check against the model's context window before sending a request.
+"""
+from __future__ import annotations
+
+import functools
+import math
+import re
+from dataclasses import dataclass
+from typing import Iterable
+
+# Conservative average for mixed prose/code; real tokenizers land at ~3.5-4.5.
+CHARS_PER_TOKEN = 3.5
+# Tokenizer used by `count_tokens`; close enough for every routed model family.
+TIKTOKEN_ENCODING = "o200k_base"
+TRUNCATION_MARKER = "... [truncated {tokens} tokens to fit context]"
+
+_WORD_RE = re.compile(r"[a-z0-9_]{3,}")
+_STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "into", "show", "make",
+    "use", "using", "each", "over", "when", "then", "than", "add", "create",
+    "widget", "chart", "plot", "visualization", "interactive", "data", "should",
+}
+
+
+def estimate_tokens(text: str | None) -> int:
+    """Cheap token estimate for a piece of prompt text."""
+    if not text:
+        return 0
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+class ContextOverflowError(ValueError):
+    """The prompt cannot fit the model's context window even after trimming."""
+
+    def __init__(self, message: str, *, prompt_tokens: int, max_tokens: int, context_window: int):
+        super().__init__(message)
+        self.prompt_tokens = prompt_tokens
+        self.max_tokens = max_tokens
+        self.context_window = context_window
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.get_encoding(TIKTOKEN_ENCODING)
+    except Exception:  # noqa: BLE001 - missing encoding files behave like no tiktoken
+        return None
+
+
+def count_tokens(text: str | None) -> int:
+    """Token count for a full prompt: tiktoken if available, else `estimate_tokens`."""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, *, keep_tail: bool = False) -> str:
+    """Trim text to roughly ``max_tokens``, cutting on line boundaries when possible.
+
+    With ``keep_tail`` the head and the last third are kept (useful for code,
+    where the default export usually sits at the end).
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    dropped = estimate_tokens(text) - max_tokens
+    marker = TRUNCATION_MARKER.format(tokens=dropped)
+    budget_chars = max(0, int(max_tokens * CHARS_PER_TOKEN) - len(marker) - 2)
+
+    if keep_tail:
+        tail_chars = budget_chars // 3
+        head = _cut_head(text, budget_chars - tail_chars)
+        tail = _cut_tail(text, tail_chars)
+        return f"{head}\n{marker}\n{tail}" if tail else f"{head}\n{marker}"
+    return f"{_cut_head(text, budget_chars)}\n{marker}"
+
+
+def _cut_head(text: str, chars: int) -> str:
+    head = text[:chars]
+    newline = head.rfind("\n")
+    if newline > chars // 2:
+        head = head[:newline]
+    return head.rstrip()
+
+
+def _cut_tail(text: str, chars: int) -> str:
+    if chars <= 0:
+        return ""
+    tail = text[-chars:]
+    newline = tail.find("\n")
+    if 0 <= newline < chars // 2:
+        tail = tail[newline + 1:]
+    return tail.lstrip("\n")
+
+
+def _keywords(text: str) -> set[str]:
+    return {word for word in _WORD_RE.findall(text.lower()) if word not in _STOPWORDS}
+
+
+def rank_by_relevance(description: str, summaries: dict[str, str]) -> list[str]:
+    """Order input names by how relevant they look to the request description.
+
+    Inputs named in the description rank first; the rest are scored by keyword
+    overlap between the description and the summary. Ties keep input order.
+    """
+    description_lower = (description or "").lower()
+    words = _keywords(description_lower)
+    scored: list[tuple[float, int, str]] = []
+    for position, (name, summary) in enumerate(summaries.items()):
+        score = 0.0
+        if name and str(name).lower() in description_lower:
+            score += 10.0
+        if words:
+            overlap = words & _keywords(f"{name} {summary}")
+            score += len(overlap) / len(words)
+        scored.append((-score, position, name))
+    return [name for _, _, name in sorted(scored)]
+
+
+@dataclass
+class PromptSection:
+    """A variable prompt section competing for the remaining budget.
+
+    Sections with higher ``priority`` are funded first. Each section first gets
+    up to ``min_tokens`` (so it is at least partially present), then leftover
+    budget is handed out in priority order until it runs out.
+    """
+
+    name: str
+    text: str
+    priority: float = 0.0
+    min_tokens: int = 0
+    keep_tail: bool = False
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+def fit_sections(sections: Iterable[PromptSection], budget: int) -> dict[str, str]:
+    """Truncate sections so their combined estimate fits ``budget`` tokens.
+
+    Returns a mapping of section name to (possibly truncated) text. Sections
+    that cannot receive their minimum are returned as empty strings.
+    """
+    sections = list(sections)
+    if sum(section.tokens for section in sections) <= budget:
+        return {section.name: section.text for section in sections}
+
+    ordered = sorted(sections, key=lambda section: -section.priority)
+    remaining = max(0, budget)
+    allocation: dict[str, int] = {}
+    for section in ordered:
+        floor = min(section.tokens, section.min_tokens)
+        if floor <= remaining:
+            allocation[section.name] = floor
+            remaining -= floor
+        else:
+            allocation[section.name] = 0
+    for section in ordered:
+        if remaining <= 0:
+            break
+        current = allocation[section.name]
+        if current == 0 and section.min_tokens and section.tokens > 0:
+            continue
+        extra = min(section.tokens - current, remaining)
+        allocation[section.name] = current + extra
+        remaining -= extra
+
+    fitted: dict[str, str] = {}
+    for section in sections:
+        allowed = allocation.get(section.name, 0)
+        if allowed >= section.tokens:
+            fitted[section.name] = section.text
+        elif allowed <= 0:
+            fitted[section.name] = ""
+        else:
+            fitted[section.name] = truncate_to_tokens(section.text, allowed, keep_tail=section.keep_tail)
+    return fitted
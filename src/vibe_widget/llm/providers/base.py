@@ -1,9 +1,242 @@
 """Base class for LLM providers."""
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from typing import Any, Callable
+import asyncio
+import functools
+import math
 import re
 
+from vibe_widget.llm.prompt_budget import (
+    ContextOverflowError,
+    PromptSection,
+    count_tokens,
+    estimate_tokens,
+    fit_sections,
+    rank_by_relevance,
+)
+
+OMITTED_SUMMARY = "(summary omitted to fit the context budget)"
+
+# Headroom for tokenizer differences between our count and the model's own.
+CONTEXT_SAFETY_MARGIN = 1.1
+# Smallest completion budget worth sending; below this the prompt is trimmed instead.
+MIN_OUTPUT_TOKENS = 8192
+# How many times the input budget is halved before giving up.
+CONTEXT_FIT_ATTEMPTS = 3
+
+
+@dataclass(frozen=True)
+class Prompt:
+    """A prompt split into a stable system prefix and a per-request user suffix.
+
+    The system text is identical across requests of the same kind, so
+    providers can mark it for upstream prompt caching and only pay prefill
+    for the user part.
+    """
+
+    system: str
+    user: str
+
+    @property
+    def text(self) -> str:
+        return f"{self.system}\n\n{self.user}"
+
+    def __str__(self) -> str:
+        return self.text
+
+
+GENERATION_SYSTEM_PROMPT = """You are an expert JavaScript + React developer building a high-quality interactive visualization that runs inside an AnyWidget React bundle.
+
+CRITICAL REACT + HTM SPECIFICATION:
+
+MUST FOLLOW EXACTLY:
+1. Export a default function: export default function Widget({ model, html, React }) { ... }
+2. Use html tagged templates (htm) for markup—no JSX or ReactDOM.render
+3. Do not import React, react-dom, or react/jsx-runtime—use the provided React and html props only
+4. Access inputs with model.get("<input_name>") using names from INPUTS and treat them as immutable
+5. Append DOM nodes via refs rendered inside html templates (never touch document.body)
+6. Import libraries from ESM CDN with locked versions (d3@7, three@0.160, regl@3, etc.)
+7. Initialize outputs immediately, update them as interactions occur, and call model.save_changes() each time
+8. Subscribe to input traits with model.on("change:trait", handler) and unsubscribe in cleanup
+9. Every React.useEffect MUST return a cleanup that tears down listeners, observers, intervals, animation frames, WebGL resources, etc.
+10. Avoid 100vh/100vw—use fixed heights (360–640px) or flex layouts that respect notebook constraints
+11. Ensure high contrast for text and data marks (WCAG AA minimum) in all visual states
+12. Inline styles must be object literals: style=${ ... } (never style="..." or style=${"..."}).
+13. Any component that returns html`...` MUST accept `html` in its props, and you MUST pass `html=${html}` when using it.
+14. Never wrap the output in markdown code fences
+
+CORRECT Template:
+```javascript
+import * as d3 from "https://esm.sh/d3@7";
+
+export default function VisualizationWidget({ model, html, React }) {
+  const data = model.get("input_name") || [];
+  const [selectedItem, setSelectedItem] = React.useState(null);
+  const containerRef = React.useRef(null);
+
+  React.useEffect(() => {
+    if (!containerRef.current) return;
+    const svg = d3.select(containerRef.current)
+      .append("svg")
+      .attr("width", 640)
+      .attr("height", 420);
+
+    // ... build chart ...
+
+    return () => svg.remove();
+  }, [data]);
+
+  return html`
+    <section class="viz-shell" style=${{ padding: '24px', height: '480px' }}>
+      <h2 class="viz-title">Experience</h2>
+      <div ref=${containerRef} class="viz-canvas"></div>
+      ${selectedItem && html`<p class="viz-meta">Selected: ${selectedItem}</p>`}
+    </section>
+  `;
+}
+```
+
+Key Syntax Rules:
+- Use html`<div>...</div>` NOT <div>...</div>
+- Use class= NOT className=
+- Event props: onClick=${handler} NOT onClick={handler}
+- Style objects: style=${{ padding: '20px' }}
+- Conditionals: ${condition && html`...`}
+
+MODULARITY & STANDALONE COMPONENTS:
+
+For reusable UI components (sliders, legends, tooltips, controls, charts, panels), export them as NAMED EXPORTS that are FULLY STANDALONE:
+```javascript
+// Each exported component MUST be fully self-contained and independently renderable
+export const Slider = ({ value, onChange, min, max, html }) => {
+  return html`<input type="range" value=${value} onInput=${onChange} min=${min} max=${max} />`;
+};
+
+export const ColorLegend = ({ colors, labels, html }) => {
+  return html`<div class="legend">${labels.map((label, i) => html`<span style=${{ background: colors[i], padding: '4px 8px' }}>${label}</span>`)}</div>`;
+};
+
+// For chart components that need data access, accept model as prop
+export const ScatterChart = ({ model, html, React, width = 400, height = 300 }) => {
+  const data = model.get("data") || [];
+  const containerRef = React.useRef(null);
+  // ... full chart implementation with proper cleanup ...
+  return html`<div ref=${containerRef} style=${{ width: width + 'px', height: height + 'px' }}></div>`;
+};
+
+export default function Widget({ model, html, React }) {
+  // Compose using standalone components
+  return html`
+    <div>
+      <${ScatterChart} model=${model} html=${html} React=${React} width=${600} height=${400} />
+      <${ColorLegend} colors=${['#f00', '#0f0']} labels=${['A', 'B']} html=${html} />
+    </div>
+  `;
+}
+```
+
+STANDALONE COMPONENT REQUIREMENTS:
+1. Each named export component MUST be renderable independently
+2. Pass html, React, and model as props when the component needs them
+3. Include all required state, effects, and cleanup within the component
+4. Do NOT rely on shared state from parent scope - receive everything via props
+5. For data-driven components, accept model as prop to access model.get("data")
+
+BENEFITS:
+- Components can be displayed individually in separate cells
+- Users can reference and reuse specific subcomponents
+- Cleaner code structure and separation of concerns
+- Easier testing and maintenance
+
+OUTPUT REQUIREMENTS:
+
+Generate ONLY the working JavaScript code (imports → export default function Widget...).
+- NO explanations before or after
+- NO markdown fences
+- NO console logs unless essential
+
+Begin the response with code immediately."""
+
+REVISION_SYSTEM_PROMPT = """Revise AnyWidget React bundle code according to the user's revision request.
+
+Follow the SAME constraints as generation:
+- export default function Widget({ model, html, React })
+- html tagged templates only (no JSX)
+- ESM CDN imports with locked versions
+- Thorough cleanup in every React.useEffect
+- Export reusable components as named exports when appropriate
+
+Focus on making ONLY the requested changes. Reuse existing code structure where possible.
+
+Return only the full revised JavaScript code. No markdown fences or explanations."""
+
+PATCH_SYSTEM_PROMPT = """Revise AnyWidget React bundle code according to the user's revision request by returning a PATCH, not the whole file.
+
+Keep the SAME constraints as generation:
+- export default function Widget({ model, html, React })
+- html tagged templates only (no JSX)
+- ESM CDN imports with locked versions
+- Thorough cleanup in every React.useEffect
+
+PATCH FORMAT: one or more blocks, applied in order:
+<<<<<<< SEARCH
+exact lines copied from CURRENT CODE
+=======
+replacement lines
+>>>>>>> REPLACE
+
+Rules:
+- SEARCH must copy existing lines exactly (including indentation) and match only one place
+- Include just enough surrounding lines to make each SEARCH unique; keep blocks small
+- To add code, SEARCH for the neighbouring lines and repeat them in REPLACE with the addition
+- Make ONLY the requested changes
+
+Return only the patch blocks. No explanations."""
+
+FIX_SYSTEM_PROMPT = """Fix the AnyWidget React bundle code the user provides. Keep the interaction model identical while eliminating the runtime error.
+Preserve all user-intended changes and visual styling; make the smallest possible fix.
+Do NOT remove, rename, or rewrite unrelated parts of the code.
+
+MANDATORY FIX RULES:
+1. Export default function Widget({ model, html, React })
+2. Use html tagged templates (htm) instead of JSX
+3. Guard every model.get payload before iterating
+4. Keep CDN imports version-pinned
+5. Restore all cleanup handlers
+6. Initialize outputs and call model.save_changes()
+
+Return ONLY the corrected JavaScript code."""
+
+AUDIT_SYSTEM_PROMPT = """You are an auditing assistant for VibeWidget code.
+
+Audit taxonomy:
+- DATA: selection, transformation, format, provenance
+- COMPUTATION: method, parameters, assumptions, execution
+- PRESENTATION: encoding, scale, compression, framing
+- INTERACTION: triggers, state, propagation, feedback
+
+Lenses:
+- Impact (high/medium/low): would a different choice change conclusions?
+- Uncertainty: confidence, sample size, stability
+- Reproducibility: can it be recreated exactly?
+- Edge Behavior: empty/extreme/boundary inputs
+- Default vs Explicit: user choice vs assumption
+- Appropriateness: method suitability
+- Safety: external network usage, dynamic code execution, storage writes, cross-origin fetch, iframe/script injection
+
+Constraints:
+- Use line numbers from the provided code.
+- Location must be "global" or a list of integers.
+- IDs should be stable, descriptive, and scoped like "domain.type.short_name".
+- Be conservative: default to low impact unless there is clear evidence of medium/high.
+- High impact should be rare and reserved for likely conclusion-changing choices.
+- Summaries must be understandable to non-coders.
+- "details" should expand in plain language (1-2 sentences).
+- "technical_summary" should be brief and technical, and only included when helpful.
+- Return ONLY JSON, no markdown or commentary."""
+
 
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
@@ -58,6 +291,9 @@ class LLMProvider(ABC):
         broken_code: str,
         error_message: str,
         data_info: dict[str, Any],
+        *,
+        temperature: float | None = None,
+        model: str | None = None,
     ) -> str:
         """Fix errors in widget code.
         
@@ -65,6 +301,8 @@ class LLMProvider(ABC):
             broken_code: The code with errors
             error_message: Description of the error
             data_info: Dictionary containing data profile information
+            temperature: Optional sampling temperature override (candidate repairs)
+            model: Optional model override for this call (candidate repairs)
             
         Returns:
             Fixed widget code as a string
@@ -88,17 +326,72 @@ class LLMProvider(ABC):
         self,
         prompt: str,
         progress_callback: Callable[[str], None] | None = None,
+        *,
+        call_type: str = "text",
     ) -> str:
         """Generate plain text from a prompt."""
         pass
     
-    def _build_prompt(
+    async def generate_widget_code_async(
         self,
         description: str,
         data_info: dict[str, Any],
+        progress_callback: Callable[[str], None] | None = None,
+    ) -> str:
+        """Async variant of `generate_widget_code`.
+
+        The default runs the synchronous method in a worker thread; providers
+        with a native async client override it.
+        """
+        return await asyncio.to_thread(
+            self.generate_widget_code, description, data_info, progress_callback
+        )
+
+    async def revise_widget_code_async(
+        self,
+        current_code: str,
+        revision_description: str,
+        data_info: dict[str, Any],
         base_code: str | None = None,
         base_components: list[str] | None = None,
+        progress_callback: Callable[[str], None] | None = None,
+    ) -> str:
+        """Async variant of `revise_widget_code` (worker thread by default)."""
+        return await asyncio.to_thread(
+            self.revise_widget_code,
+            current_code,
+            revision_description,
+            data_info,
+            base_code,
+            base_components,
+            progress_callback,
+        )
+
+    async def fix_code_error_async(
+        self,
+        broken_code: str,
+        error_message: str,
+        data_info: dict[str, Any],
+        *,
+        temperature: float | None = None,
+        model: str | None = None,
     ) -> str:
+        """Async variant of `fix_code_error` (worker thread by default)."""
+        return await asyncio.to_thread(
+            functools.partial(self.fix_code_error, temperature=temperature, model=model),
+            broken_code,
+            error_message,
+            data_info,
+        )
+
+    def _build_prompt(
+        self,
+        description: str,
+        data_info: dict[str, Any],
+        base_code: str | None = None,
+        base_components: list[str] | None = None,
+        budget: int | None = None,
+    ) -> Prompt:
         """Build the prompt for code generation.
         
         Args:
@@ -106,6 +399,7 @@ class LLMProvider(ABC):
             data_info: Data information dictionary
             base_code: Optional base widget code for composition
             base_components: Optional list of component names available from base
+            budget: Optional input-token budget (defaults to the model's manifest budget)
         """
         outputs = data_info.get("outputs", {})
         inputs = data_info.get("inputs", {})
@@ -120,138 +414,26 @@ class LLMProvider(ABC):
             action_params,
         )
         
-        # Build composition section if base code provided
-        composition_section = ""
-        if base_code:
-            composition_section = self._build_composition_section(base_code, base_components or [])
-        
-        if inputs:
-            input_summary = "\n".join([f"- {name}: {summary}" for name, summary in inputs.items()])
-        else:
-            input_summary = "No inputs"
-        
-        theme_section = ""
-        if theme_description:
-            theme_section = f"THEME:\n{theme_description}\n\n"
-
-        return f"""You are an expert JavaScript + React developer building a high-quality interactive visualization that runs inside an AnyWidget React bundle.
-
-TASK: {description}
+        def render(input_summary: str, theme_section: str, composition_section: str) -> Prompt:
+            return Prompt(
+                system=GENERATION_SYSTEM_PROMPT,
+                user=f"""TASK: {description}
 
 Input summaries:
 {input_summary}
 
-{theme_section}{composition_section}{outputs_inputs_section}
-
-CRITICAL REACT + HTM SPECIFICATION:
+{theme_section}{composition_section}{outputs_inputs_section}""",
+            )
 
-MUST FOLLOW EXACTLY:
-1. Export a default function: export default function Widget({{ model, html, React }}) {{ ... }}
-2. Use html tagged templates (htm) for markup—no JSX or ReactDOM.render
-3. Do not import React, react-dom, or react/jsx-runtime—use the provided React and html props only
-4. Access inputs with model.get("<input_name>") using names from INPUTS and treat them as immutable
-5. Append DOM nodes via refs rendered inside html templates (never touch document.body)
-6. Import libraries from ESM CDN with locked versions (d3@7, three@0.160, regl@3, etc.)
-7. Initialize outputs immediately, update them as interactions occur, and call model.save_changes() each time
-8. Subscribe to input traits with model.on("change:trait", handler) and unsubscribe in cleanup
-9. Every React.useEffect MUST return a cleanup that tears down listeners, observers, intervals, animation frames, WebGL resources, etc.
-10. Avoid 100vh/100vw—use fixed heights (360–640px) or flex layouts that respect notebook constraints
-11. Ensure high contrast for text and data marks (WCAG AA minimum) in all visual states
-12. Inline styles must be object literals: style=${{ ... }} (never style="..." or style=${"..."}).
-13. Any component that returns html`...` MUST accept `html` in its props, and you MUST pass `html=${{html}}` when using it.
-14. Never wrap the output in markdown code fences
-
-CORRECT Template:
-```javascript
-import * as d3 from "https://esm.sh/d3@7";
-
-export default function VisualizationWidget({{ model, html, React }}) {{
-  const data = model.get("input_name") || [];
-  const [selectedItem, setSelectedItem] = React.useState(null);
-  const containerRef = React.useRef(null);
-
-  React.useEffect(() => {{
-    if (!containerRef.current) return;
-    const svg = d3.select(containerRef.current)
-      .append("svg")
-      .attr("width", 640)
-      .attr("height", 420);
-
-    // ... build chart ...
-
-    return () => svg.remove();
-  }}, [data]);
-
-  return html`
-    <section class="viz-shell" style=${{{{ padding: '24px', height: '480px' }}}}>
-      <h2 class="viz-title">Experience</h2>
-      <div ref=${{containerRef}} class="viz-canvas"></div>
-      ${{selectedItem && html`<p class="viz-meta">Selected: ${{selectedItem}}</p>`}}
-    </section>
-  `;
-}}
-```
-
-Key Syntax Rules:
-- Use html`<div>...</div>` NOT <div>...</div>
-- Use class= NOT className=
-- Event props: onClick=${{handler}} NOT onClick={{handler}}
-- Style objects: style=${{{{ padding: '20px' }}}}
-- Conditionals: ${{condition && html`...`}}
-
-MODULARITY & STANDALONE COMPONENTS:
-
-For reusable UI components (sliders, legends, tooltips, controls, charts, panels), export them as NAMED EXPORTS that are FULLY STANDALONE:
-```javascript
-// Each exported component MUST be fully self-contained and independently renderable
-export const Slider = ({{ value, onChange, min, max, html }}) => {{
-  return html`<input type="range" value=${{value}} onInput=${{onChange}} min=${{min}} max=${{max}} />`;
-}};
-
-export const ColorLegend = ({{ colors, labels, html }}) => {{
-  return html`<div class="legend">${{labels.map((label, i) => html`<span style=${{{{ background: colors[i], padding: '4px 8px' }}}}>${{label}}</span>`)}}</div>`;
-}};
-
-// For chart components that need data access, accept model as prop
-export const ScatterChart = ({{ model, html, React, width = 400, height = 300 }}) => {{
-  const data = model.get("data") || [];
-  const containerRef = React.useRef(null);
-  // ... full chart implementation with proper cleanup ...
-  return html`<div ref=${{containerRef}} style=${{{{ width: width + 'px', height: height + 'px' }}}}></div>`;
-}};
-
-export default function Widget({{ model, html, React }}) {{
-  // Compose using standalone components
-  return html`
-    <div>
-      <${{ScatterChart}} model=${{model}} html=${{html}} React=${{React}} width=${{600}} height=${{400}} />
-      <${{ColorLegend}} colors=${{['#f00', '#0f0']}} labels=${{['A', 'B']}} html=${{html}} />
-    </div>
-  `;
-}}
-```
-
-STANDALONE COMPONENT REQUIREMENTS:
-1. Each named export component MUST be renderable independently
-2. Pass html, React, and model as props when the component needs them
-3. Include all required state, effects, and cleanup within the component
-4. Do NOT rely on shared state from parent scope - receive everything via props
-5. For data-driven components, accept model as prop to access model.get("data")
-
-BENEFITS:
-- Components can be displayed individually in separate cells
-- Users can reference and reuse specific subcomponents
-- Cleaner code structure and separation of concerns
-- Easier testing and maintenance
-
-OUTPUT REQUIREMENTS:
-
-Generate ONLY the working JavaScript code (imports → export default function Widget...).
-- NO explanations before or after
-- NO markdown fences
-- NO console logs unless essential
-
-Begin the response with code immediately."""
+        context = self._fit_prompt_context(
+            fixed_prompt=render("", "", "").text,
+            description=description,
+            inputs=inputs,
+            theme_description=theme_description,
+            base_code=base_code,
+            budget=budget,
+        )
+        return render(*self._render_context_sections(context, base_components))
     
     def _build_revision_prompt(
         self,
@@ -260,7 +442,8 @@ Begin the response with code immediately."""
         data_info: dict[str, Any],
         base_code: str | None = None,
         base_components: list[str] | None = None,
-    ) -> str:
+        budget: int | None = None,
+    ) -> Prompt:
         """Build the prompt for code revision.
         
         Args:
@@ -269,6 +452,7 @@ Begin the response with code immediately."""
             data_info: Data information dictionary
             base_code: Optional additional base widget code for composition
             base_components: Optional list of components from base widget
+            budget: Optional input-token budget (current code is never trimmed)
         """
         outputs = data_info.get("outputs", {})
         inputs = data_info.get("inputs", {})
@@ -283,23 +467,66 @@ Begin the response with code immediately."""
             action_params,
         )
         
-        if inputs:
-            input_summary = "\n".join([f"- {name}: {summary}" for name, summary in inputs.items()])
-        else:
-            input_summary = "No inputs"
+        def render(input_summary: str, theme_section: str, composition_section: str) -> Prompt:
+            return Prompt(
+                system=REVISION_SYSTEM_PROMPT,
+                user=f"""REVISION REQUEST: {revision_description}
 
-        # Build composition section if additional base code provided
-        composition_section = ""
-        if base_code:
-            composition_section = self._build_composition_section(base_code, base_components or [])
-        
-        theme_section = ""
-        if theme_description:
-            theme_section = f"THEME:\n{theme_description}\n\n"
+CURRENT CODE:
+```javascript
+{current_code}
+```
 
-        return f"""Revise the following AnyWidget React bundle code according to the request.
+{theme_section}{composition_section}Input summaries:
+{input_summary}
+
+{outputs_inputs_section}""",
+            )
 
-REVISION REQUEST: {revision_description}
+        context = self._fit_prompt_context(
+            fixed_prompt=render("", "", "").text,
+            description=revision_description,
+            inputs=inputs,
+            theme_description=theme_description,
+            base_code=base_code,
+            budget=budget,
+        )
+        return render(*self._render_context_sections(context, base_components))
+    
+    def _build_patch_prompt(
+        self,
+        current_code: str,
+        revision_description: str,
+        data_info: dict[str, Any],
+        base_components: list[str] | None = None,
+        budget: int | None = None,
+    ) -> Prompt:
+        """Build the prompt for a patch revision (search/replace blocks, not a full file).
+
+        Args:
+            current_code: Current widget code
+            revision_description: Description of changes to make
+            data_info: Data information dictionary
+            base_components: Optional list of components from base widget
+            budget: Optional input-token budget (current code is never trimmed)
+        """
+        outputs = data_info.get("outputs", {})
+        inputs = data_info.get("inputs", {})
+        actions = data_info.get("actions", {})
+        action_params = data_info.get("action_params", {})
+        theme_description = data_info.get("theme_description")
+
+        outputs_inputs_section = self._build_outputs_inputs_section(
+            outputs,
+            inputs,
+            actions,
+            action_params,
+        )
+
+        def render(input_summary: str, theme_section: str, composition_section: str) -> Prompt:
+            return Prompt(
+                system=PATCH_SYSTEM_PROMPT,
+                user=f"""REVISION REQUEST: {revision_description}
 
 CURRENT CODE:
 ```javascript
@@ -309,25 +536,26 @@ CURRENT CODE:
 {theme_section}{composition_section}Input summaries:
 {input_summary}
 
-{outputs_inputs_section}
-
-Follow the SAME constraints as generation:
-- export default function Widget({{ model, html, React }})
-- html tagged templates only (no JSX)
-- ESM CDN imports with locked versions
-- Thorough cleanup in every React.useEffect
-- Export reusable components as named exports when appropriate
+{outputs_inputs_section}""",
+            )
 
-Focus on making ONLY the requested changes. Reuse existing code structure where possible.
+        context = self._fit_prompt_context(
+            fixed_prompt=render("", "", "").text,
+            description=revision_description,
+            inputs=inputs,
+            theme_description=theme_description,
+            base_code=None,
+            budget=budget,
+        )
+        return render(*self._render_context_sections(context, base_components))
 
-Return only the full revised JavaScript code. No markdown fences or explanations."""
-    
     def _build_fix_prompt(
         self,
         broken_code: str,
         error_message: str,
         data_info: dict[str, Any],
-    ) -> str:
+        budget: int | None = None,
+    ) -> Prompt:
         """Build the prompt for fixing code errors."""
         outputs = data_info.get("outputs", {})
         inputs = data_info.get("inputs", {})
@@ -342,20 +570,10 @@ Return only the full revised JavaScript code. No markdown fences or explanations
             action_params,
         )
         
-        if inputs:
-            input_summary = "\n".join([f"- {name}: {summary}" for name, summary in inputs.items()])
-        else:
-            input_summary = "No inputs"
-
-        theme_section = ""
-        if theme_description:
-            theme_section = f"THEME:\n{theme_description}\n\n"
-
-        return f"""Fix the AnyWidget React bundle code below. Keep the interaction model identical while eliminating the runtime error.
-Preserve all user-intended changes and visual styling; make the smallest possible fix.
-Do NOT remove, rename, or rewrite unrelated parts of the code.
-
-ERROR MESSAGE:
+        def render(input_summary: str, theme_section: str, error_message: str) -> Prompt:
+            return Prompt(
+                system=FIX_SYSTEM_PROMPT,
+                user=f"""ERROR MESSAGE:
 {error_message}
 
 BROKEN CODE:
@@ -366,17 +584,19 @@ BROKEN CODE:
 Input summaries:
 {input_summary}
 
-{theme_section}{outputs_inputs_section}
-
-MANDATORY FIX RULES:
-1. Export default function Widget({{ model, html, React }})
-2. Use html tagged templates (htm) instead of JSX
-3. Guard every model.get payload before iterating
-4. Keep CDN imports version-pinned
-5. Restore all cleanup handlers
-6. Initialize outputs and call model.save_changes()
+{theme_section}{outputs_inputs_section}""",
+            )
 
-Return ONLY the corrected JavaScript code."""
+        context = self._fit_prompt_context(
+            fixed_prompt=render("", "", "").text,
+            description=error_message,
+            inputs=inputs,
+            theme_description=theme_description,
+            extra={"error_message": (error_message, 200.0, 256)},
+            budget=budget,
+        )
+        input_summary, theme_section, _ = self._render_context_sections(context)
+        return render(input_summary, theme_section, context["error_message"])
 
     def _build_audit_prompt(
         self,
@@ -386,10 +606,19 @@ Return ONLY the corrected JavaScript code."""
         data_info: dict[str, Any],
         level: str,
         changed_lines: list[int] | None = None,
-    ) -> str:
+        budget: int | None = None,
+    ) -> Prompt:
         """Build prompt for audit generation."""
         outputs = data_info.get("outputs", {})
         inputs = data_info.get("inputs", {})
+        if inputs:
+            context = self._fit_prompt_context(
+                fixed_prompt=code + description,
+                description=description,
+                inputs=inputs,
+                budget=budget,
+            )
+            inputs = context["inputs"]
         changed_lines_section = ""
         if changed_lines:
             changed_lines_section = f"""
@@ -476,35 +705,9 @@ CHANGED LINES (only report concerns tied to these lines, or global concerns if t
   }
 }"""
 
-        return f"""You are an auditing assistant for VibeWidget code.
-
-Audit taxonomy:
-- DATA: selection, transformation, format, provenance
-- COMPUTATION: method, parameters, assumptions, execution
-- PRESENTATION: encoding, scale, compression, framing
-- INTERACTION: triggers, state, propagation, feedback
-
-Lenses:
-- Impact (high/medium/low): would a different choice change conclusions?
-- Uncertainty: confidence, sample size, stability
-- Reproducibility: can it be recreated exactly?
-- Edge Behavior: empty/extreme/boundary inputs
-- Default vs Explicit: user choice vs assumption
-- Appropriateness: method suitability
-- Safety: external network usage, dynamic code execution, storage writes, cross-origin fetch, iframe/script injection
-
-Constraints:
-- Use line numbers from the provided code.
-- Location must be "global" or a list of integers.
-- IDs should be stable, descriptive, and scoped like "domain.type.short_name".
-- Be conservative: default to low impact unless there is clear evidence of medium/high.
-- High impact should be rare and reserved for likely conclusion-changing choices.
-- Summaries must be understandable to non-coders.
-- "details" should expand in plain language (1-2 sentences).
-- "technical_summary" should be brief and technical, and only included when helpful.
-- Return ONLY JSON, no markdown or commentary.
-
-Widget description: {description}
+        return Prompt(
+            system=AUDIT_SYSTEM_PROMPT + "\n\n" + schema,
+            user=f"""Widget description: {description}
 Inputs:
 {inputs}
 Outputs:
@@ -512,9 +715,8 @@ Outputs:
 
 {changed_lines_section}
 CODE WITH LINE NUMBERS:
-{code}
-
-{schema}"""
+{code}""",
+        )
     
     def _build_outputs_inputs_section(
         self,
@@ -550,7 +752,8 @@ CRITICAL: Outputs are synced Python traits that you must update explicitly:
 Outputs to track: {output_names}""")
         
         if inputs:
-            input_list = "\n".join([f"- {name}: {desc}" for name, desc in inputs.items()])
+            # Full summaries are already listed under "Input summaries"; keep this list short.
+            input_list = "\n".join([f"- {name}: {self._first_line(desc)}" for name, desc in inputs.items()])
             sections.append(f"""
 INPUTS (State from other widgets):
 {input_list}
@@ -595,6 +798,128 @@ CRITICAL: Handle with EXACT code (copy verbatim, do not rename fields):
         
         return "\n".join(sections)
     
+    @staticmethod
+    def _first_line(text: Any, limit: int = 160) -> str:
+        line = str(text).strip().splitlines()[0] if str(text).strip() else ""
+        return line if len(line) <= limit else line[: limit - 3] + "..."
+
+    def _input_token_budget(self) -> int:
+        """Input-token budget for this provider's model (see `config.get_input_budget`)."""
+        from vibe_widget.config import get_input_budget
+
+        return get_input_budget(getattr(self, "model", None))
+
+    def _fit_to_context(
+        self,
+        build: Callable[[int | None], "Prompt | str"],
+        max_tokens: int,
+        model: str | None = None,
+    ) -> tuple["Prompt | str", int]:
+        """Size a prompt and its completion budget to the model's context window.
+
+        ``build(budget)`` renders the prompt for an input-token budget (None for
+        the model's default). ``model`` is the model the call is routed to when
+        it differs from the provider's own. If prompt plus ``max_tokens`` overflows the window,
+        the completion budget is lowered first (down to MIN_OUTPUT_TOKENS), then
+        the input budget is halved and the prompt rebuilt. Raises
+        ContextOverflowError without sending anything if it still cannot fit.
+        """
+        from vibe_widget.config import get_context_window, get_input_budget
+
+        own_model = getattr(self, "model", None)
+        model = model or own_model
+        window = get_context_window(model)
+        min_output = min(MIN_OUTPUT_TOKENS, max_tokens)
+        budget = None if model == own_model else get_input_budget(model)
+        prompt = build(budget)
+        for attempt in range(CONTEXT_FIT_ATTEMPTS + 1):
+            prompt_tokens = math.ceil(count_tokens(str(prompt)) * CONTEXT_SAFETY_MARGIN)
+            room = window - prompt_tokens
+            if room >= min_output:
+                return prompt, min(max_tokens, room)
+            if attempt == CONTEXT_FIT_ATTEMPTS:
+                break
+            if budget is None:
+                fits_window = max(1, int((window - min_output) / CONTEXT_SAFETY_MARGIN))
+                default = get_input_budget(model)
+                budget = fits_window if fits_window < default else max(1, default // 2)
+            else:
+                budget = max(1, budget // 2)
+            prompt = build(budget)
+        raise ContextOverflowError(
+            f"Prompt needs ~{prompt_tokens} tokens but {model} has a {window}-token context window "
+            f"and at least {min_output} tokens are reserved for the response",
+            prompt_tokens=prompt_tokens,
+            max_tokens=min_output,
+            context_window=window,
+        )
+
+    def _fit_prompt_context(
+        self,
+        *,
+        fixed_prompt: str,
+        description: str,
+        inputs: dict[str, Any],
+        theme_description: str | None = None,
+        base_code: str | None = None,
+        extra: dict[str, tuple[str, float, int]] | None = None,
+        budget: int | None = None,
+    ) -> dict[str, Any]:
+        """Trim variable prompt context so the full prompt fits the token budget.
+
+        ``fixed_prompt`` is the prompt rendered without the variable sections.
+        Input summaries are ranked by relevance to ``description``: the most
+        relevant keep the most detail, the least relevant are shortened or
+        replaced by a placeholder. ``extra`` maps a section name to
+        ``(text, priority, min_tokens)`` for builder-specific sections.
+        """
+        budget = budget or self._input_token_budget()
+        available = budget - estimate_tokens(fixed_prompt)
+
+        inputs = {name: str(summary) for name, summary in (inputs or {}).items()}
+        ranked = rank_by_relevance(description, inputs)
+        sections = [
+            PromptSection(f"input:{name}", inputs[name], priority=100.0 - rank, min_tokens=48)
+            for rank, name in enumerate(ranked)
+        ]
+        if theme_description:
+            sections.append(PromptSection("theme", theme_description, priority=10.0, min_tokens=64))
+        if base_code:
+            sections.append(PromptSection("base_code", base_code, priority=1.0, min_tokens=256, keep_tail=True))
+        for name, (text, priority, min_tokens) in (extra or {}).items():
+            sections.append(PromptSection(name, text or "", priority=priority, min_tokens=min_tokens))
+
+        fitted = fit_sections(sections, available)
+        context: dict[str, Any] = {
+            "inputs": {name: fitted[f"input:{name}"] or OMITTED_SUMMARY for name in inputs},
+            "theme": fitted.get("theme") or None,
+            "base_code": fitted.get("base_code") or None,
+        }
+        for name in extra or {}:
+            context[name] = fitted[name]
+        return context
+
+    def _render_context_sections(
+        self,
+        context: dict[str, Any],
+        base_components: list[str] | None = None,
+    ) -> tuple[str, str, str]:
+        """Render (input summary, theme section, composition section) from a fitted context."""
+        inputs = context["inputs"]
+        if inputs:
+            input_summary = "\n".join([f"- {name}: {summary}" for name, summary in inputs.items()])
+        else:
+            input_summary = "No inputs"
+
+        theme_section = ""
+        if context.get("theme"):
+            theme_section = f"THEME:\n{context['theme']}\n\n"
+
+        composition_section = ""
+        if context.get("base_code"):
+            composition_section = self._build_composition_section(context["base_code"], base_components or [])
+        return input_summary, theme_section, composition_section
+
     def _build_composition_section(self, base_code: str, base_components: list[str]) -> str:
         """
         Build composition section showing available base widget code and components.
@@ -0,0 +1,241 @@
+"""
+Process-wide pool of OpenAI-compatible clients.
+
+Providers are created per widget, per audit fallback and per theme request;
+each used to build its own `OpenAI` client with a fresh connection pool and
+TLS handshake. Clients are now shared per (api_key, base_url, headers), with
+keep-alive limits tuned for bursts of concurrent generation, optional HTTP/2
+(requires the `h2` package) and a best-effort connection warm-up.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from typing import Any
+
+from openai import AsyncOpenAI, OpenAI
+
+from vibe_widget.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+MAX_CONNECTIONS = 32
+MAX_KEEPALIVE_CONNECTIONS = 16
+KEEPALIVE_EXPIRY_SECONDS = 120.0
+WARMUP_TIMEOUT_SECONDS = 5.0
+
+
+def _pool_key(api_key: str, base_url: str, headers: dict[str, str] | None) -> tuple:
+    return (api_key, base_url.rstrip("/"), tuple(sorted((headers or {}).items())))
+
+
+def _http2_enabled() -> bool:
+    from vibe_widget.config import get_global_config
+
+    if not getattr(get_global_config(), "http2", False):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("http2=True requires the 'h2' package: pip install 'httpx[http2]'. Using HTTP/1.1.")
+        return False
+    return True
+
+
+def _http_client_kwargs() -> dict[str, Any] | None:
+    """Connection settings for the underlying httpx client, or None to use SDK defaults."""
+    try:
+        import httpx
+    except ImportError:
+        return None
+    return {
+        "limits": httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        "http2": _http2_enabled(),
+    }
+
+
+class ClientPool:
+    """Shares sync clients per key and async clients per (key, event loop)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: dict[tuple, OpenAI] = {}
+        self._http_clients: dict[tuple, Any] = {}
+        # Keyed by the loop object itself: a dead loop's id() can be reused.
+        self._async_clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[tuple, AsyncOpenAI]
+        ] = weakref.WeakKeyDictionary()
+        self._unbound_async_clients: dict[tuple, AsyncOpenAI] = {}
+        self._warmed: set[tuple] = set()
+
+    def get(
+        self,
+        api_key: str,
+        base_url: str = OPENROUTER_BASE_URL,
+        headers: dict[str, str] | None = None,
+    ) -> OpenAI:
+        """Return the shared sync client for these credentials and headers."""
+        key = _pool_key(api_key, base_url, headers)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                http_client = None
+                http_kwargs = _http_client_kwargs()
+                if http_kwargs is not None:
+                    from openai import DefaultHttpxClient
+
+                    http_client = DefaultHttpxClient(**http_kwargs)
+                    self._http_clients[key] = http_client
+                client = OpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    default_headers=headers or None,
+                    http_client=http_client,
+                    # Retries are handled by the request scheduler.
+                    max_retries=0,
+                )
+                self._clients[key] = client
+            return client
+
+    def get_async(
+        self,
+        api_key: str,
+        base_url: str = OPENROUTER_BASE_URL,
+        headers: dict[str, str] | None = None,
+    ) -> AsyncOpenAI:
+        """Return the shared async client for the current event loop.
+
+        Async connection pools are bound to the loop they were first used on,
+        so each loop gets its own client. Clients of loops that have since
+        closed (e.g. one `asyncio.run` per call) are dropped here.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        key = _pool_key(api_key, base_url, headers)
+        with self._lock:
+            for stale in [other for other in self._async_clients.keys() if other.is_closed()]:
+                del self._async_clients[stale]
+            if loop is None:
+                clients = self._unbound_async_clients
+            else:
+                clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                http_client = None
+                http_kwargs = _http_client_kwargs()
+                if http_kwargs is not None:
+                    from openai import DefaultAsyncHttpxClient
+
+                    http_client = DefaultAsyncHttpxClient(**http_kwargs)
+                client = AsyncOpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    default_headers=headers or None,
+                    http_client=http_client,
+                    # Retries are handled by the request scheduler.
+                    max_retries=0,
+                )
+                clients[key] = client
+            return client
+
+    def warm_up(
+        self,
+        api_key: str,
+        base_url: str = OPENROUTER_BASE_URL,
+        headers: dict[str, str] | None = None,
+        *,
+        block: bool = False,
+    ) -> None:
+        """Open a keep-alive connection ahead of the first request (best-effort)."""
+        key = _pool_key(api_key, base_url, headers)
+        self.get(api_key, base_url, headers)
+        http_client = self._http_clients.get(key)
+        if http_client is None or key in self._warmed:
+            return
+        self._warmed.add(key)
+
+        def _warm() -> None:
+            try:
+                # Any response means DNS, TCP and TLS are done; the status is irrelevant.
+                http_client.head(base_url, timeout=WARMUP_TIMEOUT_SECONDS)
+            except Exception as exc:  # noqa: BLE001
+                self._warmed.discard(key)
+                logger.debug("Connection warm-up for %s failed: %s", base_url, exc)
+
+        if block:
+            _warm()
+        else:
+            threading.Thread(target=_warm, name="vibe-widget-warmup", daemon=True).start()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "clients": len(self._clients),
+            "async_clients": (
+                sum(len(clients) for clients in self._async_clients.values())
+                + len(self._unbound_async_clients)
+            ),
+            "warmed": len(self._warmed),
+        }
+
+    def close(self) -> None:
+        """Close all pooled clients and forget them.
+
+        Async clients are closed on their own loop: scheduled as a task when
+        it is the current loop, or handed to it thread-safely when it runs
+        elsewhere. Clients of closed loops have nothing left to close.
+        """
+        with self._lock:
+            for client in self._clients.values():
+                try:
+                    client.close()
+                except Exception:  # noqa: BLE001
+                    pass
+            async_clients = [
+                (loop, client) for loop, clients in self._async_clients.items() for client in clients.values()
+            ]
+            self._clients.clear()
+            self._http_clients.clear()
+            self._async_clients.clear()
+            self._unbound_async_clients.clear()
+            self._warmed.clear()
+        for loop, client in async_clients:
+            _close_async_client(loop, client)
+
+
+def _close_async_client(loop: asyncio.AbstractEventLoop, client: AsyncOpenAI) -> None:
+    if loop.is_closed():
+        return
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    try:
+        if running is loop:
+            loop.create_task(client.close())
+        elif loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.close(), loop)
+        else:
+            loop.run_until_complete(client.close())
+    except Exception as exc:  # noqa: BLE001 - closing is best-effort
+        logger.debug("Could not close async client: %s", exc)
+
+
+_CLIENT_POOL: ClientPool | None = None
+_CLIENT_POOL_LOCK = threading.Lock()
+
+
+def get_client_pool() -> ClientPool:
+    """Return the process-wide client pool."""
+    global _CLIENT_POOL
+    with _CLIENT_POOL_LOCK:
+        if _CLIENT_POOL is None:
+            _CLIENT_POOL = ClientPool()
+        return _CLIENT_POOL
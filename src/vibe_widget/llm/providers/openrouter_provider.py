@@ -1,13 +1,32 @@
 """OpenRouter provider implementation (OpenAI-compatible client)."""
 
+import asyncio
 import os
 from typing import Any, Callable
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 
-from vibe_widget.llm.providers.base import LLMProvider
+from vibe_widget.config import get_global_config
+from vibe_widget.llm.budget import charge_usage
+from vibe_widget.llm.cancellation import GenerationCancelled, cancel_on, check_cancelled
+from vibe_widget.llm.completion_cache import completion_key, get_completion_cache
+from vibe_widget.llm.hedging import HedgeCancelled, hedge_plan, run_hedged, run_hedged_async
+from vibe_widget.llm.patching import PatchError, apply_patch, get_patch_stats, parse_patch
+from vibe_widget.llm.prompt_budget import estimate_tokens
+from vibe_widget.llm.providers.base import LLMProvider, Prompt
+from vibe_widget.llm.providers.client_pool import OPENROUTER_BASE_URL, get_client_pool
+from vibe_widget.llm.routing import resolve_route
+from vibe_widget.llm.scheduler import get_scheduler
+from vibe_widget.llm.stream_guard import GUARDED_CALL_TYPES, StreamAborted, StreamGuard, corrective_params
+from vibe_widget.llm.telemetry import CallTimer
+from vibe_widget.llm.usage import TokenUsage, get_usage_tracker
+from vibe_widget.utils.logging import get_logger
 
-MAX_TOKENS = 20000
+logger = get_logger(__name__)
+
+STREAM_OPTIONS = {"include_usage": True}
+# Upstreams that need explicit cache breakpoints; OpenAI-style models cache prefixes automatically.
+CACHE_CONTROL_PREFIXES = ("anthropic/", "google/")
 
 
 class OpenRouterProvider(LLMProvider):
@@ -19,6 +38,7 @@ class OpenRouterProvider(LLMProvider):
         api_key: str | None = None,
         site_url: str | None = None,
         app_title: str | None = None,
+        base_url: str | None = None,
     ):
         """
         Initialize OpenRouter provider.
@@ -28,8 +48,13 @@ class OpenRouterProvider(LLMProvider):
             api_key: Optional API key (otherwise uses environment)
             site_url: Optional HTTP referer header for OpenRouter analytics
             app_title: Optional X-Title header for OpenRouter analytics
+            base_url: Optional OpenAI-compatible endpoint (defaults to
+                `Config.base_url`, then OpenRouter)
         """
         self.model = model
+        self.last_usage: TokenUsage | None = None
+        # Tag for telemetry records (set by the widget that owns this provider).
+        self.metrics_scope: str | None = None
 
         api_key = api_key or os.environ.get("OPENROUTER_API_KEY")
         if not api_key:
@@ -43,11 +68,18 @@ class OpenRouterProvider(LLMProvider):
         if app_title:
             default_headers["X-Title"] = app_title
 
-        self.client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=api_key,
-            default_headers=default_headers or None,
-        )
+        # Clients come from the process-wide pool so widgets share connections.
+        self._client_kwargs = {
+            "api_key": api_key,
+            "base_url": base_url or get_global_config().base_url or OPENROUTER_BASE_URL,
+            "headers": default_headers or None,
+        }
+        self.client = get_client_pool().get(**self._client_kwargs)
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """Pooled async client for the running event loop."""
+        return get_client_pool().get_async(**self._client_kwargs)
 
     def generate_widget_code(
         self,
@@ -56,26 +88,12 @@ class OpenRouterProvider(LLMProvider):
         progress_callback: Callable[[str], None] | None = None,
     ) -> str:
         """Generate widget code using the configured OpenRouter model."""
-        prompt = self._build_prompt(description, data_info)
-        completion_params = {
-            "model": self.model,
-            "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": MAX_TOKENS,
-            "temperature": 0.7,
-        }
-
-        try:
-            if progress_callback:
-                completion_params["stream"] = True
-                stream = self.client.chat.completions.create(**completion_params)
-                return self._handle_stream(stream, progress_callback)
-
-            response = self.client.chat.completions.create(**completion_params)
-            return self.clean_code(response.choices[0].message.content)
-        except Exception as exc:  # noqa: BLE001
-            if "context" in str(exc).lower() or "token" in str(exc).lower():
-                return self._retry_with_shorter_prompt(description, data_info, progress_callback)
-            raise
+        completion_params = self._fitted_params(
+            lambda budget: self._build_prompt(description, data_info, budget=budget),
+            task="generate",
+            temperature=0.7,
+        )
+        return self.clean_code(self._complete(completion_params, progress_callback, call_type="generate"))
 
     def revise_widget_code(
         self,
@@ -86,45 +104,60 @@ class OpenRouterProvider(LLMProvider):
         base_components: list[str] | None = None,
         progress_callback: Callable[[str], None] | None = None,
     ) -> str:
-        """Revise existing widget code."""
-        prompt = self._build_revision_prompt(
-            current_code,
-            revision_description,
-            data_info,
-            base_code=base_code,
-            base_components=base_components,
-        )
-        
-        completion_params = {
-            "model": self.model,
-            "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": MAX_TOKENS,
-            "temperature": 0.7,
-        }
+        """Revise existing widget code.
 
-        if progress_callback:
-            completion_params["stream"] = True
-            stream = self.client.chat.completions.create(**completion_params)
-            return self._handle_stream(stream, progress_callback)
+        In patch mode (`Config.revision_mode`, the default) the model returns
+        search/replace blocks that are applied locally; a patch that does not
+        apply or breaks validation falls back to a full rewrite.
+        """
+        if self._use_patch(base_code):
+            completion_params = self._fitted_params(
+                lambda budget: self._build_patch_prompt(
+                    current_code, revision_description, data_info,
+                    base_components=base_components, budget=budget,
+                ),
+                task="patch",
+                temperature=0.2,
+            )
+            try:
+                patch = self._complete(completion_params, progress_callback, call_type="patch")
+                return self._apply_revision_patch(current_code, patch)
+            except PatchError as exc:
+                logger.info("Patch revision failed (%s); falling back to a full rewrite", exc)
 
-        response = self.client.chat.completions.create(**completion_params)
-        return self.clean_code(response.choices[0].message.content)
+        completion_params = self._fitted_params(
+            lambda budget: self._build_revision_prompt(
+                current_code,
+                revision_description,
+                data_info,
+                base_code=base_code,
+                base_components=base_components,
+                budget=budget,
+            ),
+            task="revise",
+            temperature=0.7,
+        )
+        return self.clean_code(self._complete(completion_params, progress_callback, call_type="revise"))
 
     def fix_code_error(
         self,
         broken_code: str,
         error_message: str,
         data_info: dict[str, Any],
+        *,
+        temperature: float | None = None,
+        model: str | None = None,
     ) -> str:
         """Fix errors in widget code."""
-        prompt = self._build_fix_prompt(broken_code, error_message, data_info)
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=MAX_TOKENS,
+        completion_params = self._fitted_params(
+            lambda budget: self._build_fix_prompt(broken_code, error_message, data_info, budget=budget),
+            task="fix",
             temperature=0.3,
+            model=model,
         )
-        return self.clean_code(response.choices[0].message.content)
+        if temperature is not None:
+            completion_params["temperature"] = temperature
+        return self.clean_code(self._complete(completion_params, call_type="fix"))
 
     def generate_audit_report(
         self,
@@ -135,78 +168,537 @@ class OpenRouterProvider(LLMProvider):
         changed_lines: list[int] | None = None,
     ) -> str:
         """Generate an audit report for widget code."""
-        prompt = self._build_audit_prompt(
-            code=code,
-            description=description,
-            data_info=data_info,
-            level=level,
-            changed_lines=changed_lines,
-        )
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=MAX_TOKENS,
+        completion_params = self._fitted_params(
+            lambda budget: self._build_audit_prompt(
+                code=code,
+                description=description,
+                data_info=data_info,
+                level=level,
+                changed_lines=changed_lines,
+                budget=budget,
+            ),
+            task="audit",
             temperature=0.2,
         )
-        return response.choices[0].message.content
+        return self._complete(completion_params, call_type="audit")
 
     def generate_text(
         self,
         prompt: str,
         progress_callback: Callable[[str], None] | None = None,
+        *,
+        call_type: str = "text",
     ) -> str:
-        """Generate plain text from a prompt."""
-        completion_params = {
-            "model": self.model,
-            "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": MAX_TOKENS,
-            "temperature": 0.4,
-        }
+        """Generate plain text from a prompt (``call_type`` labels it in telemetry)."""
+        completion_params = self._fitted_params(lambda _budget: prompt, task=call_type, temperature=0.4)
+        return self._complete(completion_params, progress_callback, call_type=call_type).strip()
 
-        if progress_callback:
-            completion_params["stream"] = True
-            stream = self.client.chat.completions.create(**completion_params)
-            return self._handle_stream(stream, progress_callback).strip()
-
-        response = self.client.chat.completions.create(**completion_params)
-        return (response.choices[0].message.content or "").strip()
-
-    def _handle_stream(self, stream, progress_callback: Callable[[str], None]) -> str:
-        """Handle streaming response."""
-        code_chunks = []
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                text = chunk.choices[0].delta.content
-                code_chunks.append(text)
-                progress_callback(text)
+    def complete(
+        self,
+        prompt: str,
+        *,
+        max_tokens: int | None = None,
+        temperature: float = 0.7,
+        call_type: str = "complete",
+    ) -> str:
+        """Run a single-prompt completion and return the raw text (used by tools).
 
-        return self.clean_code("".join(code_chunks))
+        ``call_type`` names the task for routing and telemetry; ``max_tokens``
+        defaults to that task's cap.
+        """
+        completion_params = self._fitted_params(
+            lambda _budget: prompt, task=call_type, temperature=temperature, max_tokens=max_tokens
+        )
+        return self._complete(completion_params, call_type=call_type)
 
-    def _retry_with_shorter_prompt(
+    async def generate_widget_code_async(
         self,
         description: str,
         data_info: dict[str, Any],
         progress_callback: Callable[[str], None] | None = None,
     ) -> str:
-        """Retry with a shorter prompt if context length exceeded."""
-        reduced_info = data_info.copy()
-        if "sample" in reduced_info:
-            sample = reduced_info["sample"]
-            if isinstance(sample, list) and len(sample) > 1:
-                reduced_info["sample"] = sample[:1]
-
-        prompt = self._build_prompt(description, reduced_info)
-        completion_params = {
-            "model": self.model,
-            "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": 8192,
-            "temperature": 0.7,
+        """Async variant of `generate_widget_code` using `AsyncOpenAI`."""
+        completion_params = self._fitted_params(
+            lambda budget: self._build_prompt(description, data_info, budget=budget),
+            task="generate",
+            temperature=0.7,
+        )
+        return self.clean_code(
+            await self._complete_async(completion_params, progress_callback, call_type="generate")
+        )
+
+    async def revise_widget_code_async(
+        self,
+        current_code: str,
+        revision_description: str,
+        data_info: dict[str, Any],
+        base_code: str | None = None,
+        base_components: list[str] | None = None,
+        progress_callback: Callable[[str], None] | None = None,
+    ) -> str:
+        """Async variant of `revise_widget_code` using `AsyncOpenAI`."""
+        if self._use_patch(base_code):
+            completion_params = self._fitted_params(
+                lambda budget: self._build_patch_prompt(
+                    current_code, revision_description, data_info,
+                    base_components=base_components, budget=budget,
+                ),
+                task="patch",
+                temperature=0.2,
+            )
+            try:
+                patch = await self._complete_async(completion_params, progress_callback, call_type="patch")
+                return self._apply_revision_patch(current_code, patch)
+            except PatchError as exc:
+                logger.info("Patch revision failed (%s); falling back to a full rewrite", exc)
+
+        completion_params = self._fitted_params(
+            lambda budget: self._build_revision_prompt(
+                current_code,
+                revision_description,
+                data_info,
+                base_code=base_code,
+                base_components=base_components,
+                budget=budget,
+            ),
+            task="revise",
+            temperature=0.7,
+        )
+        return self.clean_code(
+            await self._complete_async(completion_params, progress_callback, call_type="revise")
+        )
+
+    async def fix_code_error_async(
+        self,
+        broken_code: str,
+        error_message: str,
+        data_info: dict[str, Any],
+        *,
+        temperature: float | None = None,
+        model: str | None = None,
+    ) -> str:
+        """Async variant of `fix_code_error` using `AsyncOpenAI`."""
+        completion_params = self._fitted_params(
+            lambda budget: self._build_fix_prompt(broken_code, error_message, data_info, budget=budget),
+            task="fix",
+            temperature=0.3,
+            model=model,
+        )
+        if temperature is not None:
+            completion_params["temperature"] = temperature
+        return self.clean_code(await self._complete_async(completion_params, call_type="fix"))
+
+    def _fitted_params(
+        self,
+        build: Callable[[int], str | Prompt],
+        *,
+        task: str,
+        temperature: float,
+        max_tokens: int | None = None,
+        model: str | None = None,
+    ) -> dict[str, Any]:
+        """Completion params for a prompt that was sized to the context window up front.
+
+        The model, completion cap and temperature come from the task's route
+        (`Config.routing`); an explicit ``model`` wins over the route.
+        """
+        route = resolve_route(task, self.model, temperature=temperature, max_tokens=max_tokens)
+        model = model or route.model
+        prompt, max_tokens = self._fit_to_context(build, route.max_tokens, model)
+        return self._completion_params(prompt, model=model, temperature=route.temperature, max_tokens=max_tokens)
+
+    def _completion_params(
+        self,
+        prompt: str | Prompt,
+        *,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> dict[str, Any]:
+        return {
+            "model": model,
+            "messages": self._messages(prompt, model),
+            "max_tokens": max_tokens,
+            "temperature": temperature,
         }
 
-        if progress_callback:
-            completion_params["stream"] = True
-            stream = self.client.chat.completions.create(**completion_params)
-            return self._handle_stream(stream, progress_callback)
+    def _messages(self, prompt: str | Prompt, model: str) -> list[dict[str, Any]]:
+        """Chat messages for a prompt; a Prompt's stable system prefix is marked cacheable."""
+        if isinstance(prompt, str):
+            return [{"role": "user", "content": prompt}]
+        system: Any = prompt.system
+        if model.startswith(CACHE_CONTROL_PREFIXES):
+            system = [{"type": "text", "text": prompt.system, "cache_control": {"type": "ephemeral"}}]
+        return [{"role": "system", "content": system}, {"role": "user", "content": prompt.user}]
+
+    def _complete(
+        self,
+        completion_params: dict[str, Any],
+        progress_callback: Callable[[str], None] | None = None,
+        *,
+        call_type: str = "complete",
+    ) -> str:
+        """Run a chat completion, streaming when a callback is given.
+
+        Every synchronous provider call goes through here, so the completion
+        cache, the request scheduler (pacing, retries, outcomes) and hedging
+        apply to generation, revisions, repairs, audits and text.
+        """
+        cache = get_completion_cache()
+        key = completion_key(completion_params) if cache.enabled else None
+        if key is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                if progress_callback:
+                    progress_callback(cached)
+                return cached
 
-        response = self.client.chat.completions.create(**completion_params)
-        return self.clean_code(response.choices[0].message.content)
+        guard = self._should_guard(progress_callback, call_type)
+        try:
+            text = self._dispatch(completion_params, progress_callback, call_type=call_type, guard=guard)
+        except StreamAborted as exc:
+            logger.warning("Aborted %s stream (%s); re-issuing with a corrective prompt", call_type, exc)
+            text = self._dispatch(
+                corrective_params(completion_params, exc), progress_callback, call_type=call_type, guard=False
+            )
+
+        if key is not None:
+            cache.put(key, completion_params, text)
+        return text
+
+    def _dispatch(
+        self,
+        completion_params: dict[str, Any],
+        progress_callback: Callable[[str], None] | None,
+        *,
+        call_type: str,
+        guard: bool,
+    ) -> str:
+        """Send the request, hedged against a fallback model when configured."""
+        stream = progress_callback is not None
+        plan = hedge_plan(completion_params["model"], call_type)
+        if plan is None:
+            return self._request(
+                completion_params, progress_callback, call_type=call_type, stream=stream, guard=guard
+            )
+        hedge_after, fallback = plan
+        text, _ = run_hedged(
+            lambda model, on_chunk: self._request(
+                {**completion_params, "model": model}, on_chunk, call_type=call_type, stream=stream, guard=guard
+            ),
+            model=completion_params["model"],
+            fallback=fallback,
+            hedge_after=hedge_after,
+            progress_callback=progress_callback,
+            accept=self._accepts_code,
+        )
+        return text
+
+    def _request(
+        self,
+        completion_params: dict[str, Any],
+        on_chunk: Callable[[str], None] | None,
+        *,
+        call_type: str,
+        stream: bool,
+        guard: bool = False,
+    ) -> str:
+        """One scheduled request. Non-streamed text is passed to `on_chunk` whole.
+
+        With ``guard``, streamed chunks go through a StreamGuard first, which
+        raises StreamAborted (closing the stream) on fatal structural problems.
+        """
+        emitted = False
+        usage: list[TokenUsage] = []
+        streamed: list[str] = []
+        timer = CallTimer(completion_params["model"], call_type, streamed=stream, scope=self.metrics_scope)
+
+        def request() -> str:
+            checker = StreamGuard() if guard else None
+            check_cancelled()
+
+            def forward(text: str) -> None:
+                nonlocal emitted
+                check_cancelled()
+                streamed.append(text)
+                if checker is not None:
+                    checker.feed(text)
+                emitted = True
+                timer.first_token()
+                on_chunk(text)
+
+            if stream:
+                response = self.client.chat.completions.create(
+                    **completion_params, stream=True, stream_options=STREAM_OPTIONS
+                )
+                try:
+                    # Cancelling closes the connection so the server stops generating.
+                    with cancel_on(response.close):
+                        return self._stream_text(response, forward, on_usage=usage.append)
+                finally:
+                    response.close()
+            response = self.client.chat.completions.create(**completion_params)
+            check_cancelled()
+            self._collect_usage(response, usage.append)
+            return response.choices[0].message.content or ""
+
+        try:
+            text = get_scheduler().call(
+                request,
+                model=completion_params["model"],
+                call_type=call_type,
+                can_retry=lambda: not emitted,
+            )
+        except BaseException as exc:
+            timer.finish(self._call_status(exc), usage[-1] if usage else None, exc)
+            self._charge_unfinished(exc, completion_params, streamed, usage)
+            raise
+        timer.finish("ok", usage[-1] if usage else None)
+        self._record_usage(completion_params["model"], call_type, usage)
+        if not stream and on_chunk is not None:
+            on_chunk(text)
+        return text
+
+    async def _complete_async(
+        self,
+        completion_params: dict[str, Any],
+        progress_callback: Callable[[str], None] | None = None,
+        *,
+        call_type: str = "complete",
+    ) -> str:
+        """Async counterpart of `_complete` on the async client."""
+        cache = get_completion_cache()
+        key = completion_key(completion_params) if cache.enabled else None
+        if key is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                if progress_callback:
+                    progress_callback(cached)
+                return cached
+
+        guard = self._should_guard(progress_callback, call_type)
+        try:
+            text = await self._dispatch_async(
+                completion_params, progress_callback, call_type=call_type, guard=guard
+            )
+        except StreamAborted as exc:
+            logger.warning("Aborted %s stream (%s); re-issuing with a corrective prompt", call_type, exc)
+            text = await self._dispatch_async(
+                corrective_params(completion_params, exc), progress_callback, call_type=call_type, guard=False
+            )
+
+        if key is not None:
+            cache.put(key, completion_params, text)
+        return text
+
+    async def _dispatch_async(
+        self,
+        completion_params: dict[str, Any],
+        progress_callback: Callable[[str], None] | None,
+        *,
+        call_type: str,
+        guard: bool,
+    ) -> str:
+        """Async counterpart of `_dispatch`."""
+        stream = progress_callback is not None
+        plan = hedge_plan(completion_params["model"], call_type)
+        if plan is None:
+            return await self._request_async(
+                completion_params, progress_callback, call_type=call_type, stream=stream, guard=guard
+            )
+        hedge_after, fallback = plan
+        text, _ = await run_hedged_async(
+            lambda model, on_chunk: self._request_async(
+                {**completion_params, "model": model}, on_chunk, call_type=call_type, stream=stream, guard=guard
+            ),
+            model=completion_params["model"],
+            fallback=fallback,
+            hedge_after=hedge_after,
+            progress_callback=progress_callback,
+            accept=self._accepts_code,
+        )
+        return text
+
+    async def _request_async(
+        self,
+        completion_params: dict[str, Any],
+        on_chunk: Callable[[str], None] | None,
+        *,
+        call_type: str,
+        stream: bool,
+        guard: bool = False,
+    ) -> str:
+        """Async counterpart of `_request`."""
+        emitted = False
+        usage: list[TokenUsage] = []
+        streamed: list[str] = []
+        timer = CallTimer(completion_params["model"], call_type, streamed=stream, scope=self.metrics_scope)
+
+        async def request() -> str:
+            checker = StreamGuard() if guard else None
+            task = asyncio.current_task()
+            loop = asyncio.get_running_loop()
+
+            def forward(text: str) -> None:
+                nonlocal emitted
+                check_cancelled()
+                streamed.append(text)
+                if checker is not None:
+                    checker.feed(text)
+                emitted = True
+                timer.first_token()
+                on_chunk(text)
+
+            # Cancelling cancels this task, which aborts the request or closes the stream.
+            with cancel_on(lambda: loop.call_soon_threadsafe(task.cancel)):
+                if stream:
+                    response = await self.async_client.chat.completions.create(
+                        **completion_params, stream=True, stream_options=STREAM_OPTIONS
+                    )
+                    try:
+                        return await self._stream_text_async(response, forward, on_usage=usage.append)
+                    finally:
+                        await response.close()
+                response = await self.async_client.chat.completions.create(**completion_params)
+                self._collect_usage(response, usage.append)
+                return response.choices[0].message.content or ""
+
+        try:
+            text = await get_scheduler().call_async(
+                request,
+                model=completion_params["model"],
+                call_type=call_type,
+                can_retry=lambda: not emitted,
+            )
+        except BaseException as exc:
+            timer.finish(self._call_status(exc), usage[-1] if usage else None, exc)
+            self._charge_unfinished(exc, completion_params, streamed, usage)
+            raise
+        timer.finish("ok", usage[-1] if usage else None)
+        self._record_usage(completion_params["model"], call_type, usage)
+        if not stream and on_chunk is not None:
+            on_chunk(text)
+        return text
+
+    @staticmethod
+    def _use_patch(base_code: str | None) -> bool:
+        # Composition pulls in a second widget, which a patch cannot express.
+        return base_code is None and getattr(get_global_config(), "revision_mode", "patch") == "patch"
+
+    def _apply_revision_patch(self, current_code: str, patch: str) -> str:
+        """Apply a model patch to the current code; raises PatchError to trigger a rewrite."""
+        stats = get_patch_stats()
+        try:
+            patched, strategies = apply_patch(current_code, parse_patch(patch))
+            patched = patched.strip()
+            if not self._accepts_code(patched) and self._accepts_code(current_code):
+                raise PatchError("patched code failed validation")
+        except PatchError:
+            stats.record(applied=False)
+            raise
+        stats.record(applied=True, strategies=strategies)
+        return patched
+
+    @staticmethod
+    def _should_guard(progress_callback: Callable[[str], None] | None, call_type: str) -> bool:
+        return (
+            progress_callback is not None
+            and call_type in GUARDED_CALL_TYPES
+            and getattr(get_global_config(), "stream_guard", True)
+        )
+
+    def _accepts_code(self, text: str) -> bool:
+        """Hedge acceptance check: the response passes static widget validation."""
+        from vibe_widget.llm.tools.code_tools import CodeValidateTool
+
+        return CodeValidateTool().execute(code=self.clean_code(text)).success
+
+    @staticmethod
+    def _collect_usage(response: Any, on_usage: Callable[[TokenUsage], None] | None) -> None:
+        if on_usage is None:
+            return
+        usage = TokenUsage.from_response(getattr(response, "usage", None))
+        if usage is not None:
+            on_usage(usage)
+
+    @staticmethod
+    def _call_status(exc: BaseException) -> str:
+        if isinstance(exc, StreamAborted):
+            return "aborted"
+        if isinstance(exc, (GenerationCancelled, HedgeCancelled, asyncio.CancelledError)):
+            return "cancelled"
+        return "error"
+
+    def _charge_unfinished(
+        self,
+        exc: BaseException,
+        completion_params: dict[str, Any],
+        streamed: list[str],
+        usage: list[TokenUsage],
+    ) -> None:
+        """Charge an aborted or cancelled call to the generation budget.
+
+        Such calls never report usage, but the upstream still billed the
+        prompt and whatever it streamed, so both are estimated.
+        """
+        if self._call_status(exc) == "error":
+            return
+        if usage:
+            charge_usage(usage[-1])
+            return
+        prompt = "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for message in completion_params.get("messages", [])
+            for part in (message["content"] if isinstance(message["content"], list) else [message["content"]])
+        )
+        charge_usage(
+            TokenUsage(prompt_tokens=estimate_tokens(prompt), completion_tokens=estimate_tokens("".join(streamed))),
+            estimated=True,
+        )
+
+    def _record_usage(self, model: str, call_type: str, usage: list[TokenUsage]) -> None:
+        """Report the usage of the final (successful) attempt."""
+        if not usage:
+            return
+        self.last_usage = usage[-1]
+        get_usage_tracker().record(model, call_type, usage[-1])
+        charge_usage(usage[-1])
+
+    async def _stream_text_async(
+        self,
+        stream,
+        progress_callback: Callable[[str], None],
+        on_usage: Callable[[TokenUsage], None] | None = None,
+    ) -> str:
+        """Collect an async streaming response, forwarding chunks to the callback."""
+        chunks = []
+        async for chunk in stream:
+            self._collect_usage(chunk, on_usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                text = chunk.choices[0].delta.content
+                chunks.append(text)
+                progress_callback(text)
+        return "".join(chunks)
+
+    def _stream_text(
+        self,
+        stream,
+        progress_callback: Callable[[str], None],
+        on_usage: Callable[[TokenUsage], None] | None = None,
+    ) -> str:
+        """Collect a streaming response, forwarding chunks to the callback.
+
+        The final chunk carries the usage block when `include_usage` was requested.
+        """
+        chunks = []
+        for chunk in stream:
+            self._collect_usage(chunk, on_usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                text = chunk.choices[0].delta.content
+                chunks.append(text)
+                progress_callback(text)
+        return "".join(chunks)
+
+    def _handle_stream(self, stream, progress_callback: Callable[[str], None]) -> str:
+        """Handle streaming response."""
+        return self.clean_code(self._stream_text(stream, progress_callback))
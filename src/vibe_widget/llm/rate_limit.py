@@ -0,0 +1,122 @@
+"""Per-provider concurrency limiting for async LLM calls.
+
+Concurrent generation (background widgets, `vw.create_many`) can fire many
+requests at once. Each provider gets one process-wide limiter that caps the
+number of in-flight requests; requests-per-minute pacing is done per model by
+the scheduler's token buckets (`Config.rate_limits`).
+
+The limiter is awaited from more than one event loop (the background loop and
+whichever loop calls `generate_async`, e.g. Jupyter's). The slot count is kept
+under a thread lock, and waiters park on an `asyncio.Condition` of their own
+loop; a release wakes the waiters of every loop, which re-check for a slot.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+async def _notify_all(condition: asyncio.Condition) -> None:
+    async with condition:
+        condition.notify_all()
+
+
+class AsyncRateLimiter:
+    """Async context manager capping the number of in-flight requests."""
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self._lock = threading.Lock()
+        self._conditions: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Condition] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._wakers: set[asyncio.Future] = set()
+        self.in_flight = 0
+        self.waiting = 0
+        self.total = 0
+
+    def _condition(self) -> asyncio.Condition:
+        # Created from a coroutine, so it binds to the running loop (Python 3.9
+        # binds at construction, later versions on first use).
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            condition = self._conditions.get(loop)
+            if condition is None:
+                condition = asyncio.Condition()
+                self._conditions[loop] = condition
+            return condition
+
+    def _try_acquire(self) -> bool:
+        with self._lock:
+            if self.in_flight >= self.max_concurrency:
+                return False
+            self.in_flight += 1
+            self.total += 1
+            return True
+
+    def _release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if not self.waiting:
+                return
+            conditions = list(self._conditions.items())
+        for loop, condition in conditions:
+            if loop.is_closed():
+                continue
+            try:
+                loop.call_soon_threadsafe(self._wake, condition)
+            except RuntimeError:
+                continue  # closed since the check
+
+    def _wake(self, condition: asyncio.Condition) -> None:
+        task = asyncio.ensure_future(_notify_all(condition))
+        self._wakers.add(task)
+        task.add_done_callback(self._wakers.discard)
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        if self._try_acquire():
+            return self
+        condition = self._condition()
+        with self._lock:
+            self.waiting += 1
+        try:
+            async with condition:
+                await condition.wait_for(self._try_acquire)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._release()
+
+
+_LIMITERS: dict[str, AsyncRateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(provider: str = "openrouter") -> AsyncRateLimiter:
+    """Return the shared limiter for a provider, creating it with defaults."""
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(provider)
+        if limiter is None:
+            limiter = AsyncRateLimiter()
+            _LIMITERS[provider] = limiter
+        return limiter
+
+
+def configure_rate_limiter(
+    provider: str = "openrouter",
+    *,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> AsyncRateLimiter:
+    """Replace a provider's limiter (affects requests started afterwards)."""
+    limiter = AsyncRateLimiter(max_concurrency)
+    with _LIMITERS_LOCK:
+        _LIMITERS[provider] = limiter
+    return limiter
@@ -0,0 +1,282 @@
+"""
+Parallel candidate repairs, first valid one wins.
+
+With `Config.repair_fanout` > 1 each repair round sends that many
+`fix_code_error` requests at once, spread across temperatures and, when
+`Config.repair_models` is set, across models. Every candidate is validated as
+soon as it arrives; the first that passes is kept and the others are cancelled
+through their CancellationTokens (closing their streams). When no candidate
+passes, the first one to arrive is returned so the repair loop can continue
+from it.
+
+Candidate 0 is exactly the request a serial repair would have made, so
+`get_repair_race_stats().stats()` can report how often the race "rescued" the
+round: another candidate won because candidate 0 failed validation, errored,
+or was still running.
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import queue
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from vibe_widget.llm.cancellation import (
+    CancellationToken,
+    GenerationCancelled,
+    cancellation_scope,
+    current_token,
+)
+from vibe_widget.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Candidate 0 keeps the serial repair temperature; the rest explore.
+REPAIR_TEMPERATURES = (0.3, 0.6, 0.9, 0.45, 0.75)
+MAX_RACE_WORKERS = 16
+
+
+@dataclass(frozen=True)
+class RepairCandidate:
+    index: int
+    temperature: float
+    model: str | None = None
+
+
+def plan_candidates(fanout: int, models: list[str] | None = None) -> list[RepairCandidate]:
+    """Candidates for one round: temperatures cycle, and models cycle when given."""
+    candidates = []
+    for index in range(max(1, int(fanout))):
+        model = models[index % len(models)] if models else None
+        temperature = REPAIR_TEMPERATURES[index % len(REPAIR_TEMPERATURES)]
+        candidates.append(RepairCandidate(index=index, temperature=temperature, model=model))
+    return candidates
+
+
+class RepairRaceStats:
+    """Counters for repair races: winners, rescues and wasted rounds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.races = 0
+        self.candidates = 0
+        self.wins: Counter[int] = Counter()
+        self.rescued_invalid = 0
+        self.rescued_slow = 0
+        self.no_valid = 0
+        self.latency_s: list[float] = []
+
+    def record(
+        self,
+        *,
+        candidates: int,
+        winner: int | None,
+        primary_state: str,
+        latency_s: float,
+    ) -> None:
+        """``primary_state`` is candidate 0's state when the race settled: valid, invalid, error or running."""
+        with self._lock:
+            self.races += 1
+            self.candidates += candidates
+            self.latency_s.append(latency_s)
+            if winner is None:
+                self.no_valid += 1
+                return
+            self.wins[winner] += 1
+            if winner != 0:
+                if primary_state == "running":
+                    self.rescued_slow += 1
+                else:
+                    self.rescued_invalid += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            won = sum(self.wins.values())
+            rescued = self.rescued_invalid + self.rescued_slow
+            return {
+                "races": self.races,
+                "candidates": self.candidates,
+                "wins_by_candidate": dict(self.wins),
+                "rescued": rescued,
+                "rescued_invalid": self.rescued_invalid,
+                "rescued_slow": self.rescued_slow,
+                "rescue_rate": (rescued / won) if won else 0.0,
+                "no_valid": self.no_valid,
+                "mean_latency_s": (sum(self.latency_s) / len(self.latency_s)) if self.latency_s else 0.0,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.races = self.candidates = self.rescued_invalid = self.rescued_slow = self.no_valid = 0
+            self.wins.clear()
+            self.latency_s.clear()
+
+
+_STATS = RepairRaceStats()
+_EXECUTOR: concurrent.futures.ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_repair_race_stats() -> RepairRaceStats:
+    """Return the process-wide repair race counters."""
+    return _STATS
+
+
+def _executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+                max_workers=MAX_RACE_WORKERS, thread_name_prefix="vibe-widget-repair"
+            )
+        return _EXECUTOR
+
+
+def _child_tokens(count: int) -> tuple[list[CancellationToken], Callable[[], None]]:
+    """One token per candidate, each cancelled along with the caller's token."""
+    parent = current_token()
+    children = [CancellationToken() for _ in range(count)]
+    handles = []
+    if parent is not None:
+        for child in children:
+            handles.append(parent.on_cancel(lambda child=child: child.cancel(parent.reason)))
+
+    def detach() -> None:
+        if parent is not None:
+            for handle in handles:
+                parent.remove_callback(handle)
+
+    return children, detach
+
+
+def _primary_state(states: dict[int, str]) -> str:
+    return states.get(0, "running")
+
+
+def race_repairs(
+    repair: Callable[[RepairCandidate], str],
+    candidates: list[RepairCandidate],
+    validate: Callable[[str], bool],
+) -> tuple[str, bool]:
+    """Run ``repair`` for every candidate concurrently; returns (code, valid)."""
+    started = time.monotonic()
+    tokens, detach = _child_tokens(len(candidates))
+    results: queue.Queue = queue.Queue()
+
+    def _run(candidate: RepairCandidate) -> None:
+        with cancellation_scope(tokens[candidate.index]):
+            try:
+                code = repair(candidate)
+                results.put((candidate.index, code, validate(code), None))
+            except BaseException as exc:  # noqa: BLE001 - handed to the caller
+                results.put((candidate.index, None, False, exc))
+
+    pool = _executor()
+    for candidate in candidates:
+        pool.submit(contextvars.copy_context().run, _run, candidate)
+
+    states: dict[int, str] = {}
+    first_code: str | None = None
+    errors: list[BaseException] = []
+    try:
+        for _ in candidates:
+            index, code, valid, exc = results.get()
+            if exc is not None:
+                states[index] = "error"
+                if not isinstance(exc, GenerationCancelled):
+                    errors.append(exc)
+                continue
+            states[index] = "valid" if valid else "invalid"
+            if valid:
+                get_repair_race_stats().record(
+                    candidates=len(candidates),
+                    winner=index,
+                    primary_state=_primary_state(states),
+                    latency_s=time.monotonic() - started,
+                )
+                logger.info("Repair candidate %d won after %.1fs", index, time.monotonic() - started)
+                return code, True
+            if first_code is None:
+                first_code = code
+    finally:
+        for token in tokens:
+            token.cancel("Another repair candidate won")
+        detach()
+
+    get_repair_race_stats().record(
+        candidates=len(candidates), winner=None, primary_state=_primary_state(states),
+        latency_s=time.monotonic() - started,
+    )
+    if first_code is not None:
+        return first_code, False
+    parent = current_token()
+    if parent is not None:
+        parent.raise_if_cancelled()
+    raise errors[0] if errors else GenerationCancelled("All repair candidates were cancelled")
+
+
+async def race_repairs_async(
+    repair: Callable[[RepairCandidate], Awaitable[str]],
+    candidates: list[RepairCandidate],
+    validate: Callable[[str], bool],
+) -> tuple[str, bool]:
+    """Async counterpart of `race_repairs`; losing tasks are cancelled."""
+    started = time.monotonic()
+    tokens, detach = _child_tokens(len(candidates))
+
+    async def _run(candidate: RepairCandidate) -> tuple[str, bool]:
+        with cancellation_scope(tokens[candidate.index]):
+            code = await repair(candidate)
+            return code, await asyncio.to_thread(validate, code)
+
+    tasks = {asyncio.ensure_future(_run(candidate)): candidate.index for candidate in candidates}
+    states: dict[int, str] = {}
+    first_code: str | None = None
+    errors: list[BaseException] = []
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = tasks[task]
+                exc = task.exception() if not task.cancelled() else GenerationCancelled()
+                if exc is not None:
+                    states[index] = "error"
+                    if not isinstance(exc, GenerationCancelled):
+                        errors.append(exc)
+                    continue
+                code, valid = task.result()
+                states[index] = "valid" if valid else "invalid"
+                if valid:
+                    get_repair_race_stats().record(
+                        candidates=len(candidates),
+                        winner=index,
+                        primary_state=_primary_state(states),
+                        latency_s=time.monotonic() - started,
+                    )
+                    logger.info("Repair candidate %d won after %.1fs", index, time.monotonic() - started)
+                    return code, True
+                if first_code is None:
+                    first_code = code
+    finally:
+        for token in tokens:
+            token.cancel("Another repair candidate won")
+        for task in pending:
+            task.cancel()
+        detach()
+
+    get_repair_race_stats().record(
+        candidates=len(candidates), winner=None, primary_state=_primary_state(states),
+        latency_s=time.monotonic() - started,
+    )
+    if first_code is not None:
+        return first_code, False
+    parent = current_token()
+    if parent is not None:
+        parent.raise_if_cancelled()
+    raise errors[0] if errors else GenerationCancelled("All repair candidates were cancelled")
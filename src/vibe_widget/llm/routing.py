@@ -0,0 +1,103 @@
+"""
+Per-task model routing.
+
+Every provider call names its task (the telemetry call type: generate,
+revise, patch, fix, audit, theme, text, wrangle, complete). `resolve_route`
+picks the model, completion token cap and temperature for it:
+
+- the completion cap defaults to TASK_MAX_TOKENS, sized to what each task
+  actually returns, instead of one global cap for every call
+- `Config.routing="auto"` sends the short tasks in AUTO_TASKS to the fastest
+  model in the manifest (lowest `latency_rank`) and leaves code generation on
+  the configured model
+- `Config.routing={task: spec}` sets a model, `max_tokens` and/or
+  `temperature` per task; a spec can also be a bare model id, and the model
+  "auto" means the fastest manifest model
+
+An explicit per-call model (e.g. a repair candidate) still wins over routing.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+# Completion caps per task; full widget code needs room, reports and text do not.
+TASK_MAX_TOKENS = {
+    "generate": 20000,
+    "revise": 20000,
+    "patch": 4096,
+    "fix": 12000,
+    "audit": 6000,
+    "theme": 1024,
+    "text": 2048,
+    "wrangle": 2048,
+    "complete": 4096,
+}
+DEFAULT_TASK_MAX_TOKENS = 4096
+
+# Short, latency-bound tasks that `routing="auto"` moves to the fastest model.
+AUTO_TASKS = frozenset({"fix", "audit", "theme", "text", "wrangle"})
+
+
+@dataclass(frozen=True)
+class Route:
+    model: str
+    max_tokens: int
+    temperature: float
+
+
+def _task_spec(policy: Any, task: str) -> dict[str, Any]:
+    if policy == "auto":
+        return {"model": "auto"} if task in AUTO_TASKS else {}
+    if isinstance(policy, dict):
+        spec = policy.get(task)
+        if isinstance(spec, str):
+            return {"model": spec}
+        if isinstance(spec, dict):
+            return spec
+    return {}
+
+
+def resolve_route(
+    task: str,
+    model: str,
+    *,
+    temperature: float,
+    max_tokens: int | None = None,
+) -> Route:
+    """Route one call; ``max_tokens``/``temperature`` are the caller's defaults for the task."""
+    from vibe_widget.config import PREMIUM_MODELS, STANDARD_MODELS, get_fastest_model, get_global_config
+
+    spec = _task_spec(getattr(get_global_config(), "routing", None), task)
+    routed_model = spec.get("model") or model
+    if routed_model == "auto":
+        routed_model = get_fastest_model() or model
+    else:
+        routed_model = PREMIUM_MODELS.get(routed_model) or STANDARD_MODELS.get(routed_model) or routed_model
+    tokens = spec.get("max_tokens") or max_tokens or TASK_MAX_TOKENS.get(task, DEFAULT_TASK_MAX_TOKENS)
+    routed_temperature = spec.get("temperature")
+    return Route(
+        model=routed_model,
+        max_tokens=int(tokens),
+        temperature=float(temperature if routed_temperature is None else routed_temperature),
+    )
+
+
+def validate_routing(policy: Any) -> None:
+    """Raise ValueError for a malformed `Config.routing` value."""
+    if policy is None or policy == "auto":
+        return
+    if not isinstance(policy, dict):
+        raise ValueError("routing must be None, 'auto', or a dict of task -> model or spec")
+    for task, spec in policy.items():
+        if task not in TASK_MAX_TOKENS:
+            raise ValueError(f"Unknown routing task {task!r}; expected one of {sorted(TASK_MAX_TOKENS)}")
+        if isinstance(spec, str):
+            continue
+        if not isinstance(spec, dict):
+            raise ValueError(f"routing[{task!r}] must be a model id or a dict")
+        unknown = set(spec) - {"model", "max_tokens", "temperature"}
+        if unknown:
+            raise ValueError(f"routing[{task!r}] has unknown keys {sorted(unknown)}")
+        if spec.get("max_tokens") is not None and int(spec["max_tokens"]) <= 0:
+            raise ValueError(f"routing[{task!r}].max_tokens must be positive")
@@ -0,0 +1,329 @@
+"""
+Retry and scheduling layer for provider requests.
+
+Every `chat.completions.create` call made by a provider runs through the
+process-wide RequestScheduler, which:
+
+- paces requests with a token bucket per model (`Config.rate_limits`)
+- caps concurrent requests (`Config.max_concurrency`)
+- retries 429/408/409/5xx responses and connection errors with exponential
+  backoff and full jitter, honoring Retry-After / retry-after-ms headers
+- records a CallOutcome per call for diagnostics (`scheduler.stats()`)
+
+Streaming calls are only retried until the first chunk reaches the caller, so
+progress output is never duplicated.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, TypeVar
+
+from vibe_widget.llm.rate_limit import configure_rate_limiter, get_rate_limiter
+from vibe_widget.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_MAX_CONCURRENCY = 8
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_CAP_SECONDS = 30.0
+MAX_RETRY_AFTER_SECONDS = 120.0
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+OUTCOME_HISTORY = 1000
+
+
+class TokenBucket:
+    """Thread-safe token bucket; `reserve()` returns how long to wait for a token."""
+
+    def __init__(self, requests_per_minute: float, burst: int | None = None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(burst or max(1, int(requests_per_minute // 6)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller of this bucket (e.g. after a 429 with Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+@dataclass
+class CallOutcome:
+    """Result of one scheduled provider call (including its retries)."""
+
+    model: str
+    call_type: str
+    status: str  # "ok" | "error"
+    attempts: int
+    latency_s: float
+    waited_s: float
+    error: str | None = None
+    status_codes: list[int] = field(default_factory=list)
+    started_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _status_code(exc: BaseException) -> int | None:
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Rate limits, overloads, server errors and dropped connections are retryable."""
+    code = _status_code(exc)
+    if code is not None:
+        return code in RETRYABLE_STATUS
+    try:
+        import openai
+    except ImportError:  # pragma: no cover - openai is a hard dependency
+        return False
+    return isinstance(exc, (openai.APIConnectionError, openai.APITimeoutError))
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Parse Retry-After (seconds or HTTP date) or retry-after-ms from an error response."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        millis = headers.get("retry-after-ms")
+        if millis:
+            return min(float(millis) / 1000.0, MAX_RETRY_AFTER_SECONDS)
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return min(float(value), MAX_RETRY_AFTER_SECONDS)
+        except ValueError:
+            delay = parsedate_to_datetime(value).timestamp() - time.time()
+            return min(max(0.0, delay), MAX_RETRY_AFTER_SECONDS)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given (1-based) retry attempt."""
+    return random.uniform(0.0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * (2 ** (attempt - 1))))
+
+
+class RequestScheduler:
+    """Paces, caps and retries provider requests; tracks per-call outcomes."""
+
+    def __init__(
+        self,
+        *,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        rate_limits: dict[str, float] | None = None,
+        provider: str = "openrouter",
+    ):
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self.rate_limits = dict(rate_limits or {})
+        self.provider = provider
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._buckets: dict[str, TokenBucket | None] = {}
+        self._lock = threading.Lock()
+        self._outcomes: deque[CallOutcome] = deque(maxlen=OUTCOME_HISTORY)
+        configure_rate_limiter(provider, max_concurrency=max_concurrency)
+
+    def _bucket(self, model: str) -> TokenBucket | None:
+        with self._lock:
+            if model not in self._buckets:
+                rpm = self.rate_limits.get(model, self.rate_limits.get("*"))
+                self._buckets[model] = TokenBucket(float(rpm)) if rpm else None
+            return self._buckets[model]
+
+    def _next_delay(self, exc: BaseException, attempt: int, model: str) -> float:
+        retry_after = retry_after_seconds(exc)
+        if retry_after is not None:
+            bucket = self._bucket(model)
+            if bucket is not None and _status_code(exc) == 429:
+                bucket.pause(retry_after)
+            return retry_after + random.uniform(0.0, 0.25)
+        return backoff_delay(attempt)
+
+    def _record(self, outcome: CallOutcome) -> None:
+        self._outcomes.append(outcome)
+        if outcome.status != "ok" or outcome.attempts > 1:
+            logger.debug(
+                "%s %s: %s after %d attempt(s) %s",
+                outcome.model, outcome.call_type, outcome.status, outcome.attempts, outcome.status_codes,
+            )
+
+    def call(
+        self,
+        fn: Callable[[], T],
+        *,
+        model: str,
+        call_type: str,
+        can_retry: Callable[[], bool] | None = None,
+    ) -> T:
+        """Run ``fn`` with pacing, the concurrency cap and retries."""
+        started = time.monotonic()
+        waited = 0.0
+        codes: list[int] = []
+        attempt = 0
+        while True:
+            attempt += 1
+            bucket = self._bucket(model)
+            if bucket is not None:
+                delay = bucket.reserve()
+                if delay > 0:
+                    waited += delay
+                    time.sleep(delay)
+            wait_start = time.monotonic()
+            with self._semaphore:
+                waited += time.monotonic() - wait_start
+                try:
+                    result = fn()
+                except Exception as exc:
+                    code = _status_code(exc)
+                    if code is not None:
+                        codes.append(code)
+                    retry = (
+                        attempt <= self.max_retries
+                        and is_retryable(exc)
+                        and (can_retry is None or can_retry())
+                    )
+                    if not retry:
+                        self._record(CallOutcome(
+                            model, call_type, "error", attempt,
+                            time.monotonic() - started, waited, str(exc)[:300], codes,
+                        ))
+                        raise
+                    delay = self._next_delay(exc, attempt, model)
+                    last_error = str(exc)[:120]
+                else:
+                    self._record(CallOutcome(
+                        model, call_type, "ok", attempt, time.monotonic() - started, waited, None, codes,
+                    ))
+                    return result
+            logger.info("Retrying %s (%s) in %.1fs after: %s", model, call_type, delay, last_error)
+            waited += delay
+            time.sleep(delay)
+
+    async def call_async(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        *,
+        model: str,
+        call_type: str,
+        can_retry: Callable[[], bool] | None = None,
+    ) -> T:
+        """Async counterpart of `call`; the cap uses the provider's async limiter."""
+        started = time.monotonic()
+        waited = 0.0
+        codes: list[int] = []
+        attempt = 0
+        while True:
+            attempt += 1
+            bucket = self._bucket(model)
+            if bucket is not None:
+                delay = bucket.reserve()
+                if delay > 0:
+                    waited += delay
+                    await asyncio.sleep(delay)
+            wait_start = time.monotonic()
+            async with get_rate_limiter(self.provider):
+                waited += time.monotonic() - wait_start
+                try:
+                    result = await fn()
+                except Exception as exc:
+                    code = _status_code(exc)
+                    if code is not None:
+                        codes.append(code)
+                    retry = (
+                        attempt <= self.max_retries
+                        and is_retryable(exc)
+                        and (can_retry is None or can_retry())
+                    )
+                    if not retry:
+                        self._record(CallOutcome(
+                            model, call_type, "error", attempt,
+                            time.monotonic() - started, waited, str(exc)[:300], codes,
+                        ))
+                        raise
+                    delay = self._next_delay(exc, attempt, model)
+                    last_error = str(exc)[:120]
+                else:
+                    self._record(CallOutcome(
+                        model, call_type, "ok", attempt, time.monotonic() - started, waited, None, codes,
+                    ))
+                    return result
+            logger.info("Retrying %s (%s) in %.1fs after: %s", model, call_type, delay, last_error)
+            waited += delay
+            await asyncio.sleep(delay)
+
+    def outcomes(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Most recent call outcomes, oldest first."""
+        items = list(self._outcomes)
+        if limit is not None:
+            items = items[-limit:]
+        return [outcome.to_dict() for outcome in items]
+
+    def stats(self) -> dict[str, Any]:
+        items = list(self._outcomes)
+        ok = [o for o in items if o.status == "ok"]
+        return {
+            "calls": len(items),
+            "ok": len(ok),
+            "errors": len(items) - len(ok),
+            "retried": sum(1 for o in items if o.attempts > 1),
+            "rate_limited": sum(1 for o in items if 429 in o.status_codes),
+            "max_concurrency": self.max_concurrency,
+            "rate_limits": dict(self.rate_limits),
+        }
+
+
+_SCHEDULER: RequestScheduler | None = None
+_SCHEDULER_SIGNATURE: tuple | None = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+    """Return the process-wide scheduler, rebuilt when its config changes."""
+    global _SCHEDULER, _SCHEDULER_SIGNATURE
+    from vibe_widget.config import get_global_config
+
+    config = get_global_config()
+    signature = (
+        int(getattr(config, "max_retries", DEFAULT_MAX_RETRIES)),
+        int(getattr(config, "max_concurrency", DEFAULT_MAX_CONCURRENCY)),
+        tuple(sorted((getattr(config, "rate_limits", None) or {}).items())),
+    )
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None or signature != _SCHEDULER_SIGNATURE:
+            previous = _SCHEDULER
+            _SCHEDULER = RequestScheduler(
+                max_retries=signature[0],
+                max_concurrency=signature[1],
+                rate_limits=dict(signature[2]),
+            )
+            if previous is not None:
+                _SCHEDULER._outcomes.extend(previous._outcomes)
+            _SCHEDULER_SIGNATURE = signature
+        return _SCHEDULER
@@ -0,0 +1,159 @@
+"""
+Incremental structural checks on streamed widget code.
+
+Generation streams up to the task's completion cap (see `routing`) before
+`CodeValidateTool` ever sees it. A StreamGuard watches the stream as it
+arrives and raises StreamAborted as soon as the response is structurally
+unusable:
+
+- "prose": a long lead-in of prose instead of a code block
+- "react_import": React/ReactDOM is imported instead of using the host prop
+- "missing_export": the code block ended without an `export default function`
+  (checked with the same scanner as `CodeValidateTool`, so helpers, named
+  exports and `async` default exports before or around it are fine)
+
+The provider then closes the stream and re-issues the request once with a
+corrective message, so bad generations cost a few hundred tokens instead of
+a full completion.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from collections import Counter
+from typing import Any
+
+from vibe_widget.llm.tools.code_tools import REACT_IMPORT_PATTERN
+from vibe_widget.llm.tools.js_scan import scan
+
+# Streaming code calls that are checked; repairs and text are not.
+GUARDED_CALL_TYPES = ("generate", "revise")
+PROSE_LIMIT_CHARS = 600
+MAX_PARTIAL_ECHO_CHARS = 1500
+
+_CODE_START_RE = re.compile(
+    r"^\s*(?:```|import\b|export\b|const\b|let\b|var\b|function\b|async\b|class\b|//|/\*|['\"]use )"
+)
+_FENCE_RE = re.compile(r"^```", re.MULTILINE)
+
+CORRECTIONS = {
+    "prose": "Do not write any explanation. Reply with only the JavaScript module.",
+    "react_import": (
+        "Do not import React, ReactDOM or react/jsx-runtime. Use the React prop passed to "
+        "`export default function Widget({ model, html, React })`."
+    ),
+    "missing_export": (
+        "The module must declare `export default function Widget({ model, html, React })` "
+        "and keep helpers short."
+    ),
+}
+
+
+class StreamAborted(RuntimeError):
+    """Raised from a stream callback when the response fails a structural check."""
+
+    def __init__(self, reason: str, message: str, partial: str):
+        super().__init__(message)
+        self.reason = reason
+        self.partial = partial
+
+    @property
+    def correction(self) -> str:
+        return CORRECTIONS.get(self.reason, "Reply with only the corrected JavaScript module.")
+
+
+class StreamGuard:
+    """Accumulates streamed text and raises StreamAborted on fatal problems."""
+
+    def __init__(self):
+        self._chunks: list[str] = []
+        self._length = 0
+        self._checked_upto = 0
+        self._export_checked = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> None:
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+        # Only re-check complete lines; partial tokens produce false positives.
+        if "\n" not in chunk and self._length - self._checked_upto < 400:
+            return
+        self._checked_upto = self._length
+        self.check(self.text)
+
+    def check(self, text: str) -> None:
+        stripped = text.lstrip()
+        if (
+            len(stripped) >= PROSE_LIMIT_CHARS
+            and not _CODE_START_RE.match(stripped)
+            and "```" not in stripped
+        ):
+            self._abort("prose", "Response started with prose instead of code", text)
+
+        complete = text[: text.rfind("\n") + 1]
+        if REACT_IMPORT_PATTERN.search(complete):
+            self._abort("react_import", "Response imports React/ReactDOM", text)
+
+        if self._export_checked:
+            return
+        fences = list(_FENCE_RE.finditer(complete))
+        if len(fences) < 2:
+            return
+        # The first code block is complete; scan it once, as the validator would.
+        self._export_checked = True
+        block = complete[complete.find("\n", fences[0].start()) + 1 : fences[1].start()]
+        export = scan(block).default_export
+        if export is None or export.kind != "function":
+            self._abort("missing_export", "Code block ended without 'export default function'", text)
+
+    def _abort(self, reason: str, message: str, text: str) -> None:
+        _STATS.record(reason, len(text))
+        raise StreamAborted(reason, message, text)
+
+
+class StreamGuardStats:
+    """Counts aborts per reason and how much output was streamed before each."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.aborts: Counter[str] = Counter()
+        self.aborted_chars = 0
+
+    def record(self, reason: str, chars: int) -> None:
+        with self._lock:
+            self.aborts[reason] += 1
+            self.aborted_chars += chars
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "aborts": sum(self.aborts.values()),
+                "by_reason": dict(self.aborts),
+                "aborted_chars": self.aborted_chars,
+            }
+
+
+_STATS = StreamGuardStats()
+
+
+def get_stream_guard_stats() -> StreamGuardStats:
+    """Return the process-wide stream abort counters."""
+    return _STATS
+
+
+def corrective_params(completion_params: dict[str, Any], exc: StreamAborted) -> dict[str, Any]:
+    """Completion params that replay the rejected start and ask for a fresh answer."""
+    partial = exc.partial[:MAX_PARTIAL_ECHO_CHARS]
+    messages = list(completion_params.get("messages", []))
+    messages.append({"role": "assistant", "content": partial})
+    messages.append({
+        "role": "user",
+        "content": (
+            f"Stop. That response was rejected: {exc}. {exc.correction} "
+            "Start over from the beginning and output the complete module."
+        ),
+    })
+    return {**completion_params, "messages": messages}
@@ -0,0 +1,208 @@
+"""
+Per-call latency and token telemetry for provider requests.
+
+Every provider request records a CallRecord: model, call type, token counts,
+time to first token, output tokens per second and total latency. Records are
+kept in a bounded in-process MetricsStore that `vw.stats()` and
+`widget.stats()` summarize as percentiles per model and call type.
+
+Setting `Config.telemetry_path` (or VIBEWIDGET_TELEMETRY_PATH) also appends
+each record as one JSON line to that file, for feeding dashboards from
+notebook runs.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+from vibe_widget.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+MAX_RECORDS = 5000
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class CallRecord:
+    """Timing and token counts for one provider request (including its retries)."""
+
+    model: str
+    call_type: str
+    status: str  # "ok", "error", "aborted" (stream guard) or "cancelled" (lost a hedge)
+    latency_s: float
+    ttft_s: float | None = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    streamed: bool = False
+    scope: str | None = None  # widget the call was made for, if any
+    error: str | None = None
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        """Output throughput after the first token (whole call for non-streamed requests)."""
+        if not self.completion_tokens:
+            return None
+        elapsed = self.latency_s - (self.ttft_s or 0.0) if self.streamed else self.latency_s
+        if elapsed <= 0:
+            return None
+        return self.completion_tokens / elapsed
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["tokens_per_second"] = self.tokens_per_second
+        return data
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Nearest-rank-interpolated percentile; None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _distribution(values: Iterable[float | None]) -> dict[str, float | None]:
+    present = [value for value in values if value is not None]
+    return {f"p{pct}": percentile(present, pct) for pct in PERCENTILES}
+
+
+def summarize(records: list[CallRecord]) -> dict[str, Any]:
+    """Percentile summary of records, overall and per (model, call type)."""
+    groups: dict[tuple[str, str], list[CallRecord]] = {}
+    for record in records:
+        groups.setdefault((record.model, record.call_type), []).append(record)
+
+    rows = []
+    for (model, call_type), group in sorted(groups.items()):
+        ok = [record for record in group if record.status == "ok"]
+        rows.append({
+            "model": model,
+            "call_type": call_type,
+            "calls": len(group),
+            "errors": sum(1 for record in group if record.status == "error"),
+            "latency_s": _distribution(record.latency_s for record in ok),
+            "ttft_s": _distribution(record.ttft_s for record in ok),
+            "tokens_per_second": _distribution(record.tokens_per_second for record in ok),
+            "prompt_tokens": sum(record.prompt_tokens for record in ok),
+            "completion_tokens": sum(record.completion_tokens for record in ok),
+            "cached_tokens": sum(record.cached_tokens for record in ok),
+        })
+    ok = [record for record in records if record.status == "ok"]
+    return {
+        "calls": len(records),
+        "errors": sum(1 for record in records if record.status == "error"),
+        "latency_s": _distribution(record.latency_s for record in ok),
+        "ttft_s": _distribution(record.ttft_s for record in ok),
+        "total_latency_s": sum(record.latency_s for record in ok),
+        "by_model": rows,
+    }
+
+
+class MetricsStore:
+    """Bounded, thread-safe store of recent CallRecords with an optional JSONL sink."""
+
+    def __init__(self, max_records: int = MAX_RECORDS):
+        self._lock = threading.Lock()
+        self._records: deque[CallRecord] = deque(maxlen=max_records)
+
+    def record(self, record: CallRecord) -> None:
+        with self._lock:
+            self._records.append(record)
+        self._write_sink(record)
+
+    def records(
+        self,
+        *,
+        scope: str | None = None,
+        model: str | None = None,
+        call_type: str | None = None,
+    ) -> list[CallRecord]:
+        with self._lock:
+            records = list(self._records)
+        return [
+            record
+            for record in records
+            if (scope is None or record.scope == scope)
+            and (model is None or record.model == model)
+            and (call_type is None or record.call_type == call_type)
+        ]
+
+    def stats(self, *, scope: str | None = None) -> dict[str, Any]:
+        return summarize(self.records(scope=scope))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+    @staticmethod
+    def _write_sink(record: CallRecord) -> None:
+        from vibe_widget.config import get_global_config
+
+        path = getattr(get_global_config(), "telemetry_path", None)
+        if not path:
+            return
+        line = json.dumps(record.to_dict(), default=str) + "\n"
+        try:
+            sink = Path(path)
+            sink.parent.mkdir(parents=True, exist_ok=True)
+            with _SINK_LOCK, sink.open("a", encoding="utf-8") as handle:
+                handle.write(line)
+        except OSError as exc:
+            logger.debug("Could not write telemetry to %s: %s", path, exc)
+
+
+_SINK_LOCK = threading.Lock()
+_METRICS_STORE = MetricsStore()
+
+
+def get_metrics_store() -> MetricsStore:
+    """Return the process-wide call telemetry store."""
+    return _METRICS_STORE
+
+
+class CallTimer:
+    """Measures one request: call `first_token()` on the first chunk, then `finish()`."""
+
+    def __init__(self, model: str, call_type: str, *, streamed: bool, scope: str | None = None):
+        self.model = model
+        self.call_type = call_type
+        self.streamed = streamed
+        self.scope = scope
+        self._started = time.monotonic()
+        self._first_token: float | None = None
+
+    def first_token(self) -> None:
+        if self._first_token is None:
+            self._first_token = time.monotonic()
+
+    def finish(self, status: str, usage: Any = None, error: BaseException | None = None) -> CallRecord:
+        now = time.monotonic()
+        ttft = (self._first_token if self._first_token is not None else now) - self._started
+        record = CallRecord(
+            model=self.model,
+            call_type=self.call_type,
+            status=status,
+            latency_s=now - self._started,
+            ttft_s=ttft if status == "ok" or self._first_token is not None else None,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0),
+            completion_tokens=getattr(usage, "completion_tokens", 0),
+            cached_tokens=getattr(usage, "cached_tokens", 0),
+            streamed=self.streamed,
+            scope=self.scope,
+            error=f"{type(error).__name__}: {error}"[:200] if error is not None else None,
+        )
+        get_metrics_store().record(record)
+        return record
@@ -4,11 +4,25 @@ import re
 from typing import Any
 
 from vibe_widget.llm.tools.base import Tool, ToolResult
+from vibe_widget.llm.tools.js_scan import scan
+from vibe_widget.llm.tools.validation_cache import get_validation_cache, validation_key
+
+REACT_IMPORT_PATTERN = re.compile(
+    r"""(
+        from\s+["'](?:react(?:/jsx-runtime)?|react-dom(?:/client)?)["']|
+        require\(\s*["'](?:react(?:/jsx-runtime)?|react-dom(?:/client)?)["']\s*\)|
+        from\s+["']https?://[^"']*react[^"']*["']
+    )""",
+    re.VERBOSE,
+)
 
 
 class CodeValidateTool(Tool):
     """Tool for validating generated widget code."""
 
+    # Bump when the checks change so cached validation results are discarded.
+    VERSION = 3
+
     def __init__(self):
         super().__init__(
             name="code_validate",
@@ -45,88 +59,96 @@ class CodeValidateTool(Tool):
         expected_exports: list[str] | None = None,
         expected_imports: list[str] | None = None,
     ) -> ToolResult:
-        """Validate widget code."""
+        """Validate widget code (memoized per code hash, see validation_cache)."""
+        cache = get_validation_cache()
+        key = validation_key(self.name, self.VERSION, code, expected_exports, expected_imports)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        result = self._validate(code, expected_exports, expected_imports)
+        if result.output:
+            cache.put(key, result)
+        return result
+
+    def _validate(
+        self,
+        code: str,
+        expected_exports: list[str] | None,
+        expected_imports: list[str] | None,
+    ) -> ToolResult:
         issues = []
         warnings = []
+        # Stable identifiers for the checks that fired, used by llm.autofix.
+        codes: list[str] = []
 
         try:
-            # Check 1: Default export exists
-            if "export default function" not in code:
+            facts = scan(code)
+            export = facts.default_export
+
+            # Check 1: Default export is a function
+            if export is None or export.kind != "function":
                 issues.append("Missing 'export default function' declaration")
+                codes.append("missing-default-export")
 
             # Check 2: Widget function signature
-            if "export default function" in code:
-                match = re.search(r"export default function \w+\s*\(([^)]*)\)", code)
-                if match:
-                    params = match.group(1)
-                    if ("model" not in params or "html" not in params or "React" not in params) and not re.search(r"export default function \w+\s*\(\s*\{[^}]*\bmodel\b[^}]*\}", code, re.DOTALL):
-                        issues.append(
-                            "Widget function must accept parameters { model, html, React }"
-                        )
-                else:
-                    issues.append("Malformed widget function declaration")
-
+            elif export.name is None:
+                issues.append("Malformed widget function declaration")
+                codes.append("malformed-signature")
+            elif not {"model", "html", "React"} <= set(export.params) and "model" not in export.destructured:
+                issues.append("Widget function must accept parameters { model, html, React }")
+                codes.append("bad-signature")
 
             # Check 3: html template usage
-            if "html`" not in code:
+            if not facts.html_templates:
                 warnings.append("No html template usage found - are you using htm correctly?")
-
+                codes.append("no-html-template")
 
             # Check 4: Export lifecycle (if exports expected)
-            if expected_exports:
-                for export_name in expected_exports:
-                    #? Error: Export 'Widget' never set with model.set(); Missing model.save_changes() call for exports
-                    if export_name[0].isupper():
-                        continue
-                    # Check for model.set
-                    if f'model.set("{export_name}"' not in code and f"model.set('{export_name}'" not in code:
-                        issues.append(f"Export '{export_name}' never set with model.set()")
-                    # Check for model.save_changes
-                    if code.count("model.save_changes()") == 0:
-                        issues.append("Missing model.save_changes() call for exports")
+            state_exports = [name for name in expected_exports or [] if not name[0].isupper()]
+            for export_name in state_exports:
+                if export_name not in facts.model_sets:
+                    issues.append(f"Export '{export_name}' never set with model.set()")
+                    codes.append("unset-export")
+            if state_exports and not facts.save_changes_calls:
+                issues.append("Missing model.save_changes() call for exports")
+                codes.append("missing-save-changes")
 
             # Check 5: Import subscription (if imports expected)
-            if expected_imports:
-                for import_name in expected_imports:
-                    # Check for model.on
-                    if f'model.on("change:{import_name}"' not in code and f"model.on('change:{import_name}'" not in code:
-                        warnings.append(f"Import '{import_name}' not subscribed with model.on()")
+            for import_name in expected_imports or []:
+                if import_name not in facts.model_subscriptions:
+                    warnings.append(f"Import '{import_name}' not subscribed with model.on()")
+                    codes.append("unsubscribed-import")
 
-            if "document.body" in code:
+            if facts.document_body:
                 issues.append("Direct document.body manipulation detected - use refs instead")
+                codes.append("document-body")
 
-            if "ReactDOM.render" in code:
+            if facts.reactdom_render:
                 issues.append("ReactDOM.render not allowed - use html templates")
+                codes.append("reactdom-render")
 
-            react_import_pattern = re.compile(
-                r"""(
-                    from\s+["'](?:react(?:/jsx-runtime)?|react-dom(?:/client)?)["']|
-                    require\(\s*["'](?:react(?:/jsx-runtime)?|react-dom(?:/client)?)["']\s*\)|
-                    from\s+["']https?://[^"']*react[^"']*["']
-                )""",
-                re.VERBOSE,
-            )
-            if react_import_pattern.search(code):
+            if facts.react_imports:
                 issues.append(
                     "Do not import React/ReactDOM or react/jsx-runtime; use the React prop provided by the host."
                 )
+                codes.append("react-import")
 
-            if "className=" in code and "html`" in code:
+            if facts.classname_attrs:
                 warnings.append("Use 'class=' not 'className=' in htm templates")
+                codes.append("classname")
 
-            if (
-                re.search(r"style\s*=\s*['\"]", code)
-                or re.search(r"style\s*=\s*\$\{\s*['\"]", code)
-                or re.search(r"style\s*=\s*\{\s*['\"]", code)
-            ):
+            if facts.string_styles:
                 issues.append(
                     "Inline style must be an object literal: use style=${{ ... }} not a string"
                 )
+                codes.append("string-style")
 
-            cdn_imports = re.findall(r'from\s+["\']https://esm\.sh/([^"\']+)["\']', code)
-            for imp in cdn_imports:
-                if "@" not in imp:
-                    warnings.append(f"CDN import '{imp}' missing version - should pin version (e.g., d3@7)")
+            for ref in facts.imports:
+                if ref.specifier.startswith("https://esm.sh/"):
+                    package = ref.specifier[len("https://esm.sh/"):]
+                    if "@" not in package:
+                        warnings.append(f"CDN import '{package}' missing version - should pin version (e.g., d3@7)")
+                        codes.append("unpinned-cdn")
 
             # Determine success
             success = len(issues) == 0
@@ -135,6 +157,7 @@ class CodeValidateTool(Tool):
                 "valid": success,
                 "issues": issues,
                 "warnings": warnings,
+                "codes": list(dict.fromkeys(codes)),
                 "summary": f"Found {len(issues)} issues and {len(warnings)} warnings",
             }
 
@@ -5,6 +5,7 @@ import pandas as pd
 from typing import Any
 
 from vibe_widget.llm.tools.base import Tool, ToolResult
+from vibe_widget.utils.sketches import DEFAULT_CHUNKSIZE, DataSketch, sketch_source
 
 
 class DataLoadTool(Tool):
@@ -445,12 +446,34 @@ class DataProfileTool(Tool):
                 "type": "object",
                 "description": "Data output from data_load tool",
                 "required": True,
-            }
+            },
+            "chunksize": {
+                "type": "integer",
+                "description": "Rows per chunk when profiling a file or directory out-of-core",
+                "required": False,
+            },
         }
 
-    def execute(self, data: dict[str, Any], df: pd.DataFrame | None = None) -> ToolResult:
-        """Generate data profile."""
+    def execute(
+        self,
+        data: dict[str, Any],
+        df: pd.DataFrame | None = None,
+        sketch: DataSketch | None = None,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+    ) -> ToolResult:
+        """Generate data profile.
+
+        Accepts an in-memory dataframe, a prebuilt (possibly merged) ``DataSketch``,
+        or a ``source`` path that is streamed chunk by chunk without loading it whole.
+        """
         try:
+            sketch = sketch if sketch is not None else data.get("sketch")
+            source = data.get("source")
+            if sketch is None and df is None and data.get("dataframe") is None and source is not None:
+                sketch = sketch_source(source, chunksize=chunksize)
+            if sketch is not None:
+                return ToolResult(success=True, output=sketch.to_profile(), metadata={"sketch": sketch})
+
             # If df is provided directly (from orchestrator), use it
             if df is not None:
                 dataframe = df
@@ -551,17 +574,11 @@ df = df.copy()
 Return ONLY the Python code block, no explanations before or after.
 """
 
-            if not hasattr(self.llm_provider, 'client'):
+            if not hasattr(self.llm_provider, 'complete'):
                 return ToolResult(success=False, output={}, error="LLM provider does not support data wrangling.")
 
-            response = self.llm_provider.client.chat.completions.create(
-                model=self.llm_provider.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=2048,
-                temperature=0.3,
-            )
-
-            code = self.llm_provider.clean_code(response.choices[0].message.content or "")
+            response_text = self.llm_provider.complete(prompt, temperature=0.3, call_type="wrangle")
+            code = self.llm_provider.clean_code(response_text or "")
 
             return ToolResult(
                 success=True,
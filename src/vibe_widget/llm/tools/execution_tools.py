@@ -2,10 +2,12 @@
 
 import re
 import subprocess
-import tempfile
 from typing import Any
 
 from vibe_widget.llm.tools.base import Tool, ToolResult
+from vibe_widget.llm.tools.js_scan import scan
+from vibe_widget.llm.tools.node_validator import get_node_validator
+from vibe_widget.llm.tools.validation_cache import get_validation_cache, validation_key
 
 
 class CLIExecuteTool(Tool):
@@ -91,11 +93,14 @@ class CLIExecuteTool(Tool):
 class RuntimeTestTool(Tool):
     """Tool for testing widget code before frontend execution."""
 
+    # Bump when the checks or validator_daemon.js change (invalidates cached results).
+    VERSION = 3
+
     def __init__(self):
         super().__init__(
             name="runtime_test",
             description=(
-                "Test widget code by checking for syntax errors, "
+                "Test widget code by parsing it as an ES module, "
                 "import resolution, and basic structural validity. "
                 "Catches issues before code reaches the frontend."
             ),
@@ -112,43 +117,36 @@ class RuntimeTestTool(Tool):
         }
 
     def execute(self, code: str) -> ToolResult:
-        """Test widget code."""
+        """Test widget code (memoized per code hash, see validation_cache)."""
+        cache = get_validation_cache()
+        key = validation_key(self.name, self.VERSION, code)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        result = self._run(code)
+        # Results without a syntax check (Node unavailable) are not worth keeping.
+        if result.output and result.output.get("syntax_checked"):
+            cache.put(key, result)
+        return result
+
+    def _run(self, code: str) -> ToolResult:
         try:
             issues = []
 
-            # Test 1: Check for syntax errors using Node.js
-            with tempfile.NamedTemporaryFile(mode="w", suffix=".js", delete=False) as f:
-                f.write(code)
-                temp_file = f.name
-
-            try:
-                # Try to parse with node --check
-                result = subprocess.run(
-                    ["node", "--check", temp_file],
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                )
-
-                if result.returncode != 0:
-                    issues.append(f"Syntax error: {result.stderr}")
+            # Test 1: Parse as an ES module in the shared Node validator
+            diagnostics = get_node_validator().parse(code)
+            for diagnostic in diagnostics or []:
+                issues.append(f"Syntax error: {diagnostic.format()}")
 
-            except FileNotFoundError:
-                pass
-            except Exception as e:
-                pass
-            finally:
-                import os
-
-                os.unlink(temp_file)
+            facts = scan(code)
 
             # Test 2: Check for common runtime issues
-            if "undefined" in code and "typeof" not in code:
+            if facts.uses_undefined and not facts.uses_typeof:
                 issues.append("Warning: Direct 'undefined' usage without typeof check")
 
             # Test 3: Check imports are accessible
-            import_matches = re.findall(r'from\s+["\']([^"\']+)["\']', code)
-            for imp in import_matches:
+            for ref in facts.imports:
+                imp = ref.specifier
                 if imp.startswith("https://"):
                     # Could validate CDN URL is accessible, but skip for speed
                     pass
@@ -161,6 +159,8 @@ class RuntimeTestTool(Tool):
                 "passed": success,
                 "issues": issues,
                 "summary": f"Runtime test {'passed' if success else 'failed'} with {len(issues)} issue(s)",
+                "diagnostics": [diagnostic.to_dict() for diagnostic in diagnostics or []],
+                "syntax_checked": diagnostics is not None,
             }
 
             return ToolResult(
@@ -173,6 +173,25 @@ class RuntimeTestTool(Tool):
             return ToolResult(success=False, output={}, error=f"Runtime test error: {str(e)}")
 
 
+_SIGNATURE_URL_RE = re.compile(r"(?:blob:)?https?://\S+|blob:\S+")
+_SIGNATURE_LOCATION_RE = re.compile(r"(?::\d+)+\b|\bline \d+(?:, column \d+)?")
+_SIGNATURE_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+
+def error_signature(error_type: str, error_message: str) -> str:
+    """Normalized error identity: the first message line without URLs, positions or numbers.
+
+    The same failure reported from another kernel, cell or blob URL maps to
+    the same signature, so repairs can be memoized per (code, signature).
+    """
+    lines = [line.strip() for line in error_message.strip().splitlines() if line.strip()]
+    head = lines[0] if lines else ""
+    head = _SIGNATURE_URL_RE.sub("<url>", head)
+    head = _SIGNATURE_LOCATION_RE.sub("", head)
+    head = _SIGNATURE_NUMBER_RE.sub("<n>", head)
+    return f"{error_type}:{' '.join(head.split())}"
+
+
 class ErrorDiagnoseTool(Tool):
     """Tool for diagnosing runtime errors from widget execution."""
 
@@ -263,11 +282,14 @@ class ErrorDiagnoseTool(Tool):
                 diagnosis["suggested_fix"] = "Review error message and add defensive checks"
 
             # Extract line numbers if present
-            line_match = re.findall(r":(\d+):\d+", error_message)
+            # (stack frames "file:12:5", validator diagnostics "line 12, column 5")
+            line_match = re.findall(r":(\d+):\d+|\bline (\d+)", error_message)
+            line_match = [frame or line for frame, line in line_match]
             if line_match:
                 diagnosis["affected_lines"] = [int(line) for line in line_match]
 
             diagnosis["full_error"] = error_message
+            diagnosis["signature"] = error_signature(diagnosis["error_type"], error_message)
 
             return ToolResult(success=True, output=diagnosis)
 
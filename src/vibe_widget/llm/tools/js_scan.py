@@ -0,0 +1,411 @@
+"""
+Single-pass JavaScript scanner for widget validation.
+
+`scan(code)` tokenizes widget code once (skipping comments, and keeping
+strings, regex literals and template literals intact, including nested
+``${...}`` expressions) and collects the facts the validators check:
+
+- imports (static, side-effect, dynamic ``import()`` and ``require()``)
+- the ``export default function`` signature
+- ``model.set`` / ``model.on("change:...")`` / ``model.save_changes`` calls
+- ``html`` tagged templates and their attributes (``style=``, ``className=``)
+- a few banned member accesses (``document.body``, ``ReactDOM.render``)
+
+Checks evaluated against these facts are O(n) overall and are not fooled by
+text inside strings or comments.
+"""
+from __future__ import annotations
+
+import functools
+import re
+from dataclasses import dataclass, field
+
+_IDENT_RE = re.compile(r"[A-Za-z_$][\w$]*")
+_NUMBER_RE = re.compile(r"\.?\d[\w.]*(?:[eE][+-]?\d+)?n?")
+_SPACE_RE = re.compile(r"\s+")
+_STYLE_STRING_RE = re.compile(r"""\bstyle\s*=\s*(?:["']|\{\s*["'])""")
+_STYLE_OPEN_RE = re.compile(r"\bstyle\s*=\s*$")
+_CLASSNAME_RE = re.compile(r"\bclassName\s*=")
+
+# After these tokens a "/" starts a regex literal rather than a division.
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^") | {
+    "return", "typeof", "case", "do", "else", "in", "of", "new", "delete",
+    "void", "throw", "yield", "await", "instanceof",
+}
+_REACT_SPECIFIERS = {"react", "react/jsx-runtime", "react-dom", "react-dom/client"}
+
+
+@dataclass
+class Token:
+    kind: str  # ident, punct, string, number, regex, template_start, template_text, template_end
+    value: str
+    pos: int
+    tag: str | None = None  # for template tokens: the tag identifier (e.g. "html")
+
+
+@dataclass
+class ImportRef:
+    specifier: str
+    kind: str  # "static", "side_effect", "dynamic" or "require"
+    pos: int
+    end: int = -1  # end of the import statement (static and side-effect imports)
+    clause: str = ""  # text between ``import`` and ``from`` for static imports
+
+
+@dataclass
+class DefaultExport:
+    kind: str  # "function", "class" or "expression"
+    name: str | None = None
+    params: list[str] = field(default_factory=list)  # every identifier in the parameter list
+    destructured: list[str] = field(default_factory=list)  # names destructured from the first parameter
+
+
+@dataclass
+class CodeFacts:
+    imports: list[ImportRef] = field(default_factory=list)
+    default_export: DefaultExport | None = None
+    model_sets: set[str] = field(default_factory=set)
+    model_subscriptions: set[str] = field(default_factory=set)
+    save_changes_calls: int = 0
+    html_templates: int = 0
+    string_styles: int = 0
+    classname_attrs: int = 0
+    document_body: bool = False
+    reactdom_render: bool = False
+    uses_undefined: bool = False
+    uses_typeof: bool = False
+
+    @property
+    def react_imports(self) -> list[ImportRef]:
+        return [ref for ref in self.imports if is_react_specifier(ref.specifier)]
+
+
+def is_react_specifier(specifier: str) -> bool:
+    if specifier in _REACT_SPECIFIERS:
+        return True
+    return specifier.startswith(("http://", "https://")) and "react" in specifier
+
+
+def _skip_string(code: str, i: int) -> int:
+    """Index just past the string literal starting at ``i``."""
+    quote = code[i]
+    i += 1
+    n = len(code)
+    while i < n:
+        char = code[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == quote or char == "\n":
+            return i + 1
+        i += 1
+    return n
+
+
+def _skip_regex(code: str, i: int) -> int:
+    i += 1
+    n = len(code)
+    in_class = False
+    while i < n:
+        char = code[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "\n":
+            return i
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            i += 1
+            match = _IDENT_RE.match(code, i)
+            return match.end() if match else i
+        i += 1
+    return n
+
+
+def tokenize(code: str) -> list[Token]:
+    """Tokenize JavaScript, dropping whitespace and comments."""
+    tokens: list[Token] = []
+    # Frames: ["template", tag] while in template text, ["expr", depth] inside ${...}.
+    stack: list[list] = []
+    i = 0
+    n = len(code)
+    prev: Token | None = None
+
+    def emit(token: Token) -> None:
+        nonlocal prev
+        tokens.append(token)
+        prev = token
+
+    while i < n:
+        if stack and stack[-1][0] == "template":
+            tag = stack[-1][1]
+            start = i
+            while i < n:
+                char = code[i]
+                if char == "\\":
+                    i += 2
+                elif char == "`":
+                    emit(Token("template_text", code[start:i], start, tag))
+                    emit(Token("template_end", "`", i, tag))
+                    stack.pop()
+                    i += 1
+                    break
+                elif char == "$" and code.startswith("${", i):
+                    emit(Token("template_text", code[start:i], start, tag))
+                    stack.append(["expr", 0])
+                    i += 2
+                    prev = None
+                    break
+                else:
+                    i += 1
+            else:
+                emit(Token("template_text", code[start:n], start, tag))
+            continue
+
+        char = code[i]
+        if char.isspace():
+            i = _SPACE_RE.match(code, i).end()
+            continue
+        if char == "/" and code.startswith("//", i):
+            end = code.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        if char == "/" and code.startswith("/*", i):
+            end = code.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if char in "\"'":
+            end = _skip_string(code, i)
+            emit(Token("string", code[i + 1:end - 1], i))
+            i = end
+            continue
+        if char == "`":
+            tag = prev.value if prev is not None and prev.kind == "ident" else None
+            emit(Token("template_start", "`", i, tag))
+            stack.append(["template", tag])
+            i += 1
+            continue
+        if char == "/" and (prev is None or prev.value in _REGEX_PRECEDERS):
+            end = _skip_regex(code, i)
+            emit(Token("regex", code[i:end], i))
+            i = end
+            continue
+        match = _IDENT_RE.match(code, i)
+        if match:
+            emit(Token("ident", match.group(), i))
+            i = match.end()
+            continue
+        if char.isdigit() or (char == "." and i + 1 < n and code[i + 1].isdigit()):
+            match = _NUMBER_RE.match(code, i)
+            emit(Token("number", match.group(), i))
+            i = match.end()
+            continue
+        if stack and stack[-1][0] == "expr":
+            if char == "{":
+                stack[-1][1] += 1
+            elif char == "}":
+                if stack[-1][1] == 0:
+                    stack.pop()
+                    i += 1
+                    continue
+                stack[-1][1] -= 1
+        if char == "." and code.startswith("...", i):
+            emit(Token("punct", "...", i))
+            i += 3
+            continue
+        emit(Token("punct", char, i))
+        i += 1
+    return tokens
+
+
+def _template_literal_value(tokens: list[Token], k: int) -> str | None:
+    """Value of a substitution-free template literal starting at ``tokens[k]``."""
+    if (
+        k + 2 < len(tokens)
+        and tokens[k + 1].kind == "template_text"
+        and tokens[k + 2].kind == "template_end"
+    ):
+        return tokens[k + 1].value
+    return None
+
+
+def _string_arg(tokens: list[Token], k: int) -> str | None:
+    """Literal string argument at ``tokens[k]`` (plain or substitution-free template)."""
+    if k >= len(tokens):
+        return None
+    token = tokens[k]
+    if token.kind == "string":
+        return token.value
+    if token.kind == "template_start":
+        return _template_literal_value(tokens, k)
+    return None
+
+
+def _statement_end(tokens: list[Token], k: int) -> int:
+    """End offset of the statement whose last string token is ``tokens[k]``."""
+    token = tokens[k]
+    end = token.pos + len(token.value) + 2
+    if k + 1 < len(tokens) and tokens[k + 1].value == ";":
+        end = tokens[k + 1].pos + 1
+    return end
+
+
+def _is_member_call(tokens: list[Token], k: int, obj: str, prop: str) -> bool:
+    """``obj.prop(`` at ``tokens[k]``."""
+    return (
+        k + 3 < len(tokens)
+        and tokens[k].value == obj
+        and tokens[k + 1].value == "."
+        and tokens[k + 2].value == prop
+        and tokens[k + 3].value == "("
+        and tokens[k].kind == "ident"
+    )
+
+
+def _parse_params(tokens: list[Token], k: int) -> tuple[list[str], list[str], int]:
+    """Parse a parameter list starting at the "(" at ``tokens[k]``."""
+    names: list[str] = []
+    destructured: list[str] = []
+    depth = 0
+    param_index = 0
+    brace_depth = 0
+    expecting_key = True
+    while k < len(tokens):
+        token = tokens[k]
+        value = token.value
+        if token.kind == "punct":
+            if value in "([":
+                depth += 1
+            elif value in ")]":
+                depth -= 1
+                if depth == 0:
+                    return names, destructured, k + 1
+            elif value == "{":
+                brace_depth += 1
+                expecting_key = True
+            elif value == "}":
+                brace_depth -= 1
+            elif value == "," and depth == 1 and brace_depth == 0:
+                param_index += 1
+            elif value == ",":
+                expecting_key = True
+            elif value in ":=":
+                expecting_key = False
+        elif token.kind == "ident":
+            names.append(value)
+            if param_index == 0 and depth == 1 and brace_depth == 1 and expecting_key:
+                destructured.append(value)
+                expecting_key = False
+        k += 1
+    return names, destructured, k
+
+
+def _parse_default_export(tokens: list[Token], k: int) -> DefaultExport:
+    """Describe the declaration after ``export default`` at ``tokens[k]``."""
+    if k < len(tokens) and tokens[k].value == "async":
+        k += 1
+    if k < len(tokens) and tokens[k].value == "function":
+        k += 1
+        if k < len(tokens) and tokens[k].value == "*":
+            k += 1
+        name = None
+        if k < len(tokens) and tokens[k].kind == "ident":
+            name = tokens[k].value
+            k += 1
+        if k < len(tokens) and tokens[k].value == "(":
+            params, destructured, _ = _parse_params(tokens, k)
+            return DefaultExport("function", name, params, destructured)
+        return DefaultExport("function", name)
+    if k < len(tokens) and tokens[k].value == "class":
+        return DefaultExport("class")
+    return DefaultExport("expression")
+
+
+def _scan_template_text(facts: CodeFacts, tokens: list[Token], k: int) -> None:
+    text = tokens[k].value
+    facts.string_styles += len(_STYLE_STRING_RE.findall(text))
+    facts.classname_attrs += len(_CLASSNAME_RE.findall(text))
+    # style=${"color: red"} - the expression right after the text is a string.
+    if _STYLE_OPEN_RE.search(text) and k + 1 < len(tokens) and tokens[k + 1].kind != "template_end":
+        following = tokens[k + 1]
+        if following.kind == "string" or (
+            following.kind == "template_start" and _template_literal_value(tokens, k + 1) is not None
+        ):
+            facts.string_styles += 1
+
+
+@functools.lru_cache(maxsize=32)
+def scan(code: str) -> CodeFacts:
+    """Tokenize ``code`` once and collect validation facts (cached per code string)."""
+    tokens = tokenize(code)
+    facts = CodeFacts()
+    count = len(tokens)
+    for k, token in enumerate(tokens):
+        kind = token.kind
+        value = token.value
+        previous = tokens[k - 1].value if k else None
+
+        if kind == "template_text":
+            if token.tag == "html":
+                _scan_template_text(facts, tokens, k)
+            continue
+        if kind == "template_start":
+            if token.tag == "html":
+                facts.html_templates += 1
+            continue
+        if kind != "ident":
+            continue
+
+        if value == "import" and previous != ".":
+            following = tokens[k + 1] if k + 1 < count else None
+            if following is None:
+                continue
+            if following.value == "(":
+                specifier = _string_arg(tokens, k + 2)
+                if specifier is not None:
+                    facts.imports.append(ImportRef(specifier, "dynamic", token.pos))
+            elif following.kind == "string":
+                end = _statement_end(tokens, k + 1)
+                facts.imports.append(ImportRef(following.value, "side_effect", token.pos, end))
+            else:
+                j = k + 1
+                while j < count and not (tokens[j].kind == "ident" and tokens[j].value == "from"):
+                    if tokens[j].value == ";":
+                        break
+                    j += 1
+                if j + 1 < count and tokens[j].value == "from" and tokens[j + 1].kind == "string":
+                    end = _statement_end(tokens, j + 1)
+                    clause = code[following.pos:tokens[j].pos].strip()
+                    facts.imports.append(ImportRef(tokens[j + 1].value, "static", token.pos, end, clause))
+        elif value == "require" and previous != "." and k + 1 < count and tokens[k + 1].value == "(":
+            specifier = _string_arg(tokens, k + 2)
+            if specifier is not None:
+                facts.imports.append(ImportRef(specifier, "require", token.pos))
+        elif value == "export" and k + 1 < count and tokens[k + 1].value == "default":
+            if facts.default_export is None:
+                facts.default_export = _parse_default_export(tokens, k + 2)
+        elif value == "model" and previous != ".":
+            if _is_member_call(tokens, k, "model", "set"):
+                name = _string_arg(tokens, k + 4)
+                if name is not None:
+                    facts.model_sets.add(name)
+            elif _is_member_call(tokens, k, "model", "on"):
+                event = _string_arg(tokens, k + 4)
+                if event is not None and event.startswith("change:"):
+                    facts.model_subscriptions.add(event[len("change:"):])
+            elif _is_member_call(tokens, k, "model", "save_changes"):
+                facts.save_changes_calls += 1
+        elif value == "document":
+            if k + 2 < count and tokens[k + 1].value == "." and tokens[k + 2].value == "body":
+                facts.document_body = True
+        elif value == "ReactDOM":
+            if k + 2 < count and tokens[k + 1].value == "." and tokens[k + 2].value == "render":
+                facts.reactdom_render = True
+        elif value == "undefined":
+            facts.uses_undefined = True
+        elif value == "typeof":
+            facts.uses_typeof = True
+    return facts
@@ -0,0 +1,224 @@
+"""
+Client for the persistent Node validation daemon (validator_daemon.js).
+
+One Node process per kernel parses widget code as ES modules and answers over
+line-delimited JSON on stdin/stdout, so validation no longer pays Node startup
+and a temp file on every call. The process is started lazily, restarted if it
+crashes or stops answering, and shared by every widget via
+`get_node_validator()`. When Node is not installed, `parse` returns None and
+callers skip the syntax check.
+"""
+from __future__ import annotations
+
+import atexit
+import itertools
+import json
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from vibe_widget.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DAEMON_SCRIPT = Path(__file__).with_name("validator_daemon.js")
+REQUEST_TIMEOUT = 5.0
+MAX_RESTARTS = 3
+RESTART_WINDOW_SECONDS = 60.0
+
+
+@dataclass
+class Diagnostic:
+    """A parse error reported by the daemon (line is 1-based, column 0-based)."""
+
+    message: str
+    line: int | None = None
+    column: int | None = None
+    severity: str = "error"
+
+    def format(self) -> str:
+        if self.line is None:
+            return self.message
+        location = f"line {self.line}" if self.column is None else f"line {self.line}, column {self.column + 1}"
+        return f"{self.message} ({location})"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"message": self.message, "line": self.line, "column": self.column, "severity": self.severity}
+
+
+class NodeValidator:
+    """Thread-safe handle on one long-lived validator_daemon.js process."""
+
+    def __init__(self, node: str | None = None, script: Path = DAEMON_SCRIPT):
+        self._node = node
+        self._script = script
+        self._lock = threading.Lock()
+        self._process: subprocess.Popen | None = None
+        self._replies: queue.Queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._restarts: list[float] = []
+        self._disabled = False
+        self.parser: str | None = None
+        self.requests = 0
+        self.crashes = 0
+
+    @property
+    def available(self) -> bool:
+        return not self._disabled and self._node_path() is not None
+
+    def _node_path(self) -> str | None:
+        if self._node is None:
+            self._node = shutil.which("node") or ""
+        return self._node or None
+
+    def parse(self, code: str) -> list[Diagnostic] | None:
+        """Parse ``code`` as an ES module; None if the daemon is unavailable."""
+        reply = self.request({"op": "parse", "code": code})
+        if reply is None:
+            return None
+        return [
+            Diagnostic(
+                message=str(item.get("message", "")),
+                line=item.get("line"),
+                column=item.get("column"),
+                severity=item.get("severity", "error"),
+            )
+            for item in reply.get("diagnostics", [])
+        ]
+
+    def request(self, payload: dict[str, Any]) -> dict[str, Any] | None:
+        """Send one request; restarts the daemon and retries once if it died."""
+        with self._lock:
+            for attempt in range(2):
+                if not self._ensure_started():
+                    return None
+                try:
+                    return self._roundtrip(payload)
+                except (OSError, TimeoutError, ValueError) as exc:
+                    self.crashes += 1
+                    logger.warning("Node validator failed (%s); restarting", exc)
+                    self._stop()
+            return None
+
+    def _roundtrip(self, payload: dict[str, Any]) -> dict[str, Any]:
+        request_id = next(self._ids)
+        process = self._process
+        assert process is not None and process.stdin is not None
+        process.stdin.write(json.dumps({**payload, "id": request_id}) + "\n")
+        process.stdin.flush()
+        self.requests += 1
+        deadline = time.monotonic() + REQUEST_TIMEOUT
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"no reply within {REQUEST_TIMEOUT:.0f}s")
+            try:
+                line = self._replies.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if line is None:
+                raise OSError("validator process exited")
+            reply = json.loads(line)
+            # Replies to requests that timed out earlier are dropped.
+            if reply.get("id") == request_id:
+                return reply
+
+    def _ensure_started(self) -> bool:
+        if self._process is not None:
+            if self._process.poll() is None:
+                return True
+            self.crashes += 1
+            logger.warning("Node validator exited with code %s; restarting", self._process.returncode)
+            self._process = None
+        if self._disabled:
+            return False
+        node = self._node_path()
+        if node is None or not self._script.exists():
+            return False
+        now = time.monotonic()
+        self._restarts = [t for t in self._restarts if now - t < RESTART_WINDOW_SECONDS]
+        if len(self._restarts) > MAX_RESTARTS:
+            logger.warning("Node validator keeps crashing; falling back to no syntax check")
+            self._disabled = True
+            return False
+        self._restarts.append(now)
+        try:
+            self._process = subprocess.Popen(
+                [node, "--experimental-vm-modules", "--no-warnings", str(self._script)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding="utf-8",
+                bufsize=1,
+            )
+        except OSError as exc:
+            logger.warning("Could not start Node validator: %s", exc)
+            self._disabled = True
+            return False
+        self._replies = queue.Queue()
+        threading.Thread(
+            target=self._read_replies,
+            args=(self._process, self._replies),
+            name="vibe-widget-node-validator",
+            daemon=True,
+        ).start()
+        try:
+            self.parser = self._roundtrip({"op": "ping"}).get("parser")
+        except (OSError, TimeoutError, ValueError) as exc:
+            logger.warning("Node validator did not start (%s)", exc)
+            self._stop()
+            return False
+        logger.debug("Started Node validator (pid %s, parser %s)", self._process.pid, self.parser)
+        return True
+
+    @staticmethod
+    def _read_replies(process: subprocess.Popen, replies: queue.Queue) -> None:
+        assert process.stdout is not None
+        for line in process.stdout:
+            if line.strip():
+                replies.put(line)
+        replies.put(None)
+
+    def _stop(self) -> None:
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            if process.stdin:
+                process.stdin.close()
+            process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self._process is not None and self._process.poll() is None,
+            "parser": self.parser,
+            "requests": self.requests,
+            "crashes": self.crashes,
+            "disabled": self._disabled,
+        }
+
+
+_VALIDATOR: NodeValidator | None = None
+_VALIDATOR_LOCK = threading.Lock()
+
+
+def get_node_validator() -> NodeValidator:
+    """Return the kernel-wide Node validator, creating it on first use."""
+    global _VALIDATOR
+    with _VALIDATOR_LOCK:
+        if _VALIDATOR is None:
+            _VALIDATOR = NodeValidator()
+            atexit.register(_VALIDATOR.close)
+        return _VALIDATOR
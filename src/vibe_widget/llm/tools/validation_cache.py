@@ -0,0 +1,101 @@
+"""
+Memoized validation results.
+
+`CodeValidateTool` and `RuntimeTestTool` are pure functions of the code and
+the expected exports/imports, yet they run again on identical code after a
+no-op repair, on cached loads, reruns and audit-apply. Results are cached
+under a key of (tool, validator version, code hash, exports, imports) in an
+in-memory LRU; with `Config.validation_cache="disk"` they are also persisted
+under `.vibewidget/validation/`. Bumping a tool's VERSION invalidates its
+entries when the rules change.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+from pathlib import Path
+from typing import Iterable
+
+from vibe_widget.llm.tools.base import ToolResult
+from vibe_widget.utils.json_store import JsonEntryStore
+
+DEFAULT_MAX_ENTRIES = 512
+
+
+def validation_key(
+    tool: str,
+    version: int | str,
+    code: str,
+    expected_exports: Iterable[str] | None = None,
+    expected_imports: Iterable[str] | None = None,
+) -> str:
+    payload = json.dumps(
+        {
+            "tool": tool,
+            "version": str(version),
+            "code": hashlib.sha256(code.encode("utf-8", "surrogatepass")).hexdigest(),
+            "exports": sorted(expected_exports or []),
+            "imports": sorted(expected_imports or []),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ValidationCache(JsonEntryStore):
+    """LRU of ToolResults with an optional JSON-per-entry disk tier."""
+
+    kind = "validation result"
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, disk_dir: Path | None = None):
+        super().__init__(max_entries, disk_dir)
+
+    def get(self, key: str) -> ToolResult | None:
+        entry = self.get_entry(key)
+        if entry is None:
+            return None
+        result = ToolResult(
+            success=entry["success"],
+            output=copy.deepcopy(entry["output"]),
+            error=entry.get("error"),
+            metadata=copy.deepcopy(entry.get("metadata") or {}),
+        )
+        result.metadata["cached"] = True
+        return result
+
+    def put(self, key: str, result: ToolResult) -> None:
+        self.put_entry(
+            key,
+            {
+                "success": result.success,
+                "output": copy.deepcopy(result.output),
+                "error": result.error,
+                "metadata": copy.deepcopy(result.metadata),
+            },
+        )
+
+
+_VALIDATION_CACHE: ValidationCache | None = None
+
+
+def _disk_dir() -> Path:
+    return Path.cwd() / ".vibewidget" / "validation"
+
+
+def get_validation_cache() -> ValidationCache:
+    """Return the process-wide validation cache, honoring `Config.validation_cache`."""
+    global _VALIDATION_CACHE
+    from vibe_widget.config import get_global_config
+
+    mode = getattr(get_global_config(), "validation_cache", "memory")
+    if _VALIDATION_CACHE is None:
+        _VALIDATION_CACHE = ValidationCache()
+    _VALIDATION_CACHE.enabled = mode != "off"
+    _VALIDATION_CACHE.disk_dir = _disk_dir() if mode == "disk" else None
+    return _VALIDATION_CACHE
+
+
+def clear_validation_cache() -> int:
+    """Clear the process-wide validation cache (memory and disk tiers)."""
+    return get_validation_cache().clear(_disk_dir())
@@ -0,0 +1,122 @@
+// Long-lived widget code validator used by RuntimeTestTool.
+//
+// Protocol: one JSON object per line on stdin, one JSON reply per line on stdout.
+//   {"id": 1, "op": "parse", "code": "..."}  -> {"id": 1, "ok": false, "diagnostics": [...]}
+//   {"id": 2, "op": "ping"}                   -> {"id": 2, "ok": true, "parser": "v8", ...}
+// Diagnostics are {message, line, column, severity}; line is 1-based, column 0-based.
+//
+// Code is parsed as an ES module. acorn is used when it can be resolved;
+// otherwise V8 parses the module (vm.SourceTextModule, needs
+// --experimental-vm-modules) and the location is recovered by re-parsing with
+// import/export keywords masked out.
+"use strict";
+
+const readline = require("node:readline");
+const vm = require("node:vm");
+
+const VERSION = 1;
+
+function loadAcorn() {
+  try {
+    return require(require.resolve("acorn", { paths: [process.cwd(), __dirname] }));
+  } catch (err) {
+    return null;
+  }
+}
+
+const acorn = loadAcorn();
+const parser = acorn ? "acorn" : typeof vm.SourceTextModule === "function" ? "v8" : "script";
+
+function diagnostic(message, line, column) {
+  return { message, line: line ?? null, column: column ?? null, severity: "error" };
+}
+
+function parseWithAcorn(code) {
+  try {
+    acorn.parse(code, { ecmaVersion: "latest", sourceType: "module", locations: true });
+    return [];
+  } catch (err) {
+    const message = String(err.message || err).replace(/\s*\(\d+:\d+\)$/, "");
+    return [diagnostic(message, err.loc && err.loc.line, err.loc && err.loc.column)];
+  }
+}
+
+// Blank out module-only syntax without moving any other character.
+function maskModuleSyntax(code) {
+  return code
+    .replace(/^[ \t]*import\b[^;]*?\bfrom\s*(["'])[^"']*\1\s*;?/gm, (match) => match.replace(/[^\n]/g, " "))
+    .replace(/^[ \t]*import\s*(["'])[^"']*\1\s*;?/gm, (match) => match.replace(/[^\n]/g, " "))
+    .replace(/\bexport\s+default\s+(?=(async\s+)?function\b|class\b)/g, (match) => " ".repeat(match.length))
+    .replace(/\bexport\s+default\b/g, (match) => "void".padEnd(match.length, " "))
+    .replace(/\bexport\s+(?=(const|let|var|function|async|class)\b)/g, (match) => " ".repeat(match.length))
+    .replace(/\bimport\.meta\b/g, (match) => "Object".padEnd(match.length, " "));
+}
+
+// Wrapped in an async function so top-level await parses like in a module.
+const WRAPPER_PREFIX = "(async function () {";
+
+function compileScript(code) {
+  new vm.Script(`${WRAPPER_PREFIX}${maskModuleSyntax(code)}\n})`, { filename: "widget.js" });
+}
+
+function locate(code, message) {
+  try {
+    compileScript(code);
+  } catch (err) {
+    if (String(err.message) !== message) return {};
+    const [header, , caret] = String(err.stack || "").split("\n");
+    const match = /:(\d+)$/.exec(header || "");
+    const line = match ? Number(match[1]) : null;
+    let column = caret && caret.includes("^") ? caret.indexOf("^") : null;
+    if (line === 1 && column !== null) {
+      column = Math.max(0, column - WRAPPER_PREFIX.length);
+    }
+    return { line, column };
+  }
+  return {};
+}
+
+function parseWithV8(code) {
+  try {
+    if (parser === "v8") {
+      new vm.SourceTextModule(code, { identifier: "widget.js" });
+    } else {
+      compileScript(code);
+    }
+    return [];
+  } catch (err) {
+    const message = String(err.message || err);
+    const { line, column } = locate(code, message);
+    return [diagnostic(`${err.name || "SyntaxError"}: ${message}`, line, column)];
+  }
+}
+
+function handle(request) {
+  if (request.op === "ping") {
+    return { ok: true, parser, version: VERSION, node: process.version };
+  }
+  if (request.op === "parse") {
+    const code = String(request.code || "");
+    const diagnostics = acorn ? parseWithAcorn(code) : parseWithV8(code);
+    return { ok: diagnostics.length === 0, diagnostics };
+  }
+  return { ok: false, error: `unknown op: ${request.op}` };
+}
+
+const input = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+
+input.on("line", (line) => {
+  if (!line.trim()) return;
+  let reply;
+  let id = null;
+  try {
+    const request = JSON.parse(line);
+    id = request.id ?? null;
+    reply = handle(request);
+  } catch (err) {
+    reply = { ok: false, error: String((err && err.message) || err) };
+  }
+  process.stdout.write(JSON.stringify({ id, ...reply }) + "\n");
+});
+
+input.on("close", () => process.exit(0));
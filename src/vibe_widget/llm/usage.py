@@ -0,0 +1,100 @@
+"""
+Token usage accounting for provider calls.
+
+Providers report the `usage` block of every response (streamed responses
+request it with `stream_options.include_usage`). Cached prompt tokens come
+from `prompt_tokens_details.cached_tokens` (OpenAI/OpenRouter) or
+`cache_read_input_tokens` (Anthropic passthrough), so the hit rate of the
+stable system prefixes is visible per model and call type.
+"""
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Any
+
+
+@dataclass
+class TokenUsage:
+    """Token counts reported for one completion."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+
+    @classmethod
+    def from_response(cls, usage: Any) -> "TokenUsage | None":
+        """Build from an SDK usage object or dict; None if the response had no usage."""
+        if usage is None:
+            return None
+
+        def _get(obj: Any, name: str) -> Any:
+            if obj is None:
+                return None
+            if isinstance(obj, dict):
+                return obj.get(name)
+            return getattr(obj, name, None)
+
+        details = _get(usage, "prompt_tokens_details")
+        cached = _get(details, "cached_tokens") or _get(usage, "cache_read_input_tokens") or 0
+        return cls(
+            prompt_tokens=int(_get(usage, "prompt_tokens") or 0),
+            completion_tokens=int(_get(usage, "completion_tokens") or 0),
+            cached_tokens=int(cached),
+        )
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class UsageTracker:
+    """Accumulates token usage per (model, call type)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: dict[tuple[str, str], dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+        )
+
+    def record(self, model: str, call_type: str, usage: TokenUsage) -> None:
+        with self._lock:
+            totals = self._totals[(model, call_type)]
+            totals["calls"] += 1
+            totals["prompt_tokens"] += usage.prompt_tokens
+            totals["completion_tokens"] += usage.completion_tokens
+            totals["cached_tokens"] += usage.cached_tokens
+
+    def stats(self) -> dict[str, Any]:
+        """Totals per model and call type, with the share of prompt tokens served from cache."""
+        with self._lock:
+            rows = []
+            for (model, call_type), totals in sorted(self._totals.items()):
+                prompt = totals["prompt_tokens"]
+                rows.append({
+                    "model": model,
+                    "call_type": call_type,
+                    **totals,
+                    "cached_ratio": (totals["cached_tokens"] / prompt) if prompt else 0.0,
+                })
+        prompt_total = sum(row["prompt_tokens"] for row in rows)
+        cached_total = sum(row["cached_tokens"] for row in rows)
+        return {
+            "prompt_tokens": prompt_total,
+            "completion_tokens": sum(row["completion_tokens"] for row in rows),
+            "cached_tokens": cached_total,
+            "cached_ratio": (cached_total / prompt_total) if prompt_total else 0.0,
+            "by_model": rows,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+_USAGE_TRACKER = UsageTracker()
+
+
+def get_usage_tracker() -> UsageTracker:
+    """Return the process-wide token usage tracker."""
+    return _USAGE_TRACKER
@@ -5,6 +5,8 @@ from __future__ import annotations
 from typing import Any, Callable
 
 from vibe_widget.llm.agentic import AgenticOrchestrator
+from vibe_widget.llm.budget import GenerationBudget
+from vibe_widget.llm.cancellation import CancellationToken
 from vibe_widget.llm.providers.base import LLMProvider
 from vibe_widget.utils.serialization import clean_for_json
 
@@ -31,6 +33,8 @@ class GenerationService:
         base_components: list[str] | None,
         theme_description: str | None,
         progress_callback: Callable[[str, str], None] | None = None,
+        cancel_token: CancellationToken | None = None,
+        budget: GenerationBudget | None = None,
     ) -> tuple[str, dict[str, Any]]:
         """Generate widget code via the LLM."""
         return self.orchestrator.generate(
@@ -44,6 +48,40 @@ class GenerationService:
             base_components=base_components,
             theme_description=theme_description,
             progress_callback=progress_callback,
+            cancel_token=cancel_token,
+            budget=budget,
+        )
+
+    async def generate_async(
+        self,
+        *,
+        description: str,
+        outputs: dict[str, str] | None,
+        inputs: dict[str, Any] | None,
+        input_summaries: dict[str, str] | None,
+        actions: dict[str, str] | None,
+        action_params: dict[str, dict[str, str] | None] | None,
+        base_code: str | None,
+        base_components: list[str] | None,
+        theme_description: str | None,
+        progress_callback: Callable[[str, str], None] | None = None,
+        cancel_token: CancellationToken | None = None,
+        budget: GenerationBudget | None = None,
+    ) -> tuple[str, dict[str, Any]]:
+        """Generate widget code via the LLM without blocking the event loop."""
+        return await self.orchestrator.generate_async(
+            description=description,
+            outputs=outputs,
+            inputs=inputs,
+            input_summaries=input_summaries,
+            actions=actions,
+            action_params=action_params,
+            base_code=base_code,
+            base_components=base_components,
+            theme_description=theme_description,
+            progress_callback=progress_callback,
+            cancel_token=cancel_token,
+            budget=budget,
         )
 
     def fix_runtime_error(
@@ -76,6 +114,7 @@ class GenerationService:
         revision_request: str,
         data_info: dict[str, Any],
         progress_callback: Callable[[str, str], None] | None = None,
+        cancel_token: CancellationToken | None = None,
     ) -> str:
         """Apply revision requests to existing code."""
         return self.orchestrator.revise_code(
@@ -83,4 +122,5 @@ class GenerationService:
             revision_request=revision_request,
             data_info=clean_for_json(data_info),
             progress_callback=progress_callback,
+            cancel_token=cancel_token,
         )
@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from typing import Any, Callable
 
 from vibe_widget.llm.agentic import AgenticOrchestrator
+from vibe_widget.services.repair_cache import get_repair_cache, repair_key
 from vibe_widget.utils.serialization import clean_for_json
 
 
@@ -15,6 +16,7 @@ class RepairResult:
     applied: bool
     retryable: bool
     message: str
+    cached: bool = False
 
 
 class RepairService:
@@ -24,6 +26,9 @@ class RepairService:
 
     def __init__(self, orchestrator: AgenticOrchestrator):
         self.orchestrator = orchestrator
+        # (cache key, fixed code) of the last repair applied; if that code fails
+        # again, the cached repair is evicted instead of being replayed.
+        self._last_repair: tuple[str, str] | None = None
 
     def fix_runtime_error(
         self,
@@ -36,9 +41,24 @@ class RepairService:
     ) -> RepairResult:
         if not error_message:
             return RepairResult(code=code, applied=False, retryable=False, message="No error message to repair.")
+        cache = get_repair_cache()
+        if self._last_repair is not None and self._last_repair[1] == code:
+            cache.evict(self._last_repair[0])
+        self._last_repair = None
         if retry_count >= self.MAX_RETRIES:
             return RepairResult(code=code, applied=False, retryable=False, message="Max retry attempts reached.")
 
+        signature = self._signature(code, error_message)
+        key = repair_key(code, signature)
+        cached = cache.get(code, signature)
+        if cached is not None:
+            if progress_callback:
+                progress_callback("step", "Reusing cached repair")
+            self._last_repair = (key, cached)
+            return RepairResult(
+                code=cached, applied=True, retryable=False, message="Repair applied (cached).", cached=True
+            )
+
         try:
             try:
                 fixed_code = self.orchestrator.fix_runtime_error(
@@ -63,5 +83,23 @@ class RepairService:
             )
 
         applied = fixed_code != code
+        if applied and self._verified(fixed_code):
+            cache.put(code, signature, fixed_code)
+            self._last_repair = (key, fixed_code)
         message = "Repair applied." if applied else "Repair produced no changes."
         return RepairResult(code=fixed_code, applied=applied, retryable=False, message=message)
+
+    def _verified(self, code: str) -> bool:
+        """Whether repaired code passes static validation and the runtime test (worth caching)."""
+        if not self.orchestrator.validate_tool.execute(code=code).success:
+            return False
+        return self.orchestrator.runtime_tool.execute(code=code).success
+
+    def _signature(self, code: str, error_message: str) -> str:
+        diagnosis = self.orchestrator.diagnose_tool.execute(error_message=error_message, code=code)
+        return diagnosis.output.get("signature") or error_message.strip()
+
+    @staticmethod
+    def cache_stats() -> dict[str, Any]:
+        """Hit rate and size of the runtime repair cache."""
+        return get_repair_cache().stats()
@@ -0,0 +1,90 @@
+"""
+Memoized runtime repairs.
+
+`RepairService.fix_runtime_error` used to send every frontend error to the
+LLM, even when the same widget code failed with the same error in another
+kernel or on a rerun. Repairs whose code passes `CodeValidateTool` and
+`RuntimeTestTool` are cached under (code hash, normalized error signature from
+`ErrorDiagnoseTool`), so an identical failure is repaired instantly; a cached
+repair whose code fails again is evicted rather than replayed. Entries expire
+after `Config.repair_cache_ttl` seconds. With `Config.repair_cache="disk"`
+(the default) they persist under `.vibewidget/repairs/`; "memory" keeps them
+for the session and "off" disables the cache.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from pathlib import Path
+from typing import Any
+
+from vibe_widget.utils.json_store import JsonEntryStore
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600.0
+
+
+def repair_key(code: str, signature: str) -> str:
+    code_hash = hashlib.sha256(code.encode("utf-8", "surrogatepass")).hexdigest()
+    return hashlib.sha256(f"{code_hash}\n{signature}".encode("utf-8")).hexdigest()
+
+
+class RepairCache(JsonEntryStore):
+    """LRU of fixed code with TTL expiry and an optional JSON-per-entry disk tier."""
+
+    kind = "repair"
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: float | None = DEFAULT_TTL_SECONDS,
+        disk_dir: Path | None = None,
+    ):
+        super().__init__(max_entries, disk_dir)
+        self.ttl = ttl
+
+    def _is_stale(self, entry: dict[str, Any]) -> bool:
+        return self.ttl is not None and time.time() - float(entry.get("created", 0)) > self.ttl
+
+    def get(self, code: str, signature: str) -> str | None:
+        """Fixed code for this (code, error signature), or None."""
+        entry = self.get_entry(repair_key(code, signature))
+        return entry["fixed_code"] if entry is not None else None
+
+    def put(self, code: str, signature: str, fixed_code: str) -> None:
+        self.put_entry(
+            repair_key(code, signature),
+            {"signature": signature, "fixed_code": fixed_code, "created": time.time()},
+        )
+
+    def stats(self) -> dict[str, Any]:
+        stats = super().stats()
+        stats.update(expired=self.expired, ttl=self.ttl)
+        return stats
+
+
+_REPAIR_CACHE: RepairCache | None = None
+
+
+def _disk_dir() -> Path:
+    return Path.cwd() / ".vibewidget" / "repairs"
+
+
+def get_repair_cache() -> RepairCache:
+    """Return the process-wide repair cache, honoring `Config.repair_cache` and `repair_cache_ttl`."""
+    global _REPAIR_CACHE
+    from vibe_widget.config import get_global_config
+
+    config = get_global_config()
+    mode = getattr(config, "repair_cache", "disk")
+    if _REPAIR_CACHE is None:
+        _REPAIR_CACHE = RepairCache()
+    _REPAIR_CACHE.enabled = mode != "off"
+    _REPAIR_CACHE.disk_dir = _disk_dir() if mode == "disk" else None
+    _REPAIR_CACHE.ttl = getattr(config, "repair_cache_ttl", DEFAULT_TTL_SECONDS)
+    return _REPAIR_CACHE
+
+
+def clear_repair_cache() -> int:
+    """Clear the process-wide repair cache (memory and disk tiers)."""
+    return get_repair_cache().clear(_disk_dir())
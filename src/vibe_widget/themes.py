@@ -342,7 +342,7 @@ def _generate_text(
     api_key: str | None = None,
 ) -> str:
     active_provider = provider or _get_provider(model=model, api_key=api_key)
-    return active_provider.generate_text(prompt).strip()
+    return active_provider.generate_text(prompt, call_type="theme").strip()
 
 
 _BUILTIN_THEMES = {
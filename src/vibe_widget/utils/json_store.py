@@ -0,0 +1,151 @@
+"""
+In-memory LRU of JSON entries with an optional JSON-file-per-entry disk tier.
+
+Shared by the validation and repair caches: entries live in an LRU bounded by
+`max_entries` and, when `disk_dir` is set, are also written to
+`<disk_dir>/<key>.json` so they survive the kernel. Subclasses build the keys
+and entries and can expire entries by overriding `_is_stale`.
+"""
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from vibe_widget.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class JsonEntryStore:
+    """LRU of JSON-serializable dict entries with an optional disk tier."""
+
+    # Used in log messages.
+    kind = "entry"
+
+    def __init__(self, max_entries: int, disk_dir: Path | None = None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.enabled = True
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def _disk_path(self, key: str) -> Path | None:
+        if self.disk_dir is None:
+            return None
+        return self.disk_dir / f"{key}.json"
+
+    def _is_stale(self, entry: dict[str, Any]) -> bool:
+        return False
+
+    def get_entry(self, key: str) -> dict[str, Any] | None:
+        """The entry stored under ``key`` (memory first, then disk), or None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            entry = self._load(key)
+        if entry is not None and self._is_stale(entry):
+            self.evict(key)
+            self.expired += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put_entry(self, key: str, entry: dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        self._remember(key, entry)
+        disk_path = self._disk_path(key)
+        if disk_path is not None:
+            try:
+                disk_path.parent.mkdir(parents=True, exist_ok=True)
+                disk_path.write_text(json.dumps(entry, default=str), encoding="utf-8")
+            except OSError as exc:
+                logger.debug("Could not persist %s %s: %s", self.kind, key[:8], exc)
+
+    def _remember(self, key: str, entry: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, key: str) -> dict[str, Any] | None:
+        disk_path = self._disk_path(key)
+        if disk_path is None or not disk_path.exists():
+            return None
+        try:
+            entry = json.loads(disk_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def evict(self, key: str) -> None:
+        """Drop one entry from memory and disk."""
+        with self._lock:
+            self._entries.pop(key, None)
+        disk_path = self._disk_path(key)
+        if disk_path is not None:
+            try:
+                disk_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    def prune(self) -> int:
+        """Drop stale entries from memory and disk; returns how many were removed."""
+        with self._lock:
+            removed = {key for key, entry in self._entries.items() if self._is_stale(entry)}
+            for key in removed:
+                del self._entries[key]
+        if self.disk_dir is not None and self.disk_dir.exists():
+            for path in self.disk_dir.glob("*.json"):
+                try:
+                    entry = json.loads(path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    entry = {}
+                if not entry or self._is_stale(entry):
+                    try:
+                        path.unlink()
+                        removed.add(path.stem)
+                    except OSError:
+                        continue
+        self.expired += len(removed)
+        return len(removed)
+
+    def clear(self, disk_dir: Path | None = None) -> int:
+        """Drop all in-memory entries and the on-disk ones (``disk_dir`` defaults to the store's)."""
+        with self._lock:
+            removed = set(self._entries)
+            self._entries.clear()
+        disk_dir = disk_dir or self.disk_dir
+        if disk_dir is not None and disk_dir.exists():
+            for path in disk_dir.glob("*.json"):
+                try:
+                    path.unlink()
+                    removed.add(path.stem)
+                except OSError:
+                    continue
+        return len(removed)
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "disk": str(self.disk_dir) if self.disk_dir else None,
+        }
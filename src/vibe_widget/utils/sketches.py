@@ -0,0 +1,525 @@
+"""
+Mergeable streaming sketches for out-of-core profiling.
+
+Inputs that never fit in memory (chunked CSVs, Parquet datasets, streaming
+sources) can still be profiled by feeding chunks into a `DataSketch`. Every
+sketch here is updated chunk by chunk and can be merged with a sketch built on
+another worker, so profiles can be computed in parallel and combined:
+
+- `MomentsSketch`: count/mean/variance/min/max (Chan et al. parallel merge)
+- `KLLSketch`: approximate quantiles (Karnin-Lang-Liberty)
+- `HyperLogLog`: approximate distinct counts
+- `FrequentItems`: top-k heavy hitters (Misra-Gries, mergeable form)
+
+`DataSketch.to_profile()` returns the same shape as `DataProfileTool`, and
+`DataSketch.describe()` renders a compact prompt summary.
+"""
+from __future__ import annotations
+
+import math
+import random
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+class MomentsSketch:
+    """Online count/mean/variance/min/max with an exact parallel merge."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def update(self, values: Any) -> None:
+        arr = np.asarray(values, dtype="float64").ravel()
+        arr = arr[np.isfinite(arr)]
+        if arr.size == 0:
+            return
+        other = MomentsSketch()
+        other.count = int(arr.size)
+        other.mean = float(arr.mean())
+        other.m2 = float(((arr - other.mean) ** 2).sum())
+        other.min = float(arr.min())
+        other.max = float(arr.max())
+        self.merge(other)
+
+    def merge(self, other: "MomentsSketch") -> "MomentsSketch":
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)  # type: ignore[type-var]
+        self.max = max(self.max, other.max)  # type: ignore[type-var]
+        return self
+
+    @property
+    def variance(self) -> float | None:
+        if self.count < 2:
+            return None
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self) -> float | None:
+        variance = self.variance
+        return math.sqrt(variance) if variance is not None else None
+
+
+class KLLSketch:
+    """KLL quantile sketch over numeric values.
+
+    Level ``h`` holds items of weight ``2**h``; full levels are compacted by
+    sorting and keeping every other item. Rank error is roughly ``1.7 / k``.
+    """
+
+    def __init__(self, k: int = 200, c: float = 2.0 / 3.0, seed: int | None = None):
+        self.k = k
+        self.c = c
+        self.compactors: list[np.ndarray] = []
+        self.size = 0
+        self.max_size = 0
+        self.n = 0
+        self._rng = random.Random(seed)
+        self._grow()
+
+    def _grow(self) -> None:
+        self.compactors.append(np.empty(0, dtype="float64"))
+        self.max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _capacity(self, height: int) -> int:
+        depth = len(self.compactors) - height - 1
+        return int(math.ceil((self.c ** depth) * self.k)) + 1
+
+    def _compact(self, height: int) -> np.ndarray:
+        items = np.sort(self.compactors[height])
+        leftover = items[: len(items) % 2]
+        pairs = items[len(items) % 2 :]
+        offset = 1 if self._rng.random() < 0.5 else 0
+        self.compactors[height] = leftover
+        return pairs[offset::2]
+
+    def _compress(self) -> None:
+        while self.size >= self.max_size:
+            for height in range(len(self.compactors)):
+                if len(self.compactors[height]) >= self._capacity(height):
+                    if height + 1 >= len(self.compactors):
+                        self._grow()
+                    promoted = self._compact(height)
+                    self.compactors[height + 1] = np.concatenate([self.compactors[height + 1], promoted])
+                    self.size = sum(len(level) for level in self.compactors)
+                    if self.size < self.max_size:
+                        break
+
+    def update(self, values: Any) -> None:
+        arr = np.asarray(values, dtype="float64").ravel()
+        arr = arr[np.isfinite(arr)]
+        if arr.size == 0:
+            return
+        self.compactors[0] = np.concatenate([self.compactors[0], arr])
+        self.n += int(arr.size)
+        self.size += int(arr.size)
+        if self.size >= self.max_size:
+            self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for height, level in enumerate(other.compactors):
+            self.compactors[height] = np.concatenate([self.compactors[height], level])
+        self.n += other.n
+        self.size = sum(len(level) for level in self.compactors)
+        if self.size >= self.max_size:
+            self._compress()
+        return self
+
+    def quantiles(self, qs: Iterable[float]) -> list[float | None]:
+        """Return approximate values at the requested quantiles (0..1)."""
+        qs = list(qs)
+        if self.size == 0:
+            return [None for _ in qs]
+        values = np.concatenate(self.compactors)
+        weights = np.concatenate(
+            [np.full(len(level), 2**height, dtype="float64") for height, level in enumerate(self.compactors)]
+        )
+        order = np.argsort(values, kind="mergesort")
+        values = values[order]
+        cumulative = np.cumsum(weights[order])
+        total = cumulative[-1]
+        results: list[float | None] = []
+        for q in qs:
+            q = min(max(float(q), 0.0), 1.0)
+            idx = int(np.searchsorted(cumulative, q * total, side="left"))
+            results.append(float(values[min(idx, len(values) - 1)]))
+        return results
+
+    def quantile(self, q: float) -> float | None:
+        return self.quantiles([q])[0]
+
+
+class HyperLogLog:
+    """HyperLogLog distinct-count sketch over pandas-hashable values."""
+
+    def __init__(self, p: int = 12):
+        if not 4 <= p <= 18:
+            raise ValueError("HyperLogLog precision p must be between 4 and 18.")
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def _alpha(self) -> float:
+        if self.m == 16:
+            return 0.673
+        if self.m == 32:
+            return 0.697
+        if self.m == 64:
+            return 0.709
+        return 0.7213 / (1 + 1.079 / self.m)
+
+    def update(self, values: Any) -> None:
+        series = values if isinstance(values, pd.Series) else pd.Series(values)
+        series = series.dropna()
+        if series.empty:
+            return
+        try:
+            hashes = pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+        except TypeError:
+            hashes = pd.util.hash_pandas_object(series.astype(str), index=False).to_numpy(dtype=np.uint64)
+        self.update_hashes(hashes)
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        width = 64 - self.p
+        index = (hashes >> np.uint64(width)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << width) - 1)
+        # Position of the leftmost 1-bit within the remaining `width` bits.
+        bit_length = np.zeros(len(remainder), dtype=np.int64)
+        nonzero = remainder > 0
+        if nonzero.any():
+            # Split into 32-bit halves so float conversion stays exact.
+            high = (remainder[nonzero] >> np.uint64(32)).astype(np.float64)
+            low = (remainder[nonzero] & np.uint64(0xFFFFFFFF)).astype(np.float64)
+            high_bits = np.where(high > 0, np.floor(np.log2(np.maximum(high, 1))) + 33, 0)
+            low_bits = np.where(low > 0, np.floor(np.log2(np.maximum(low, 1))) + 1, 0)
+            bit_length[nonzero] = np.where(high > 0, high_bits, low_bits).astype(np.int64)
+        rank = (width - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.p != self.p:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        estimate = self._alpha() * self.m * self.m / float(np.sum(np.power(2.0, -self.registers.astype(np.float64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+
+class FrequentItems:
+    """Misra-Gries heavy hitters; counts are underestimates by at most `error`."""
+
+    def __init__(self, k: int = 32):
+        self.k = k
+        self.counters: dict[Any, int] = {}
+        self.error = 0
+
+    def _reduce(self) -> None:
+        if len(self.counters) <= self.k:
+            return
+        ordered = sorted(self.counters.values(), reverse=True)
+        cut = ordered[self.k]
+        self.error += cut
+        self.counters = {item: count - cut for item, count in self.counters.items() if count > cut}
+
+    def update_counts(self, counts: dict[Any, int]) -> None:
+        for item, count in counts.items():
+            self.counters[item] = self.counters.get(item, 0) + int(count)
+        self._reduce()
+
+    def update(self, values: Any) -> None:
+        series = values if isinstance(values, pd.Series) else pd.Series(values)
+        try:
+            counts = series.dropna().value_counts()
+        except TypeError:
+            counts = series.dropna().astype(str).value_counts()
+        if len(counts) > self.k:
+            # Summarize the chunk to k counters first; merging summaries keeps the bound.
+            cut = int(counts.iloc[self.k])
+            counts = counts.iloc[: self.k] - cut
+            counts = counts[counts > 0]
+            self.error += cut
+        self.update_counts(counts.to_dict())
+
+    def merge(self, other: "FrequentItems") -> "FrequentItems":
+        self.error += other.error
+        self.update_counts(other.counters)
+        return self
+
+    def top(self, n: int = 10) -> list[tuple[Any, int]]:
+        ordered = sorted(self.counters.items(), key=lambda item: item[1], reverse=True)
+        return ordered[:n]
+
+
+def _is_numeric(dtype: Any) -> bool:
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+class ColumnSketch:
+    """All sketches tracked for a single column."""
+
+    def __init__(self, name: str, dtype: Any, *, k: int = 200, hll_p: int = 12, top_k: int = 32):
+        self.name = name
+        self.dtype_obj = dtype
+        self.dtype = str(dtype)
+        self.count = 0
+        self.null_count = 0
+        self.datetime = pd.api.types.is_datetime64_any_dtype(dtype)
+        self.numeric = _is_numeric(dtype)
+        self.moments = MomentsSketch() if (self.numeric or self.datetime) else None
+        self.quantiles = KLLSketch(k=k) if (self.numeric or self.datetime) else None
+        self.distinct = HyperLogLog(p=hll_p)
+        self.frequent = FrequentItems(k=top_k)
+        self.samples: list[Any] = []
+
+    def _demote(self, dtype: Any) -> None:
+        """Drop the numeric sketches once the column stops being numeric/datetime."""
+        self.dtype_obj = dtype
+        self.dtype = str(dtype)
+        self.numeric = False
+        self.datetime = False
+        self.moments = None
+        self.quantiles = None
+
+    def update(self, series: pd.Series) -> None:
+        self.count += len(series)
+        self.null_count += int(series.isna().sum())
+        values = series.dropna()
+        if values.empty:
+            return
+        # The dtype comes from the first chunk, which may have been all nulls; a later
+        # chunk with other values turns the column into what a full read would infer.
+        if (self.numeric and not _is_numeric(values.dtype)) or (
+            self.datetime and not pd.api.types.is_datetime64_any_dtype(values.dtype)
+        ):
+            self._demote(values.dtype)
+        if len(self.samples) < 3:
+            self.samples.extend(values.head(3 - len(self.samples)).tolist())
+        if self.datetime:
+            elapsed = pd.to_datetime(values, utc=True) - pd.Timestamp(0, tz="UTC")
+            numeric = (elapsed / pd.Timedelta(1, unit="ns")).to_numpy(dtype="float64")
+        elif self.numeric:
+            numeric = values.to_numpy(dtype="float64")
+        else:
+            numeric = None
+        if numeric is not None and self.moments is not None and self.quantiles is not None:
+            self.moments.update(numeric)
+            self.quantiles.update(numeric)
+        self.distinct.update(values)
+        self.frequent.update(values)
+
+    def merge(self, other: "ColumnSketch") -> "ColumnSketch":
+        self.count += other.count
+        self.null_count += other.null_count
+        if self.moments is not None and other.moments is None and other.frequent.counters:
+            self._demote(other.dtype_obj)
+        if self.moments is not None and other.moments is not None:
+            self.moments.merge(other.moments)
+        if self.quantiles is not None and other.quantiles is not None:
+            self.quantiles.merge(other.quantiles)
+        self.distinct.merge(other.distinct)
+        self.frequent.merge(other.frequent)
+        if len(self.samples) < 3:
+            self.samples.extend(other.samples[: 3 - len(self.samples)])
+        return self
+
+    def _decode(self, value: float | None) -> Any:
+        if value is None:
+            return None
+        if self.datetime:
+            return pd.Timestamp(int(value), unit="ns", tz="UTC").isoformat()
+        return float(value)
+
+    def to_profile(self) -> dict[str, Any]:
+        profile: dict[str, Any] = {
+            "dtype": self.dtype,
+            "null_count": self.null_count,
+            "null_percentage": float(self.null_count / self.count * 100) if self.count else 0.0,
+            "unique_count": self.distinct.count(),
+        }
+        if self.moments is not None and self.quantiles is not None and self.moments.count:
+            p25, median, p75 = self.quantiles.quantiles([0.25, 0.5, 0.75])
+            profile["stats"] = {
+                "min": self._decode(self.moments.min),
+                "max": self._decode(self.moments.max),
+                "mean": self._decode(self.moments.mean),
+                "median": self._decode(median),
+                "p25": self._decode(p25),
+                "p75": self._decode(p75),
+                "std": self.moments.std if not self.datetime else None,
+            }
+        profile["sample_values"] = [item for item, _ in self.frequent.top(3)] or list(self.samples)
+        profile["top_values"] = [
+            {"value": item, "count": count} for item, count in self.frequent.top(10)
+        ]
+        return profile
+
+
+class DataSketch:
+    """Per-column sketches for a tabular stream; chunk-updatable and mergeable."""
+
+    def __init__(self, *, k: int = 200, hll_p: int = 12, top_k: int = 32):
+        self.k = k
+        self.hll_p = hll_p
+        self.top_k = top_k
+        self.rows = 0
+        self.chunks = 0
+        self.columns: dict[str, ColumnSketch] = {}
+
+    def update(self, chunk: pd.DataFrame) -> "DataSketch":
+        """Fold one chunk of rows into the sketch."""
+        self.rows += len(chunk)
+        self.chunks += 1
+        for col in chunk.columns:
+            name = str(col)
+            sketch = self.columns.get(name)
+            if sketch is None:
+                sketch = ColumnSketch(name, chunk[col].dtype, k=self.k, hll_p=self.hll_p, top_k=self.top_k)
+                # Rows seen before this column appeared count as nulls.
+                sketch.count = self.rows - len(chunk)
+                sketch.null_count = sketch.count
+                self.columns[name] = sketch
+            sketch.update(chunk[col])
+        for name, sketch in self.columns.items():
+            if name not in {str(col) for col in chunk.columns}:
+                sketch.count += len(chunk)
+                sketch.null_count += len(chunk)
+        return self
+
+    def merge(self, other: "DataSketch") -> "DataSketch":
+        """Combine a sketch built over a disjoint set of rows (e.g. another worker)."""
+        for name, sketch in other.columns.items():
+            mine = self.columns.get(name)
+            if mine is None:
+                mine = ColumnSketch(name, sketch.dtype_obj, k=self.k, hll_p=self.hll_p, top_k=self.top_k)
+                mine.count = self.rows
+                mine.null_count = self.rows
+                self.columns[name] = mine
+            mine.merge(sketch)
+        for name, sketch in self.columns.items():
+            if name not in other.columns:
+                sketch.count += other.rows
+                sketch.null_count += other.rows
+        self.rows += other.rows
+        self.chunks += other.chunks
+        return self
+
+    @classmethod
+    def merge_all(cls, sketches: Iterable["DataSketch"]) -> "DataSketch":
+        merged: DataSketch | None = None
+        for sketch in sketches:
+            merged = sketch if merged is None else merged.merge(sketch)
+        return merged if merged is not None else cls()
+
+    def to_profile(self) -> dict[str, Any]:
+        """Return a `DataProfileTool`-compatible profile (approximate)."""
+        return {
+            "shape": {"rows": self.rows, "columns": len(self.columns)},
+            "columns": {name: sketch.to_profile() for name, sketch in self.columns.items()},
+            "approximate": True,
+            "chunks": self.chunks,
+        }
+
+    def describe(self, max_columns: int = 40) -> str:
+        """Render a compact, prompt-friendly summary."""
+        lines = [
+            f"Streamed dataset with ~{self.rows} rows and {len(self.columns)} columns "
+            f"(approximate statistics from {self.chunks} chunk(s))."
+        ]
+        for name, sketch in list(self.columns.items())[:max_columns]:
+            profile = sketch.to_profile()
+            parts = [f"{name} ({profile['dtype']})", f"~{profile['unique_count']} unique"]
+            if profile["null_count"]:
+                parts.append(f"{profile['null_percentage']:.1f}% null")
+            stats = profile.get("stats")
+            if stats:
+                parts.append(f"range {stats['min']}..{stats['max']}, median {stats['median']}")
+            else:
+                top = [str(item["value"]) for item in profile["top_values"][:5]]
+                if top:
+                    parts.append("top: " + ", ".join(top))
+            lines.append("- " + "; ".join(parts))
+        if len(self.columns) > max_columns:
+            lines.append(f"- ... {len(self.columns) - max_columns} more columns")
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return f"DataSketch(rows={self.rows}, columns={len(self.columns)}, chunks={self.chunks})"
+
+
+def iter_chunks(source: Any, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame chunks from a path, DataFrame, or iterable of frames/records."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start : start + chunksize]
+        return
+
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        suffix = path.suffix.lower()
+        if path.is_dir():
+            files = sorted(p for p in path.iterdir() if p.suffix.lower() in {".csv", ".tsv", ".parquet"})
+            for file_path in files:
+                yield from iter_chunks(file_path, chunksize)
+            return
+        if suffix in {".csv", ".tsv"}:
+            sep = "\t" if suffix == ".tsv" else ","
+            yield from pd.read_csv(path, sep=sep, chunksize=chunksize)
+            return
+        if suffix == ".parquet":
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError(
+                    "pyarrow required for streaming Parquet. Install with: pip install pyarrow"
+                )
+            parquet_file = pq.ParquetFile(path)
+            for batch in parquet_file.iter_batches(batch_size=chunksize):
+                yield batch.to_pandas()
+            return
+        raise ValueError(f"Unsupported streaming source: {source}. Supported: .csv, .tsv, .parquet")
+
+    for chunk in source:
+        if isinstance(chunk, pd.DataFrame):
+            yield chunk
+        elif isinstance(chunk, dict):
+            yield pd.DataFrame([chunk])
+        else:
+            yield pd.DataFrame(list(chunk))
+
+
+def sketch_source(
+    source: Any,
+    *,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    sketch: DataSketch | None = None,
+) -> DataSketch:
+    """Build (or extend) a `DataSketch` by streaming chunks from a source."""
+    sketch = sketch or DataSketch()
+    for chunk in iter_chunks(source, chunksize=chunksize):
+        sketch.update(chunk)
+    return sketch
@@ -0,0 +1,334 @@
+"""
+Memoization for prompt summaries.
+
+Summaries (pretty-little-summary descriptions, input profiles) are expensive for
+large inputs and are recomputed on every create/edit/rerun/cached load. This
+module keys them by a cheap fingerprint of the value:
+
+- DataFrames/Series/arrays: schema + shape + hash of an evenly spaced row sample
+- Scalars: hash of their JSON form
+- Lists/tuples/dicts: hash of their items' fingerprints, computed recursively
+  (large sequences are sampled)
+- File paths: resolved path + mtime + size
+- Anything else: object identity (+ an optional ``_version`` attribute)
+
+Entries live in an in-memory LRU. Content-based fingerprints can optionally be
+persisted under `.vibewidget/summaries/` so a dataset is summarized once across
+kernel restarts. Identity-based fingerprints are never written to disk.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from vibe_widget.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+SUMMARY_CACHE_VERSION = 2
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_SAMPLE_ROWS = 512
+# Containers larger than this are sampled instead of hashed in full.
+MAX_FULL_HASH_ITEMS = 2000
+
+
+def _hash_json(payload: Any) -> str:
+    text = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _sample_positions(length: int, limit: int) -> np.ndarray:
+    if length <= limit:
+        return np.arange(length)
+    return np.unique(np.linspace(0, length - 1, limit).astype(np.int64))
+
+
+def _frame_fingerprint(value: pd.DataFrame | pd.Series, sample_rows: int) -> str:
+    hasher = hashlib.sha256()
+    if isinstance(value, pd.DataFrame):
+        schema = {
+            "kind": "DataFrame",
+            "shape": list(value.shape),
+            "columns": [str(col) for col in value.columns],
+            "dtypes": [str(dtype) for dtype in value.dtypes],
+        }
+    else:
+        schema = {
+            "kind": "Series",
+            "shape": list(value.shape),
+            "name": str(value.name),
+            "dtype": str(value.dtype),
+        }
+    schema["index"] = str(value.index.dtype)
+    hasher.update(json.dumps(schema, sort_keys=True).encode("utf-8"))
+
+    sample = value.iloc[_sample_positions(len(value), sample_rows)]
+    try:
+        row_hashes = pd.util.hash_pandas_object(sample, index=True)
+        hasher.update(np.asarray(row_hashes.values).tobytes())
+    except TypeError:
+        # Unhashable cells (lists, dicts); fall back to a textual form.
+        hasher.update(sample.to_json(default_handler=str).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def _array_fingerprint(value: np.ndarray, sample_rows: int) -> str:
+    hasher = hashlib.sha256()
+    hasher.update(json.dumps({"kind": "ndarray", "shape": list(value.shape), "dtype": str(value.dtype)}).encode())
+    flat = value.reshape(-1) if value.size else value
+    sample = flat[_sample_positions(flat.size, sample_rows)] if flat.size else flat
+    if value.dtype.hasobject:
+        hasher.update(repr(sample.tolist()).encode("utf-8"))
+    else:
+        hasher.update(np.ascontiguousarray(sample).tobytes())
+    return hasher.hexdigest()
+
+
+def _items_fingerprint(
+    kind: str,
+    length: int,
+    items: list[tuple[str, Any]],
+    sample_rows: int,
+) -> tuple[str, bool] | None:
+    """Fingerprint (label, item) pairs from each item's own fingerprint.
+
+    The container is content-based only if every item is; an item that
+    cannot be keyed makes the whole container unkeyable.
+    """
+    fingerprints = []
+    content_based = True
+    for label, item in items:
+        keyed = fingerprint_value(item, sample_rows=sample_rows)
+        if keyed is None:
+            return None
+        fingerprints.append([label, keyed[0]])
+        content_based = content_based and keyed[1]
+    return _hash_json({"kind": kind, "length": length, "items": fingerprints}), content_based
+
+
+def _sequence_fingerprint(value: list | tuple, sample_rows: int) -> tuple[str, bool] | None:
+    if len(value) <= MAX_FULL_HASH_ITEMS:
+        positions = range(len(value))
+    else:
+        positions = _sample_positions(len(value), sample_rows)
+    items = [(str(int(pos)), value[int(pos)]) for pos in positions]
+    return _items_fingerprint(type(value).__name__, len(value), items, sample_rows)
+
+
+def _dict_fingerprint(value: dict, sample_rows: int) -> tuple[str, bool] | None:
+    items = sorted(
+        ((f"{type(key).__name__}:{key}", item) for key, item in value.items()),
+        key=lambda pair: pair[0],
+    )
+    return _items_fingerprint("dict", len(value), items, sample_rows)
+
+
+def _path_fingerprint(path: Path) -> str | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return _hash_json(
+        {
+            "kind": "path",
+            "path": str(path.resolve()),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+        }
+    )
+
+
+def fingerprint_value(value: Any, *, sample_rows: int = DEFAULT_SAMPLE_ROWS) -> tuple[str, bool] | None:
+    """Return ``(fingerprint, content_based)`` for a value, or None if it cannot be keyed.
+
+    Content-based fingerprints are stable across processes and safe to persist.
+    Identity-based fingerprints are only valid while the object is alive.
+    """
+    try:
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return _frame_fingerprint(value, sample_rows), True
+        if isinstance(value, np.ndarray):
+            return _array_fingerprint(value, sample_rows), True
+        if isinstance(value, Path):
+            fingerprint = _path_fingerprint(value)
+            return (fingerprint, True) if fingerprint else None
+        if isinstance(value, str):
+            if len(value) < 1024 and "\n" not in value:
+                candidate = Path(value)
+                try:
+                    is_file = candidate.is_file()
+                except OSError:
+                    is_file = False
+                if is_file:
+                    fingerprint = _path_fingerprint(candidate)
+                    if fingerprint:
+                        return fingerprint, True
+            return hashlib.sha256(value.encode("utf-8", "surrogatepass")).hexdigest(), True
+        if value is None or isinstance(value, (bool, int, float)):
+            return _hash_json({"kind": type(value).__name__, "value": repr(value)}), True
+        if isinstance(value, (list, tuple)):
+            return _sequence_fingerprint(value, sample_rows)
+        if isinstance(value, dict):
+            return _dict_fingerprint(value, sample_rows)
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("Could not fingerprint %s: %s", type(value).__name__, exc)
+        return None
+
+    version = getattr(value, "_version", None)
+    return f"id:{type(value).__qualname__}:{id(value)}:{version}", False
+
+
+class SummaryCache:
+    """LRU cache of prompt summaries keyed by value fingerprints."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        disk_dir: Path | None = None,
+    ):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._entries: OrderedDict[str, tuple[Any, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _make_key(self, namespace: str, fingerprint: str) -> str:
+        return hashlib.sha256(
+            f"{SUMMARY_CACHE_VERSION}:{namespace}:{fingerprint}".encode("utf-8")
+        ).hexdigest()
+
+    def _disk_path(self, key: str) -> Path | None:
+        if self.disk_dir is None:
+            return None
+        return self.disk_dir / f"{key}.txt"
+
+    def _get_memory(self, key: str, value: Any) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            summary, ref = entry
+            if ref is not None and ref() is not value:
+                # Identity key reused by a different object.
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return summary
+
+    def _put_memory(self, key: str, summary: Any, ref: Any) -> None:
+        with self._lock:
+            self._entries[key] = (summary, ref)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(
+        self,
+        value: Any,
+        compute: Callable[[Any], Any],
+        *,
+        namespace: str = "pls",
+    ) -> Any:
+        """Return the cached summary for a value, computing it once on miss."""
+        keyed = fingerprint_value(value)
+        if keyed is None:
+            return compute(value)
+        fingerprint, content_based = keyed
+        key = self._make_key(namespace, fingerprint)
+
+        cached = self._get_memory(key, value)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        disk_path = self._disk_path(key) if content_based else None
+        if disk_path is not None and disk_path.exists():
+            try:
+                summary = disk_path.read_text(encoding="utf-8")
+                self._put_memory(key, summary, None)
+                self.hits += 1
+                return summary
+            except OSError:
+                pass
+
+        self.misses += 1
+        summary = compute(value)
+
+        ref = None
+        if not content_based:
+            try:
+                ref = weakref.ref(value)
+            except TypeError:
+                # Identity keys are unsafe without a liveness check.
+                return summary
+        self._put_memory(key, summary, ref)
+
+        if disk_path is not None:
+            try:
+                disk_path.parent.mkdir(parents=True, exist_ok=True)
+                disk_path.write_text(str(summary), encoding="utf-8")
+            except OSError as exc:
+                logger.debug("Could not persist summary %s: %s", key[:8], exc)
+        return summary
+
+    def clear(self) -> int:
+        """Drop all in-memory and on-disk entries."""
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+        if self.disk_dir is not None and self.disk_dir.exists():
+            for path in self.disk_dir.glob("*.txt"):
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    continue
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "disk": str(self.disk_dir) if self.disk_dir else None,
+        }
+
+
+_SUMMARY_CACHE: SummaryCache | None = None
+
+
+def get_summary_cache() -> SummaryCache:
+    """Return the process-wide summary cache, honoring `Config.summary_cache`."""
+    global _SUMMARY_CACHE
+    from vibe_widget.config import get_global_config
+
+    mode = getattr(get_global_config(), "summary_cache", "memory")
+    disk_dir = Path.cwd() / ".vibewidget" / "summaries" if mode == "disk" else None
+    if _SUMMARY_CACHE is None:
+        _SUMMARY_CACHE = SummaryCache(disk_dir=disk_dir)
+    else:
+        _SUMMARY_CACHE.disk_dir = disk_dir
+    return _SUMMARY_CACHE
+
+
+def clear_summary_cache() -> int:
+    """Clear the process-wide summary cache (memory and disk tiers)."""
+    cache = get_summary_cache()
+    if cache.disk_dir is None:
+        cache.disk_dir = Path.cwd() / ".vibewidget" / "summaries"
+        try:
+            return cache.clear()
+        finally:
+            cache.disk_dir = None
+    return cache.clear()
@@ -15,5 +15,17 @@ from vibe_widget.utils.serialization import (
 
 
 def summarize_for_prompt(value: Any) -> str:
-    """Return a compact summary for prompts using pretty-little-summary."""
-    return pls.describe(value)
+    """Return a compact summary for prompts using pretty-little-summary.
+
+    Summaries are memoized by a cheap fingerprint of the value, so repeated
+    create/edit/rerun calls on the same dataset only describe it once.
+    """
+    from vibe_widget.config import get_global_config
+    from vibe_widget.utils.sketches import DataSketch
+    from vibe_widget.utils.summary_cache import get_summary_cache
+
+    if isinstance(value, DataSketch):
+        return value.describe()
+    if getattr(get_global_config(), "summary_cache", "memory") == "off":
+        return pls.describe(value)
+    return get_summary_cache().get_or_compute(value, pls.describe)
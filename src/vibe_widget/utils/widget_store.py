@@ -51,11 +51,15 @@ Design notes:
 import hashlib
 import inspect
 import json
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
 SCHEMA_VERSION = 3
+
+# Serializes index read-modify-write cycles across widgets saving concurrently.
+_INDEX_LOCK = threading.RLock()
 ANONYMOUS_VAR_NAME = "_anonymous_"
 
 
@@ -750,16 +754,20 @@ class WidgetStore:
             "revision_parent": revision_parent,
         }
         
-        # Initialize var_name group if needed
-        widgets_dict = self.index.get("widgets", {})
-        if safe_var_name not in widgets_dict:
-            widgets_dict[safe_var_name] = []
-        
-        # Insert at beginning (newest first)
-        widgets_dict[safe_var_name].insert(0, widget_entry)
-        self.index["widgets"] = widgets_dict
-        
-        self._save_index()  # Rebuilds cache_index and metadata
+        with _INDEX_LOCK:
+            # Reload so concurrent saves (background/batch generation) are not lost
+            self.index = self._load_index()
+
+            # Initialize var_name group if needed
+            widgets_dict = self.index.get("widgets", {})
+            if safe_var_name not in widgets_dict:
+                widgets_dict[safe_var_name] = []
+            
+            # Insert at beginning (newest first)
+            widgets_dict[safe_var_name].insert(0, widget_entry)
+            self.index["widgets"] = widgets_dict
+            
+            self._save_index()  # Rebuilds cache_index and metadata
         
         # Return entry with var_name for reference
         result = dict(widget_entry)
@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from vibe_widget.utils.sketches import DataSketch, sketch_source
+
+
+@pytest.mark.unit
+def test_column_that_turns_textual_after_an_all_null_chunk(tmp_path):
+    path = tmp_path / "drift.csv"
+    values = [""] * 5 + ["a", "b", "a", "c", "a"]
+    pd.DataFrame({"id": range(10), "label": values}).to_csv(path, index=False)
+
+    profile = sketch_source(path, chunksize=5).to_profile()
+
+    label = profile["columns"]["label"]
+    assert label["dtype"] == str(pd.read_csv(path)["label"].dtype)
+    assert label["null_count"] == 5
+    assert "stats" not in label
+    assert label["top_values"][0] == {"value": "a", "count": 3}
+    assert profile["columns"]["id"]["stats"]["max"] == 9.0
+
+
+@pytest.mark.unit
+def test_merge_keeps_textual_partition():
+    numeric = DataSketch().update(pd.DataFrame({"label": [float("nan")] * 3}))
+    textual = DataSketch().update(pd.DataFrame({"label": ["x", "y", "x"]}))
+
+    profile = numeric.merge(textual).to_profile()["columns"]["label"]
+
+    assert profile["dtype"] == str(textual.columns["label"].dtype_obj)
+    assert profile["null_count"] == 3
+    assert "stats" not in profile